@@ -1,5 +1,18 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from .auth import forget_user
+        from .db import apply_sqlite_pragmas
+        connection_created.connect(apply_sqlite_pragmas)
+        User = get_user_model()
+        post_save.connect(forget_user, sender=User)
+        post_delete.connect(forget_user, sender=User)
+        user_logged_out.connect(forget_user)
@@ -0,0 +1,78 @@
+"""Users read from the cache instead of the database.
+
+Users are cached by pk for USER_CACHE_SECONDS and dropped whenever they
+are saved or deleted, which covers password changes, profile edits and
+``last_login`` updates; logging out drops them too. Username lookups are
+cached as username -> pk and checked against the cached user, so a
+renamed user is never returned under the old name.
+"""
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import (BACKEND_SESSION_KEY, HASH_SESSION_KEY,
+                                 SESSION_KEY, get_user_model)
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import Http404
+from django.utils.crypto import constant_time_compare
+
+USER_KEY = 'user:{}'
+USERNAME_KEY = 'user:name:{}'
+
+
+def cached_user(pk):
+    """The user with ``pk``, or None if there is none."""
+    key = USER_KEY.format(pk)
+    user = cache.get(key)
+    if user is None:
+        user = get_user_model()._default_manager.filter(pk=pk).first()
+        if user is not None:
+            cache.set(key, user, settings.USER_CACHE_SECONDS)
+    return user
+
+
+def user_by_username(username):
+    """Cached stand-in for ``get_object_or_404(User, username=...)``."""
+    key = USERNAME_KEY.format(username)
+    pk = cache.get(key)
+    user = None if pk is None else cached_user(pk)
+    if user is None or user.username != username:
+        pk = get_user_model()._default_manager.filter(
+            username=username).values_list('pk', flat=True).first()
+        if pk is None:
+            raise Http404('No user matches the given query.')
+        cache.set(key, pk, settings.USER_CACHE_SECONDS)
+        user = cached_user(pk)
+    return user
+
+
+def get_user(request):
+    """``django.contrib.auth.get_user`` reading the user from the cache.
+
+    The session auth hash is still checked on every request, so changing
+    the password logs out other sessions as before.
+    """
+    session = request.session
+    try:
+        pk = get_user_model()._meta.pk.to_python(session[SESSION_KEY])
+        backend_path = session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return auth.get_user(request)
+    user = cached_user(pk)
+    if user is None or not user.is_active:
+        return auth.get_user(request)
+    session_hash = session.get(HASH_SESSION_KEY)
+    if not (session_hash and constant_time_compare(
+            session_hash, user.get_session_auth_hash())):
+        session.flush()
+        return AnonymousUser()
+    user.backend = backend_path
+    return user
+
+
+def forget_user(sender, instance=None, user=None, **kwargs):
+    """Receiver for post_save, post_delete and user_logged_out."""
+    user = instance or user
+    if user is not None and user.pk is not None:
+        cache.delete(USER_KEY.format(user.pk))
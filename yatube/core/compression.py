@@ -0,0 +1,121 @@
+"""Compression of dynamic responses.
+
+``CompressionMiddleware`` compresses HTML, JSON and feed responses of
+at least COMPRESSION_MIN_SIZE bytes with Brotli, when the optional
+``brotli`` package is installed and the client accepts it, or gzip.
+Streaming responses are compressed chunk by chunk and flushed after
+every chunk, so nothing is held back from the client. The CPU spent
+per response is set by COMPRESSION_GZIP_LEVEL and
+COMPRESSION_BROTLI_QUALITY; ``benchmark_compression`` shows what each
+level saves on real pages and what it costs.
+"""
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .staticfiles import accepted_encodings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class GzipCompressor:
+    encoding = 'gzip'
+
+    def __init__(self, level=None):
+        level = settings.COMPRESSION_GZIP_LEVEL if level is None else level
+        # wbits 31 writes a gzip header and trailer around the stream.
+        self.stream = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self.stream.compress(data) + self.stream.flush()
+
+    def process(self, chunk):
+        return (self.stream.compress(chunk)
+                + self.stream.flush(zlib.Z_SYNC_FLUSH))
+
+    def finish(self):
+        return self.stream.flush()
+
+
+class BrotliCompressor:
+    encoding = 'br'
+
+    def __init__(self, level=None):
+        quality = (settings.COMPRESSION_BROTLI_QUALITY
+                   if level is None else level)
+        self.stream = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self.stream.process(data) + self.stream.finish()
+
+    def process(self, chunk):
+        return self.stream.process(chunk) + self.stream.flush()
+
+    def finish(self):
+        return self.stream.finish()
+
+
+def compressors():
+    """Available compressor classes, best first."""
+    if brotli is not None:
+        return (BrotliCompressor, GzipCompressor)
+    return (GzipCompressor,)
+
+
+def choose(request):
+    accepted = accepted_encodings(request)
+    for compressor in compressors():
+        if compressor.encoding in accepted:
+            return compressor
+    return None
+
+
+def compressible(response):
+    content_type = response.get('Content-Type', '').split(';')[0].strip()
+    return (response.status_code == 200
+            and not response.has_header('Content-Encoding')
+            and content_type in settings.COMPRESSION_TYPES)
+
+
+def stream(compressor, chunks):
+    for chunk in chunks:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressor = choose(request)
+        if compressor is None:
+            return response
+        if response.streaming:
+            response.streaming_content = stream(compressor(),
+                                                response.streaming_content)
+            del response['Content-Length']
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+                return response
+            compressed = compressor().compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        # The compressed body differs byte for byte from the original.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = compressor.encoding
+        return response
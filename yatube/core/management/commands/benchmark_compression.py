@@ -0,0 +1,57 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from core.compression import BrotliCompressor, GzipCompressor, brotli
+
+LEVELS = {
+    GzipCompressor: (1, 6, 9),
+    BrotliCompressor: (1, 4, 5, 8, 11),
+}
+
+
+class Command(BaseCommand):
+    help = ('Compare bytes saved and CPU time per response of each '
+            'compression level on rendered pages.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Page to render, may be repeated.')
+        parser.add_argument('--runs', type=int, default=20)
+
+    def render(self, client, path):
+        response = client.get(path)
+        if response.status_code != 200:
+            raise CommandError(f'{path} answered {response.status_code}')
+        if response.streaming:
+            return b''.join(response.streaming_content)
+        return response.content
+
+    def handle(self, *args, **options):
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != '*']
+        # No Accept-Encoding, the middleware leaves the body alone.
+        client = Client(HTTP_HOST=hosts[0].lstrip('.') if hosts
+                        else 'localhost')
+        compressors = [GzipCompressor]
+        if brotli is not None:
+            compressors.append(BrotliCompressor)
+        self.stdout.write(f'{"path":24} {"codec":6} {"level":>5} '
+                          f'{"raw KB":>8} {"sent KB":>8} {"saved":>6} '
+                          f'{"ms":>7} {"MB/s":>7}')
+        for path in options['paths'] or ['/', '/feeds/rss/', '/more/']:
+            body = self.render(client, path)
+            for compressor in compressors:
+                for level in LEVELS[compressor]:
+                    started = time.perf_counter()
+                    for _ in range(options['runs']):
+                        size = len(compressor(level).compress(body))
+                    elapsed = (time.perf_counter() - started) / options['runs']
+                    self.stdout.write(
+                        f'{path:24} {compressor.encoding:6} {level:5} '
+                        f'{len(body) / 1024:8.1f} {size / 1024:8.1f} '
+                        f'{1 - size / len(body):6.0%} '
+                        f'{elapsed * 1000:7.2f} '
+                        f'{len(body) / elapsed / 2 ** 20:7.1f}'
+                    )
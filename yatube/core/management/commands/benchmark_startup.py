@@ -0,0 +1,72 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter so that nothing is imported or cached yet.
+PROBE = '''
+import io, json, sys, time
+started = time.perf_counter()
+from yatube.wsgi import application
+booted = time.perf_counter()
+
+def request(path):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80',
+        'HTTP_HOST': 'localhost', 'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http',
+    }
+    statuses = []
+    begin = time.perf_counter()
+    body = b''.join(application(environ,
+                                lambda status, headers: statuses.append(status)))
+    return time.perf_counter() - begin, statuses[0], len(body)
+
+first, status, size = request(sys.argv[1])
+second, _, _ = request(sys.argv[1])
+print(json.dumps({'boot': booted - started, 'first': first,
+                  'second': second, 'status': status, 'size': size}))
+'''
+
+
+class Command(BaseCommand):
+    help = ('Measure cold start (imports, setup, template precompile) and '
+            'first request time for each settings profile.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', action='append', dest='profiles',
+                            help='Profile to measure, may be repeated.')
+        parser.add_argument('--path', default='/about/author/',
+                            help='Path requested after start.')
+        parser.add_argument('--runs', type=int, default=5)
+
+    def probe(self, profile, path):
+        env = dict(os.environ, YATUBE_PROFILE=profile,
+                   DJANGO_SETTINGS_MODULE='yatube.settings')
+        env.setdefault('YATUBE_SECRET_KEY', 'benchmark')
+        env.setdefault('YATUBE_MEMCACHED', '127.0.0.1:11211')
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE, path], cwd=settings.BASE_DIR,
+            env=env, check=True, stdout=subprocess.PIPE,
+        ).stdout
+        return json.loads(output.decode().strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"profile":8} {"boot ms":>9} {"first ms":>9} '
+                          f'{"second ms":>10}  status')
+        for profile in options['profiles'] or ['dev', 'prod']:
+            runs = [self.probe(profile, options['path'])
+                    for _ in range(options['runs'])]
+            median = {
+                key: statistics.median(run[key] for run in runs) * 1000
+                for key in ('boot', 'first', 'second')
+            }
+            self.stdout.write(
+                f'{profile:8} {median["boot"]:9.1f} {median["first"]:9.1f} '
+                f'{median["second"]:10.1f}  {runs[-1]["status"]}'
+            )
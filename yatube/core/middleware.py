@@ -0,0 +1,74 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+from .auth import get_user
+from .views import service_unavailable
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class WriteConcurrencyMiddleware:
+    """Let at most WRITE_CONCURRENCY_LIMIT writes run at once.
+
+    SQLite has a single writer, so queueing more writes than that only
+    makes everybody wait on the database lock, reads included. Extra
+    writes wait up to WRITE_QUEUE_TIMEOUT seconds for a slot and are then
+    turned away with 503. Slots are counted in the default cache with
+    ``add``/``incr``/``decr``, so the limit holds across every server
+    process sharing it; the counter expires after WRITE_SLOT_SECONDS, so
+    slots held by a process that died are given back.
+    """
+
+    key = 'write-slots'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def acquire(self):
+        deadline = time.monotonic() + settings.WRITE_QUEUE_TIMEOUT
+        while True:
+            cache.add(self.key, 0, settings.WRITE_SLOT_SECONDS)
+            try:
+                taken = cache.incr(self.key)
+            except ValueError:
+                # Expired between add and incr.
+                continue
+            if taken <= settings.WRITE_CONCURRENCY_LIMIT:
+                return True
+            self.release()
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(settings.WRITE_POLL_INTERVAL)
+
+    def release(self):
+        try:
+            cache.decr(self.key)
+        except ValueError:
+            # The counter expired meanwhile and starts over from zero.
+            pass
+
+    def __call__(self, request):
+        if request.method in SAFE_METHODS:
+            return self.get_response(request)
+        if not self.acquire():
+            return service_unavailable(request)
+        try:
+            return self.get_response(request)
+        finally:
+            self.release()
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware taking ``request.user`` from the cache.
+
+    Together with the cached_db session engine a logged-in request needs
+    no queries before the view runs.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
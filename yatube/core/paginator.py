@@ -0,0 +1,31 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimate_count(model, using='default'):
+    """Cheap row count estimate for a whole table."""
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            # rowids only grow, so this is an upper bound read off the index.
+            cursor.execute(f'SELECT MAX(rowid) FROM {table}')
+        elif connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class '
+                           'WHERE relname = %s', [model._meta.db_table])
+        else:
+            cursor.execute(f'SELECT COUNT(*) FROM {table}')
+        row = cursor.fetchone()
+    return int(row[0] or 0) if row else 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that does not COUNT(*) unfiltered tables."""
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where or query.distinct:
+            return super().count
+        return estimate_count(self.object_list.model, self.object_list.db)
@@ -0,0 +1,90 @@
+"""Fixed-window rate limiting for write views.
+
+Each window of a rate's period has a counter in the default cache,
+created with ``add`` and bumped with ``incr``, both atomic, so
+concurrent requests can't spend the same allowance and limits are
+shared by every process using the same cache backend. Rates are
+configured per view in ``settings.RATELIMITS``.
+"""
+import re
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .views import too_many_requests
+
+RATE = re.compile(r'^(\d+)/(\d*)([smhd])$')
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    """Turn '10/m' or '100/15m' into (capacity, period in seconds)."""
+    match = RATE.match(rate)
+    if match is None:
+        raise ValueError(f'Invalid rate {rate!r}')
+    capacity, multiplier, unit = match.groups()
+    return int(capacity), int(multiplier or 1) * PERIODS[unit]
+
+
+def take_token(key, rate, now=None):
+    """Count one request, return (allowed, seconds until the next window)."""
+    capacity, period = parse_rate(rate)
+    now = time.time() if now is None else now
+    window = int(now // period)
+    key = f'{key}:{window}'
+    cache.add(key, 0, period)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Expired between add and incr.
+        cache.add(key, 1, period)
+        count = 1
+    allowed = count <= capacity
+    return allowed, 0 if allowed else (window + 1) * period - now
+
+
+def client_ip(request):
+    """Address of the client, as seen by the nearest untrusted hop.
+
+    Behind a reverse proxy REMOTE_ADDR is the proxy itself. When it is one
+    of ``settings.RATELIMIT_TRUSTED_PROXIES`` the X-Forwarded-For chain is
+    read from the right, skipping further trusted proxies; anything left of
+    the first untrusted address could have been sent by the client.
+    """
+    address = request.META.get('REMOTE_ADDR')
+    trusted = settings.RATELIMIT_TRUSTED_PROXIES
+    if address not in trusted:
+        return address
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    for hop in reversed([hop.strip() for hop in forwarded.split(',')]):
+        if not hop:
+            continue
+        address = hop
+        if hop not in trusted:
+            break
+    return address
+
+
+def ratelimit(name, methods=('POST',)):
+    """Limit a view by user and/or IP as configured in RATELIMITS[name]."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            limits = settings.RATELIMITS.get(name, {})
+            if settings.RATELIMIT_ENABLED and request.method in methods:
+                identities = {
+                    'user': request.user.pk,
+                    'ip': client_ip(request),
+                }
+                for scope, rate in limits.items():
+                    if identities[scope] is None:
+                        continue
+                    allowed, retry_after = take_token(
+                        f'ratelimit:{name}:{scope}:{identities[scope]}', rate)
+                    if not allowed:
+                        return too_many_requests(request, retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
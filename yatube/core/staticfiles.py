@@ -0,0 +1,122 @@
+"""Static files with content hashes and precompressed variants.
+
+``collectstatic`` with ``CompressedManifestStaticFilesStorage`` stores
+every file under a content-hashed name, recorded in the manifest that
+``{% static %}`` reads, and writes ``.gz`` and, when the optional
+``brotli`` package is installed, ``.br`` siblings of text assets.
+``serve`` hands out the smallest variant the client accepts. A hashed
+name never changes content, so those responses are cacheable forever.
+"""
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
+                                                staticfiles_storage)
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.txt', '.xml', '.json', '.ico',
+                '.map', '.html')
+# (Content-Encoding, file suffix), best first.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+HASHED_NAME = re.compile(r'^(.*)\.[0-9a-f]{12}(\.[^/.]*)?$')
+
+
+def compress(data):
+    """Yield (suffix, compressed bytes) worth storing for ``data``."""
+    variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(data)))
+    for suffix, compressed in variants:
+        # Tiny files and already dense ones gain nothing.
+        if len(compressed) < len(data) * 0.95:
+            yield suffix, compressed
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        # Adjustable files pass through several intermediate hashed
+        # names, only the final ones are served.
+        for hashed_name in set(self.hashed_files.values()):
+            if hashed_name.endswith(COMPRESSIBLE):
+                self._write_variants(hashed_name)
+
+    def _write_variants(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as file:
+            data = file.read()
+        for suffix, compressed in compress(data):
+            with open(path + suffix, 'wb') as file:
+                file.write(compressed)
+
+
+def accepted_encodings(request):
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        if re.fullmatch(r'\s*q\s*=\s*0(\.0*)?\s*', params):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def is_hashed(name):
+    """Whether ``name`` is a hashed name from the manifest."""
+    match = HASHED_NAME.match(name)
+    if match is None:
+        return False
+    original = match.group(1) + (match.group(2) or '')
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', {})
+    return hashed_files.get(original) == name
+
+
+def serve(request, path):
+    """Serve a collected static file, precompressed when possible."""
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    content_type, _ = mimetypes.guess_type(fullpath)
+    encoding = None
+    accepted = accepted_encodings(request)
+    for coding, suffix in ENCODINGS:
+        if coding in accepted and os.path.isfile(fullpath + suffix):
+            encoding, fullpath = coding, fullpath + suffix
+            break
+    stat = os.stat(fullpath)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'),
+                              stat.st_mtime, stat.st_size):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(
+            open(fullpath, 'rb'),
+            content_type=content_type or 'application/octet-stream')
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        if encoding:
+            response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if is_hashed(path):
+        patch_cache_control(response, public=True,
+                            max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=0)
+    return response
@@ -0,0 +1,48 @@
+"""File storage naming files after their content.
+
+An upload is stored as ``<upload dir>/<ab>/<cd>/<sha256>.<ext>``, so the
+same image uploaded twice is stored once and shares its thumbnails,
+which sorl keys by source name. The two levels of hash prefix directories
+keep directory sizes bounded.
+"""
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def hashed_name(name, content):
+    """Name ``content`` would be stored under when uploaded as ``name``."""
+    directory, filename = os.path.split(name)
+    extension = os.path.splitext(filename)[1].lower()
+    digest = content_hash(content)
+    return os.path.join(directory, digest[:2], digest[2:4],
+                        digest + extension)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # Equal names mean equal content, so there is nothing to avoid.
+        return name
+
+    def _save(self, name, content):
+        name = hashed_name(name, content)
+        if self.exists(name):
+            # Restart the grace period, or the media collector could
+            # delete the file as an orphan under the post being saved.
+            os.utime(self.path(name))
+            return name
+        return super()._save(name, content)
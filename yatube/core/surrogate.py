@@ -0,0 +1,144 @@
+"""Surrogate keys for an HTTP edge cache, and purging by key.
+
+Views tag their responses with the keys of what they show ('index',
+'post:<id>', 'group:<id>', 'author:<id>'); SurrogateKeyMiddleware turns
+the tags into ``Surrogate-Key`` and cache headers. When content changes,
+``purge_on_commit`` queues a job on the 'purge' queue that tells the
+edge to drop every page tagged with the affected keys, through the
+backend named by SURROGATE_PURGE_BACKEND, so a slow edge never holds up
+a request.
+"""
+import json
+import urllib.request
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.module_loading import import_string
+
+from jobs.queue import enqueue
+
+
+def add_keys(request, *keys):
+    request.surrogate_keys = getattr(request, 'surrogate_keys', set())
+    request.surrogate_keys.update(keys)
+
+
+def page_keys(posts):
+    """Keys of the posts on a page, and of the groups shown with them."""
+    keys = []
+    for post in posts:
+        keys.append(f'post:{post.pk}')
+        if post.group_id:
+            keys.append(f'group:{post.group_id}')
+    return keys
+
+
+def is_shared_cacheable(request, response):
+    """Only anonymous, cookie-free successful reads may go to the edge."""
+    user = getattr(request, 'user', None)
+    return (request.method in ('GET', 'HEAD')
+            and response.status_code == 200
+            and (user is None or user.is_anonymous)
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_USED'))
+
+
+class NullBackend:
+    def purge(self, keys):
+        pass
+
+
+class LocMemBackend:
+    """Remember purged keys in memory, for tests."""
+    purged = []
+
+    def purge(self, keys):
+        self.purged.extend(keys)
+
+
+class FileBackend:
+    """Append purged keys to a file, one JSON list per line.
+
+    A stand-in for an edge cache during development: tail the file, or
+    let a sidecar read it and purge.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def purge(self, keys):
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(keys) + '\n')
+
+
+class HTTPBackend:
+    """Send a PURGE request carrying the keys, as Varnish and Fastly take.
+
+    The keys go in one space separated ``Surrogate-Key`` header, split
+    into requests of at most ``batch_size`` keys.
+    """
+
+    def __init__(self, url, method='PURGE', headers=None, timeout=2,
+                 batch_size=256):
+        self.url = url
+        self.method = method
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.batch_size = batch_size
+
+    def purge(self, keys):
+        for start in range(0, len(keys), self.batch_size):
+            request = urllib.request.Request(
+                self.url, method=self.method,
+                headers={**self.headers, 'Surrogate-Key':
+                         ' '.join(keys[start:start + self.batch_size])})
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+
+
+def get_backend():
+    return import_string(settings.SURROGATE_PURGE_BACKEND)(
+        **settings.SURROGATE_PURGE_OPTIONS)
+
+
+def purge(keys):
+    """Job entry point: purge ``keys`` now, the queue retries failures."""
+    keys = sorted(set(keys))
+    if keys:
+        get_backend().purge(keys)
+
+
+def purge_on_commit(keys):
+    """Purge once the change is visible to readers.
+
+    Purging earlier would let the edge refetch the old page. The job
+    becomes visible to workers only when the transaction commits.
+    """
+    if import_string(settings.SURROGATE_PURGE_BACKEND) is NullBackend:
+        return
+    enqueue('core.surrogate.purge', sorted(set(keys)), queue='purge')
+
+
+class SurrogateKeyMiddleware:
+    """Turn the keys views added into edge cache headers.
+
+    Pages for anonymous visitors become publicly cacheable for
+    SURROGATE_MAX_AGE seconds at the edge, browsers always revalidate.
+    Anything else tagged is marked private.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        keys = getattr(request, 'surrogate_keys', None)
+        if not keys:
+            return response
+        patch_vary_headers(response, ('Cookie',))
+        if is_shared_cacheable(request, response):
+            response['Surrogate-Key'] = ' '.join(sorted(keys))
+            patch_cache_control(response, public=True, max_age=0,
+                                s_maxage=settings.SURROGATE_MAX_AGE)
+        else:
+            patch_cache_control(response, private=True)
+        return response
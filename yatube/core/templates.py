@@ -0,0 +1,25 @@
+import os
+
+from django.template import engines
+from django.template.utils import get_app_template_dirs
+
+
+def precompile_templates():
+    """Load every project and app template into the cached loader.
+
+    Returns the number of templates compiled. Only useful with the cached
+    template loader, which keeps compiled templates for the process life.
+    """
+    compiled = 0
+    app_dirs = get_app_template_dirs('templates')
+    for engine in engines.all():
+        for directory in dict.fromkeys(engine.template_dirs + app_dirs):
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    if not name.endswith(('.html', '.txt', '.xml')):
+                        continue
+                    path = os.path.relpath(os.path.join(root, name),
+                                           directory)
+                    engine.get_template(path.replace(os.sep, '/'))
+                    compiled += 1
+    return compiled
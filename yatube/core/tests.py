@@ -1,4 +1,32 @@
-from django.test import TestCase
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.test import (Client, RequestFactory, SimpleTestCase, TestCase,
+                          TransactionTestCase, override_settings)
+from django.urls import reverse
+
+from jobs.models import Job
+from jobs.queue import run_pending
+from .auth import user_by_username
+from .compression import CompressionMiddleware
+from .db import apply_sqlite_pragmas
+from .middleware import WriteConcurrencyMiddleware
+from .ratelimit import client_ip, parse_rate, take_token
+from .surrogate import (FileBackend, LocMemBackend, SurrogateKeyMiddleware,
+                        add_keys)
+from .staticfiles import accepted_encodings, serve
+from .templates import precompile_templates
+
+User = get_user_model()
 
 
 class ViewTestClass(TestCase):
@@ -6,3 +34,321 @@ class ViewTestClass(TestCase):
         response = self.client.get('/nonexist-page/')
         self.assertEqual(response.status_code, 404)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('10/m'), (10, 60))
+        self.assertEqual(parse_rate('100/15m'), (100, 900))
+        with self.assertRaises(ValueError):
+            parse_rate('ten per minute')
+
+    def test_window_resets_after_period(self):
+        self.assertEqual(take_token('bucket', '2/m', now=0), (True, 0))
+        self.assertEqual(take_token('bucket', '2/m', now=10), (True, 0))
+        allowed, retry_after = take_token('bucket', '2/m', now=20)
+        self.assertFalse(allowed)
+        self.assertEqual(retry_after, 40)
+        self.assertEqual(take_token('bucket', '2/m', now=60), (True, 0))
+
+    @override_settings(RATELIMITS={'add_comment': {'user': '2/h'}})
+    def test_comment_burst_is_rejected(self):
+        user = User.objects.create_user(username='spammer')
+        client = Client()
+        client.force_login(user)
+        post = user.posts.create(text='Post')
+        url = reverse('posts:add_comment', kwargs={'post_id': post.pk})
+        codes = [client.post(url, {'text': 'Spam'}).status_code
+                 for _ in range(3)]
+        self.assertEqual(codes, [302, 302, 429])
+        self.assertEqual(post.comments.count(), 2)
+
+    @override_settings(RATELIMITS={'signup': {'ip': '1/h'}})
+    def test_signup_is_limited_by_ip(self):
+        url = reverse('users:signup')
+        self.assertEqual(self.client.post(url).status_code, 200)
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(RATELIMIT_TRUSTED_PROXIES=('10.0.0.1', '10.0.0.2'))
+    def test_client_ip_behind_trusted_proxies(self):
+        factory = RequestFactory()
+        forwarded = '1.2.3.4, 5.6.7.8, 10.0.0.2'
+        self.assertEqual(client_ip(factory.get(
+            '/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=forwarded)),
+            '5.6.7.8')
+        self.assertEqual(client_ip(factory.get(
+            '/', REMOTE_ADDR='9.9.9.9', HTTP_X_FORWARDED_FOR=forwarded)),
+            '9.9.9.9')
+        self.assertEqual(client_ip(factory.get('/', REMOTE_ADDR='10.0.0.1')),
+                         '10.0.0.1')
+
+
+@override_settings(WRITE_CONCURRENCY_LIMIT=1, WRITE_QUEUE_TIMEOUT=0)
+class WriteConcurrencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_writes_over_limit_are_shed(self):
+        middleware = WriteConcurrencyMiddleware(lambda request: HttpResponse())
+        factory = RequestFactory()
+        self.assertTrue(middleware.acquire())
+        self.assertEqual(middleware(factory.post('/')).status_code, 503)
+        self.assertEqual(middleware(factory.get('/')).status_code, 200)
+        middleware.release()
+        self.assertEqual(middleware(factory.post('/')).status_code, 200)
+        self.assertEqual(cache.get(WriteConcurrencyMiddleware.key), 0)
+
+    def test_slots_are_shared_between_instances(self):
+        """Another process's middleware sees the same slot counter."""
+        factory = RequestFactory()
+        first = WriteConcurrencyMiddleware(lambda request: HttpResponse())
+        second = WriteConcurrencyMiddleware(lambda request: HttpResponse())
+        self.assertTrue(first.acquire())
+        self.assertEqual(second(factory.post('/')).status_code, 503)
+        first.release()
+        self.assertEqual(second(factory.post('/')).status_code, 200)
+
+
+class SurrogateKeyTests(TestCase):
+    def tagged(self, request, **response_kwargs):
+        def view(request):
+            add_keys(request, 'index', 'post:1')
+            return HttpResponse(**response_kwargs)
+        return SurrogateKeyMiddleware(view)(request)
+
+    def test_anonymous_pages_are_public(self):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        response = self.tagged(request)
+        self.assertEqual(response['Surrogate-Key'], 'index post:1')
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('s-maxage', response['Cache-Control'])
+        self.assertEqual(response['Vary'], 'Cookie')
+
+    def test_personal_pages_stay_private(self):
+        request = RequestFactory().get('/')
+        request.user = User(username='user')
+        response = self.tagged(request)
+        self.assertNotIn('Surrogate-Key', response)
+        self.assertEqual(response['Cache-Control'], 'private')
+        request.user = AnonymousUser()
+        response = self.tagged(request, status=404)
+        self.assertEqual(response['Cache-Control'], 'private')
+
+    def test_views_tag_responses(self):
+        response = Client().get(reverse('posts:index'))
+        self.assertIn('index', response['Surrogate-Key'].split())
+
+    def test_file_backend_appends_keys(self):
+        with tempfile.NamedTemporaryFile('r') as file:
+            FileBackend(file.name).purge(['index', 'post:1'])
+            self.assertEqual(file.read(), '["index", "post:1"]\n')
+
+
+@override_settings(SURROGATE_PURGE_BACKEND='core.surrogate.LocMemBackend')
+class PurgeTests(TransactionTestCase):
+    def setUp(self):
+        LocMemBackend.purged.clear()
+
+    def test_changes_purge_their_keys_after_commit(self):
+        from posts.models import Comment, Group, Post
+        author = User.objects.create_user(username='author')
+        group = Group.objects.create(title='Group', slug='group',
+                                     description='Group')
+        run_pending(['purge'])
+        self.assertEqual(LocMemBackend.purged, [f'group:{group.pk}'])
+        LocMemBackend.purged.clear()
+        with transaction.atomic():
+            post = Post.objects.create(text='Post', author=author,
+                                       group=group)
+        self.assertEqual(LocMemBackend.purged, [])
+        run_pending(['purge'])
+        self.assertEqual(sorted(LocMemBackend.purged), sorted([
+            'index', f'author:{author.pk}', f'group:{group.pk}',
+            f'post:{post.pk}']))
+        LocMemBackend.purged.clear()
+        Comment.objects.create(text='Comment', author=author, post=post)
+        run_pending(['purge'])
+        self.assertEqual(LocMemBackend.purged, [f'post:{post.pk}'])
+
+    @override_settings(SURROGATE_PURGE_BACKEND='core.surrogate.NullBackend')
+    def test_no_jobs_without_an_edge(self):
+        from posts.models import Group
+        Group.objects.create(title='Group', slug='group', description='Group')
+        self.assertFalse(Job.objects.filter(queue='purge').exists())
+
+
+class CachedAuthTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='user',
+                                             password='old-pass')
+        self.client.force_login(self.user)
+
+    def test_logged_in_requests_skip_auth_queries(self):
+        url = reverse('about:author')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_profile_edits_are_seen(self):
+        url = reverse('about:author')
+        self.client.get(url)
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.context['user'].first_name, 'Renamed')
+
+    def test_password_change_logs_other_sessions_out(self):
+        url = reverse('about:author')
+        self.client.get(url)
+        self.user.set_password('new-pass')
+        self.user.save()
+        response = self.client.get(url)
+        self.assertTrue(response.context['user'].is_anonymous)
+
+    def test_username_lookup_follows_renames(self):
+        self.assertEqual(user_by_username('user'), self.user)
+        self.user.username = 'renamed'
+        self.user.save()
+        with self.assertRaises(Http404):
+            user_by_username('user')
+        self.assertEqual(user_by_username('renamed'), self.user)
+
+
+class StartupTests(TestCase):
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -4000})
+    def test_pragmas_are_applied(self):
+        apply_sqlite_pragmas(sender=None, connection=connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -4000)
+
+    def test_project_templates_are_precompiled(self):
+        self.assertGreater(precompile_templates(), 30)
+
+
+STATIC_TEMP = tempfile.mkdtemp()
+
+
+@override_settings(
+    STATICFILES_DIRS=[os.path.join(STATIC_TEMP, 'src')],
+    STATIC_ROOT=os.path.join(STATIC_TEMP, 'root'),
+    STATICFILES_FINDERS=[
+        'django.contrib.staticfiles.finders.FileSystemFinder'],
+    STATICFILES_STORAGE=(
+        'core.staticfiles.CompressedManifestStaticFilesStorage'),
+)
+class StaticPipelineTests(SimpleTestCase):
+    css = 'body { background: url("../img/dot.png"); }\n' * 50
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        source = os.path.join(STATIC_TEMP, 'src')
+        os.makedirs(os.path.join(source, 'css'))
+        os.makedirs(os.path.join(source, 'img'))
+        with open(os.path.join(source, 'css', 'site.css'), 'w') as file:
+            file.write(cls.css)
+        with open(os.path.join(source, 'img', 'dot.png'), 'wb') as file:
+            file.write(b'\x89PNG\r\n\x1a\n')
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(STATIC_TEMP, ignore_errors=True)
+
+    def test_collectstatic_hashes_and_compresses(self):
+        name = staticfiles_storage.stored_name('css/site.css')
+        self.assertRegex(name, r'^css/site\.[0-9a-f]{12}\.css$')
+        path = staticfiles_storage.path(name)
+        with open(path, 'rb') as file, open(path + '.gz', 'rb') as variant:
+            self.assertEqual(gzip.decompress(variant.read()), file.read())
+        png = staticfiles_storage.path(
+            staticfiles_storage.stored_name('img/dot.png'))
+        self.assertFalse(os.path.exists(png + '.gz'))
+        # Intermediate hashed names of the adjusted CSS get no variants.
+        variants = [file for file in os.listdir(os.path.dirname(path))
+                    if file.endswith('.gz')]
+        self.assertEqual(variants, [os.path.basename(path) + '.gz'])
+
+    def test_serves_precompressed_variant_immutably(self):
+        url = staticfiles_storage.url('css/site.css')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        body = gzip.decompress(b''.join(response.streaming_content))
+        self.assertIn(b'url("../img/dot.', body)
+        response = self.client.get(url)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_unhashed_names_revalidate(self):
+        response = self.client.get('/static/css/site.css')
+        self.assertIn('max-age=0', response['Cache-Control'])
+        for path in ('css/missing.css', '../manage.py'):
+            with self.subTest(path=path), self.assertRaises(Http404):
+                serve(RequestFactory().get('/'), path)
+
+    def test_accepted_encodings(self):
+        request = RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING='gzip;q=1.0, br;q=0, identity')
+        self.assertEqual(accepted_encodings(request), {'gzip', 'identity'})
+
+
+class CompressionTests(TestCase):
+    html = '<p>' + 'Hello, world! ' * 500 + '</p>'
+
+    def respond(self, response, encoding='gzip, deflate'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_compresses_large_html(self):
+        original = HttpResponse(self.html)
+        original['ETag'] = '"abc"'
+        response = self.respond(original)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(),
+                         self.html)
+        self.assertEqual(response['Content-Length'],
+                         str(len(response.content)))
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_leaves_small_unaccepted_and_binary_responses(self):
+        cases = (
+            (HttpResponse('<p>short</p>'), 'gzip'),
+            (HttpResponse(self.html), 'identity'),
+            (HttpResponse(b'\x89PNG' * 1000, content_type='image/png'),
+             'gzip'),
+        )
+        for original, encoding in cases:
+            with self.subTest(encoding=encoding):
+                response = self.respond(original, encoding)
+                self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streams_chunk_by_chunk(self):
+        chunks = [self.html.encode()] * 3
+        response = self.respond(StreamingHttpResponse(
+            iter(chunks), content_type='application/json'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        pieces = list(response.streaming_content)
+        self.assertGreaterEqual(len(pieces), 3)
+        self.assertEqual(gzip.decompress(b''.join(pieces)),
+                         b''.join(chunks))
+
+    def test_pages_are_compressed(self):
+        response = self.client.get(reverse('posts:index'),
+                                   HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'</html>', gzip.decompress(response.content))
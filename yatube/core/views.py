@@ -15,3 +15,15 @@ def server_error(request):
 
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
+
+
+def too_many_requests(request, retry_after=1):
+    response = render(request, 'core/429.html', status=429)
+    response['Retry-After'] = max(1, round(retry_after))
+    return response
+
+
+def service_unavailable(request, retry_after=1):
+    response = render(request, 'core/503.html', status=503)
+    response['Retry-After'] = retry_after
+    return response
@@ -0,0 +1,15 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'task', 'queue', 'priority', 'status', 'attempts',
+                    'run_at', 'finished',)
+    list_filter = ('status', 'queue')
+    search_fields = ('task',)
+    readonly_fields = ('last_error',)
+    empty_value_display = '-empty-'
+
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,37 @@
+import base64
+
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .queue import enqueue
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Email backend that hands messages to the job queue.
+
+    The worker delivers them through settings.JOBS_EMAIL_BACKEND, so
+    views such as password reset return without waiting for delivery.
+    """
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            enqueue(
+                'jobs.tasks.send_email',
+                subject=message.subject,
+                body=message.body,
+                from_email=message.from_email,
+                to=message.to,
+                cc=message.cc,
+                bcc=message.bcc,
+                reply_to=message.reply_to,
+                headers=message.extra_headers,
+                alternatives=getattr(message, 'alternatives', []),
+                attachments=[
+                    (filename, base64.b64encode(
+                        content.encode() if isinstance(content, str)
+                        else content).decode(), mimetype)
+                    for filename, content, mimetype in message.attachments
+                ],
+                queue='email',
+                priority=10,
+            )
+        return len(email_messages)
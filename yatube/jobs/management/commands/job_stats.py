@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from jobs.queue import purge, stats
+
+
+class Command(BaseCommand):
+    help = 'Show job queue metrics and optionally purge finished jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--purge', action='store_true',
+                            help='Delete finished jobs past retention.')
+
+    def handle(self, *args, **options):
+        if options['purge']:
+            self.stdout.write(f'Purged {purge()} finished jobs')
+        for name, figures in sorted(stats().items()):
+            line = ' '.join(f'{key}={value:g}' if isinstance(value, float)
+                            else f'{key}={value}'
+                            for key, value in figures.items())
+            self.stdout.write(f'{name}: {line}')
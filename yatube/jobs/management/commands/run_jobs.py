@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the database queue.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', action='append', dest='queues',
+                            help='Queue to work on, may be repeated. '
+                                 'All queues by default.')
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--processes', action='store_true',
+                            help='Use a process pool instead of threads.')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once the queue is empty.')
+
+    def handle(self, *args, **options):
+        worker = Worker(queues=options['queues'],
+                        concurrency=options['concurrency'],
+                        processes=options['processes'])
+        self.stdout.write(f'Worker {worker.name} started')
+        worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {worker.processed} jobs, {worker.failed} failed'
+        ))
@@ -0,0 +1,73 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    task = models.CharField(verbose_name='Task',
+                            max_length=255,
+                            help_text='Dotted path of the task function',
+                            )
+    payload = models.TextField(verbose_name='Payload',
+                               default='{}',
+                               help_text='JSON encoded args and kwargs',
+                               )
+    queue = models.CharField(verbose_name='Queue',
+                             max_length=50,
+                             default='default',
+                             )
+    priority = models.SmallIntegerField(verbose_name='Priority',
+                                        default=0,
+                                        help_text='Higher runs first',
+                                        )
+    status = models.CharField(verbose_name='Status',
+                              max_length=10,
+                              choices=STATUS_CHOICES,
+                              default=QUEUED,
+                              )
+    attempts = models.PositiveSmallIntegerField(verbose_name='Attempts',
+                                                default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='Max attempts',
+        default=5,
+    )
+    run_at = models.DateTimeField(verbose_name='Run at',
+                                  default=timezone.now)
+    locked_until = models.DateTimeField(verbose_name='Locked until',
+                                        blank=True,
+                                        null=True,
+                                        )
+    worker = models.CharField(verbose_name='Worker',
+                              max_length=100,
+                              blank=True,
+                              )
+    last_error = models.TextField(verbose_name='Last error', blank=True)
+    created = models.DateTimeField(verbose_name='Created',
+                                   auto_now_add=True)
+    started = models.DateTimeField(verbose_name='Started',
+                                   blank=True,
+                                   null=True,
+                                   )
+    finished = models.DateTimeField(verbose_name='Finished',
+                                    blank=True,
+                                    null=True,
+                                    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('status', 'queue', 'run_at')),
+            models.Index(fields=('status', 'locked_until')),
+        ]
+
+    def __str__(self):
+        return f'{self.task} #{self.pk}'
@@ -0,0 +1,168 @@
+"""Database-backed job queue.
+
+A job is a row naming a task function by dotted path plus its JSON
+encoded arguments. Workers claim jobs with a conditional UPDATE, so two
+workers never run the same job, and hold them for ``visibility_timeout``
+seconds; a job whose worker died becomes claimable again once that time
+passes. Failures are retried with exponential backoff until
+``max_attempts`` is reached.
+"""
+import datetime as dt
+import json
+import os
+import socket
+import traceback
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import (Avg, Count, DurationField, ExpressionWrapper,
+                              F, Min, Q)
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+
+def task_path(task):
+    if isinstance(task, str):
+        return task
+    return f'{task.__module__}.{task.__qualname__}'
+
+
+def enqueue(task, *args, queue='default', priority=0, delay=0,
+            max_attempts=None, **kwargs):
+    """Schedule ``task(*args, **kwargs)`` to run in a worker.
+
+    Arguments must be JSON serialisable. Inside a transaction the job is
+    only visible to workers once the transaction commits.
+    """
+    return Job.objects.create(
+        task=task_path(task),
+        payload=json.dumps({'args': args, 'kwargs': kwargs},
+                           cls=DjangoJSONEncoder),
+        queue=queue,
+        priority=priority,
+        run_at=timezone.now() + dt.timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(queues=None, limit=1, worker=None, visibility_timeout=None):
+    """Lock up to ``limit`` runnable jobs for this worker and return them."""
+    now = timezone.now()
+    timeout = visibility_timeout or settings.JOBS_VISIBILITY_TIMEOUT
+    runnable = Job.objects.filter(
+        Q(status=Job.QUEUED, run_at__lte=now)
+        | Q(status=Job.RUNNING, locked_until__lt=now)
+    )
+    if queues:
+        runnable = runnable.filter(queue__in=queues)
+    candidates = runnable.order_by('-priority', 'run_at', 'pk').values_list(
+        'pk', 'status', 'attempts')[:limit * 2]
+    claimed = []
+    for pk, status, attempts in candidates:
+        # ``attempts`` doubles as a version number: if another worker got
+        # here first, the row no longer matches and nothing is updated.
+        updated = Job.objects.filter(
+            pk=pk, status=status, attempts=attempts,
+        ).update(
+            status=Job.RUNNING,
+            attempts=attempts + 1,
+            locked_until=now + dt.timedelta(seconds=timeout),
+            worker=worker or worker_name(),
+            started=now,
+        )
+        if updated:
+            claimed.append(pk)
+        if len(claimed) == limit:
+            break
+    return list(Job.objects.filter(pk__in=claimed).order_by(
+        '-priority', 'run_at', 'pk'))
+
+
+def execute(job):
+    """Run a claimed job and record the outcome, return True on success."""
+    try:
+        payload = json.loads(job.payload)
+        import_string(job.task)(*payload['args'], **payload['kwargs'])
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+            job.finished = timezone.now()
+        else:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + dt.timedelta(
+                seconds=settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1))
+        succeeded = False
+    else:
+        job.status = Job.DONE
+        job.finished = timezone.now()
+        succeeded = True
+    job.locked_until = None
+    Job.objects.filter(pk=job.pk, worker=job.worker,
+                       attempts=job.attempts).update(
+        status=job.status,
+        run_at=job.run_at,
+        locked_until=None,
+        last_error=job.last_error,
+        finished=job.finished,
+    )
+    return succeeded
+
+
+def execute_by_id(pk):
+    """Entry point for process pools, which cannot share model instances."""
+    return execute(Job.objects.get(pk=pk))
+
+
+def run_pending(queues=None, limit=None):
+    """Run runnable jobs one by one in this thread, return the count."""
+    done = 0
+    while limit is None or done < limit:
+        jobs = claim(queues)
+        if not jobs:
+            break
+        execute(jobs[0])
+        done += 1
+    return done
+
+
+def purge(older_than_hours=None):
+    """Delete finished jobs past the retention period."""
+    hours = older_than_hours or settings.JOBS_KEEP_FINISHED_HOURS
+    cutoff = timezone.now() - dt.timedelta(hours=hours)
+    return Job.objects.filter(
+        status__in=(Job.DONE, Job.FAILED), finished__lt=cutoff,
+    ).delete()[0]
+
+
+def stats():
+    """Queue depth, lag and run time figures, per queue."""
+    now = timezone.now()
+    duration = ExpressionWrapper(F('finished') - F('started'),
+                                 output_field=DurationField())
+    result = {}
+    for row in Job.objects.values('queue', 'status').annotate(
+            count=Count('pk')).order_by():
+        queue = result.setdefault(row['queue'], {
+            status: 0 for status, _ in Job.STATUS_CHOICES})
+        queue[row['status']] = row['count']
+    for row in Job.objects.filter(
+            status=Job.QUEUED, run_at__lte=now).values('queue').annotate(
+            oldest=Min('run_at')).order_by():
+        result[row['queue']]['lag'] = (now - row['oldest']).total_seconds()
+    for row in Job.objects.filter(
+            status=Job.DONE, finished__gte=now - dt.timedelta(hours=1),
+    ).values('queue').annotate(run_time=Avg(duration)).order_by():
+        run_time = row['run_time']
+        if run_time is not None:
+            result[row['queue']]['avg_run_time'] = (
+                run_time.total_seconds()
+                if isinstance(run_time, dt.timedelta) else run_time / 1e6
+            )
+    return result
@@ -0,0 +1,18 @@
+import base64
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+
+def send_email(subject, body, from_email, to, cc=(), bcc=(), reply_to=(),
+               headers=None, alternatives=(), attachments=()):
+    message = EmailMultiAlternatives(
+        subject, body, from_email, to, bcc=bcc, cc=cc, reply_to=reply_to,
+        headers=headers,
+        connection=get_connection(settings.JOBS_EMAIL_BACKEND),
+    )
+    for content, mimetype in alternatives:
+        message.attach_alternative(content, mimetype)
+    for filename, content, mimetype in attachments:
+        message.attach(filename, base64.b64decode(content), mimetype)
+    message.send()
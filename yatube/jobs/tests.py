@@ -0,0 +1,105 @@
+import datetime as dt
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import queue
+from .models import Job
+from .worker import Worker
+
+calls = []
+
+
+def record(value):
+    calls.append(value)
+
+
+def explode():
+    raise RuntimeError('boom')
+
+
+def has_connection():
+    return connection.connection is not None
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_jobs_run_by_priority(self):
+        queue.enqueue(record, 'low')
+        queue.enqueue(record, 'high', priority=5)
+        queue.enqueue(record, 'later', delay=60)
+        self.assertEqual(queue.run_pending(), 2)
+        self.assertEqual(calls, ['high', 'low'])
+        self.assertEqual(Job.objects.filter(status=Job.DONE).count(), 2)
+        self.assertEqual(Job.objects.get(status=Job.QUEUED).payload,
+                         '{"args": ["later"], "kwargs": {}}')
+
+    def test_claimed_job_is_not_claimed_twice(self):
+        queue.enqueue(record, 'once')
+        self.assertEqual(len(queue.claim(worker='first')), 1)
+        self.assertEqual(queue.claim(worker='second'), [])
+
+    def test_expired_lock_makes_job_visible_again(self):
+        queue.enqueue(record, 'again')
+        job = queue.claim(worker='dead')[0]
+        Job.objects.filter(pk=job.pk).update(
+            locked_until=timezone.now() - dt.timedelta(seconds=1))
+        retried = queue.claim(worker='alive')[0]
+        self.assertEqual(retried.attempts, 2)
+        queue.execute(retried)
+        # The dead worker finishing late must not overwrite the result.
+        job.status = Job.FAILED
+        queue.execute(job)
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+        self.assertEqual(calls, ['again', 'again'])
+
+    def test_failures_are_retried_then_given_up(self):
+        queue.enqueue(explode, max_attempts=2)
+        queue.run_pending()
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('RuntimeError', job.last_error)
+        Job.objects.update(run_at=timezone.now())
+        queue.run_pending()
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+
+    def test_stats(self):
+        queue.enqueue(record, 'done')
+        queue.enqueue(record, 'waiting', queue='other')
+        queue.run_pending(queues=['default'])
+        figures = queue.stats()
+        self.assertEqual(figures['default']['done'], 1)
+        self.assertEqual(figures['other']['queued'], 1)
+        self.assertIn('lag', figures['other'])
+        self.assertIn('avg_run_time', figures['default'])
+
+
+class WorkerPoolTests(SimpleTestCase):
+    databases = {'default'}
+
+    def test_process_children_start_without_connections(self):
+        connection.ensure_connection()
+        with Worker(concurrency=1, processes=True)._pool() as pool:
+            self.assertFalse(pool.submit(has_connection).result())
+
+
+@override_settings(
+    EMAIL_BACKEND='jobs.backends.QueuedEmailBackend',
+    JOBS_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class QueuedEmailTests(TestCase):
+    def test_password_reset_email_is_sent_by_worker(self):
+        get_user_model().objects.create_user(
+            username='user', email='user@example.com', password='pass')
+        self.client.post('/auth/password_reset/',
+                         {'email': 'user@example.com'})
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(Job.objects.filter(queue='email').exists())
+        queue.run_pending()
+        self.assertEqual(mail.outbox[0].to, ['user@example.com'])
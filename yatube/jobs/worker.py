@@ -0,0 +1,96 @@
+import logging
+import multiprocessing
+import signal
+import threading
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+
+import django
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import queue
+
+logger = logging.getLogger(__name__)
+
+
+def _run_in_thread(job):
+    try:
+        return queue.execute(job)
+    finally:
+        close_old_connections()
+
+
+class Worker:
+    """Claims jobs and runs them in a thread or process pool.
+
+    Only the main thread talks to the queue tables to claim work; the
+    pool runs the tasks. SIGINT/SIGTERM stop claiming and let running
+    jobs finish.
+    """
+
+    def __init__(self, queues=None, concurrency=4, processes=False,
+                 poll_interval=None):
+        self.queues = queues
+        self.concurrency = concurrency
+        self.processes = processes
+        self.poll_interval = poll_interval or settings.JOBS_POLL_INTERVAL
+        self.name = queue.worker_name()
+        self.stopping = threading.Event()
+        self.processed = 0
+        self.failed = 0
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def _pool(self):
+        if self.processes:
+            # Forked children start lazily, after claim() has reopened the
+            # database connection, and would inherit it. Spawned ones
+            # start empty and only need Django set up.
+            return ProcessPoolExecutor(
+                self.concurrency,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup)
+        return ThreadPoolExecutor(self.concurrency)
+
+    def _submit(self, pool, job):
+        if self.processes:
+            return pool.submit(queue.execute_by_id, job.pk)
+        return pool.submit(_run_in_thread, job)
+
+    def _collect(self, futures, timeout):
+        done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            futures.remove(future)
+            try:
+                succeeded = future.result()
+            except Exception:
+                logger.exception('Worker pool failed to run a job')
+                succeeded = False
+            self.processed += 1
+            self.failed += not succeeded
+
+    def run(self, burst=False):
+        """Work until stopped, or until the queue is empty with ``burst``."""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+        futures = set()
+        with self._pool() as pool:
+            while not self.stopping.is_set():
+                free = self.concurrency - len(futures)
+                jobs = queue.claim(self.queues, limit=free,
+                                   worker=self.name) if free else []
+                for job in jobs:
+                    futures.add(self._submit(pool, job))
+                if not futures:
+                    if burst:
+                        break
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                self._collect(futures,
+                              timeout=None if jobs else self.poll_interval)
+            while futures:
+                self._collect(futures, timeout=None)
+        return self.processed
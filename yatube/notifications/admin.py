@@ -0,0 +1,14 @@
+from django.contrib import admin
+
+from .models import Notification
+
+
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'kind', 'actor', 'post_id', 'created',
+                    'read',)
+    list_select_related = ('user', 'actor')
+    list_filter = ('kind', 'read')
+    raw_id_fields = ('user', 'actor')
+
+
+admin.site.register(Notification, NotificationAdmin)
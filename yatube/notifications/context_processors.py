@@ -0,0 +1,9 @@
+from .inbox import unread_count
+
+
+def unread(request):
+    """Unread notification count of the user, read from the cache."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'unread_notifications': unread_count(user.pk)}
@@ -0,0 +1,97 @@
+"""Per-user notification inbox.
+
+Comments and follows fan out into one ``Notification`` row per recipient
+when they are written, so an inbox is a range read of its owner's rows.
+The unread count shown in the header is cached per user for
+NOTIFICATIONS_COUNT_SECONDS; writes to an inbox drop it, once right away
+and once more on commit, and the next page view recounts with one
+indexed query.
+"""
+import datetime as dt
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from posts.models import Comment, Post
+from .models import Notification
+
+UNREAD_KEY = 'notifications:unread:{}'
+
+
+def unread_count(user_id):
+    return cache.get_or_set(
+        UNREAD_KEY.format(user_id),
+        lambda: Notification.objects.filter(
+            user_id=user_id, read=False).count(),
+        settings.NOTIFICATIONS_COUNT_SECONDS)
+
+
+def forget_counts(user_ids):
+    keys = [UNREAD_KEY.format(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    # A recount before the commit would cache the old count again.
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def notify(user_ids, actor_id, kind, post_id=None, text=''):
+    """Write a notification to each inbox but the actor's own."""
+    user_ids = set(user_ids) - {actor_id}
+    Notification.objects.bulk_create(
+        (Notification(user_id=user_id, actor_id=actor_id, kind=kind,
+                      post_id=post_id, text=text[:200])
+         for user_id in user_ids),
+        batch_size=settings.NOTIFICATIONS_BATCH_SIZE,
+    )
+    forget_counts(user_ids)
+
+
+def notify_comment(comment):
+    """Tell the post author and everyone else in the thread."""
+    recipients = set(Comment.objects.filter(post_id=comment.post_id)
+                     .values_list('author_id', flat=True).distinct())
+    recipients.update(Post.objects.filter(pk=comment.post_id)
+                      .values_list('author_id', flat=True))
+    notify(recipients, comment.author_id, Notification.COMMENT,
+           post_id=comment.post_id, text=comment.text)
+
+
+def notify_follow(follow):
+    notify([follow.author_id], follow.user_id, Notification.FOLLOW)
+
+
+def mark_read(user_id, up_to=None, batch_size=None):
+    """Mark unread notifications up to pk ``up_to`` read, in batches.
+
+    Return how many were marked.
+    """
+    batch_size = batch_size or settings.NOTIFICATIONS_BATCH_SIZE
+    unread = Notification.objects.filter(user_id=user_id, read=False)
+    if up_to is not None:
+        unread = unread.filter(pk__lte=up_to)
+    marked = 0
+    while True:
+        ids = list(unread.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            break
+        marked += Notification.objects.filter(pk__in=ids).update(read=True)
+    forget_counts([user_id])
+    return marked
+
+
+def trim(days=None, batch_size=None):
+    """Delete notifications older than ``days``, return how many."""
+    if days is None:
+        days = settings.NOTIFICATIONS_KEEP_DAYS
+    batch_size = batch_size or settings.NOTIFICATIONS_BATCH_SIZE
+    old = Notification.objects.filter(
+        created__lt=timezone.now() - dt.timedelta(days=days)).order_by('pk')
+    deleted = 0
+    while True:
+        batch = list(old.values_list('pk', 'user_id')[:batch_size])
+        if not batch:
+            return deleted
+        deleted += Notification.objects.filter(
+            pk__in=[pk for pk, _ in batch]).delete()[0]
+        forget_counts({user_id for _, user_id in batch})
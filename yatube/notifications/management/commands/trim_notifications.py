@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from notifications.inbox import trim
+
+
+class Command(BaseCommand):
+    help = 'Delete notifications older than NOTIFICATIONS_KEEP_DAYS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None)
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        count = trim(days=options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {count} notifications'))
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.19 on 2026-10-19 20:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('comment', 'Comment'), ('follow', 'Follow')], max_length=10, verbose_name='Kind')),
+                ('post_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='Post id')),
+                ('text', models.CharField(blank=True, max_length=200, verbose_name='Excerpt')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Created')),
+                ('read', models.BooleanField(default=False, verbose_name='Read')),
+                ('actor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Actor')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL, verbose_name='Recipient')),
+            ],
+            options={
+                'ordering': ('-pk',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'read'], name='notificatio_user_id_878a13_idx'),
+        ),
+    ]
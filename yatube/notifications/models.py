@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+User = get_user_model()
+
+
+class Notification(models.Model):
+    """An inbox entry, written by ``notifications.inbox.notify``."""
+    COMMENT = 'comment'
+    FOLLOW = 'follow'
+    KIND_CHOICES = (
+        (COMMENT, 'Comment'),
+        (FOLLOW, 'Follow'),
+    )
+
+    user = models.ForeignKey(User,
+                             on_delete=models.CASCADE,
+                             related_name='notifications',
+                             verbose_name='Recipient'
+                             )
+    actor = models.ForeignKey(User,
+                              on_delete=models.CASCADE,
+                              related_name='+',
+                              verbose_name='Actor'
+                              )
+    kind = models.CharField(verbose_name='Kind',
+                            max_length=10,
+                            choices=KIND_CHOICES,
+                            )
+    # A plain id, the post may have moved to the archive since.
+    post_id = models.PositiveIntegerField(verbose_name='Post id',
+                                          blank=True,
+                                          null=True,
+                                          )
+    text = models.CharField(verbose_name='Excerpt',
+                            max_length=200,
+                            blank=True,
+                            )
+    created = models.DateTimeField(verbose_name='Created',
+                                   auto_now_add=True,
+                                   db_index=True,
+                                   )
+    read = models.BooleanField(verbose_name='Read', default=False)
+
+    class Meta:
+        ordering = ('-pk',)
+        indexes = [models.Index(fields=('user', 'read'))]
+
+    def __str__(self):
+        return f'{self.get_kind_display()} for {self.user_id}'
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from posts.models import Comment, Follow
+from .inbox import notify_comment, notify_follow
+
+
+@receiver(post_save, sender=Comment)
+def comment_written(sender, instance, created, **kwargs):
+    if created:
+        notify_comment(instance)
+
+
+@receiver(post_save, sender=Follow)
+def author_followed(sender, instance, created, **kwargs):
+    if created:
+        notify_follow(instance)
@@ -0,0 +1,78 @@
+import datetime as dt
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Follow, Post
+from .inbox import mark_read, unread_count
+from .models import Notification
+
+User = get_user_model()
+
+
+class NotificationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.other = User.objects.create_user(username='other')
+        self.post = Post.objects.create(author=self.author, text='Post')
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def test_comment_fans_out_to_thread(self):
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text='First')
+        Comment.objects.create(post=self.post, author=self.other,
+                               text='Second')
+        self.assertEqual(unread_count(self.author.pk), 2)
+        self.assertEqual(unread_count(self.reader.pk), 1)
+        self.assertEqual(unread_count(self.other.pk), 0)
+        notification = self.reader.notifications.get()
+        self.assertEqual((notification.kind, notification.post_id,
+                          notification.text),
+                         (Notification.COMMENT, self.post.pk, 'Second'))
+
+    def test_follow_notifies_author(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        notification = self.author.notifications.get()
+        self.assertEqual((notification.kind, notification.actor),
+                         (Notification.FOLLOW, self.reader))
+
+    def test_header_count_is_cached(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertContains(self.client.get(reverse('about:tech')),
+                            'Notifications (1)')
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.author.pk), 1)
+        Follow.objects.create(user=self.other, author=self.author)
+        self.assertEqual(unread_count(self.author.pk), 2)
+
+    def test_mark_read_in_batches(self):
+        for user in (self.reader, self.other):
+            Follow.objects.create(user=user, author=self.author)
+        first = self.author.notifications.order_by('pk').first()
+        self.assertEqual(mark_read(self.author.pk, up_to=first.pk), 1)
+        self.assertEqual(unread_count(self.author.pk), 1)
+        self.client.post(reverse('notifications:read'),
+                         {'up_to': self.author.notifications.first().pk})
+        self.assertEqual(unread_count(self.author.pk), 0)
+        response = self.client.get(reverse('notifications:inbox'))
+        self.assertEqual(len(response.context['page_obj']), 2)
+        self.assertNotContains(response, 'Notifications (')
+
+    def test_trim_drops_old_notifications(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.other, author=self.author)
+        Notification.objects.filter(actor=self.reader).update(
+            created=timezone.now() - dt.timedelta(days=365))
+        self.assertEqual(unread_count(self.author.pk), 2)
+        out = StringIO()
+        call_command('trim_notifications', stdout=out)
+        self.assertIn('Deleted 1 notifications', out.getvalue())
+        self.assertEqual(unread_count(self.author.pk), 1)
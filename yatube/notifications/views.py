@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.shortcuts import redirect, render
+from django.views.decorators.http import require_POST
+
+from .inbox import mark_read
+
+
+@login_required
+def inbox(request):
+    notifications = request.user.notifications.select_related('actor')
+    paginator = Paginator(notifications, settings.NOTIFICATIONS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    context = {
+        'page_obj': page_obj,
+        # "Mark all as read" covers what had arrived when the page was shown.
+        'up_to': notifications.values_list('pk', flat=True).first(),
+    }
+    return render(request, 'notifications/inbox.html', context)
+
+
+@login_required
+@require_POST
+def read(request):
+    up_to = request.POST.get('up_to', '')
+    mark_read(request.user.pk, int(up_to) if up_to.isdigit() else None)
+    return redirect('notifications:inbox')
@@ -1,15 +1,135 @@
+from django.conf import settings
 from django.contrib import admin
+from django.db import transaction
 
-from .models import Post, Group
+from core.paginator import EstimatedCountPaginator
+from . import deletion
+from .models import Post, Group, Comment, Follow, DeletionTask
+from .search import full_text_filter
 
 
-class PostAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
-    search_fields = ('text',)
-    list_filter = ('pub_date',)
-    list_editable = ('group',)
+def in_batches(queryset, batch_size=None):
+    """Yield querysets of at most ``batch_size`` rows, walking by pk."""
+    batch_size = batch_size or settings.ADMIN_BATCH_SIZE
+    last = 0
+    while True:
+        ids = list(queryset.filter(pk__gt=last).order_by('pk')
+                   .values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        last = ids[-1]
+        yield queryset.model.objects.filter(pk__in=ids)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-empty-'
+    actions = ('delete_in_batches',)
+
+    def get_actions(self, request):
+        # The stock action collects every selected row in one transaction.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def delete_in_batches(self, request, queryset):
+        deleted = 0
+        for batch in in_batches(queryset):
+            with transaction.atomic():
+                deleted += batch.delete()[1].get(
+                    queryset.model._meta.label, 0)
+        self.message_user(request, f'Deleted {deleted} objects.')
+    delete_in_batches.short_description = 'Delete selected in batches'
+    delete_in_batches.allowed_permissions = ('delete',)
+
+
+class FullTextSearchAdmin(LargeTableAdmin):
+    search_fields = ('text',)
+
+    def get_search_results(self, request, queryset, search_term):
+        return full_text_filter(queryset, search_term), False
+
+
+class PostAdmin(FullTextSearchAdmin):
+    list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
+    date_hierarchy = 'pub_date'
+    actions = ('delete_in_batches', 'remove_from_group')
+
+    def remove_from_group(self, request, queryset):
+        updated = 0
+        for batch in in_batches(queryset.filter(group__isnull=False)):
+            # Saved one by one, so the post signals update the rollups,
+            # feed versions, edge cache and cached pages.
+            with transaction.atomic():
+                for post in batch:
+                    post.group = None
+                    post.save(update_fields=['group'])
+                    updated += 1
+        self.message_user(request, f'Removed {updated} posts from groups.')
+    remove_from_group.short_description = 'Remove selected from group'
+    remove_from_group.allowed_permissions = ('change',)
+
+
+class CommentAdmin(FullTextSearchAdmin):
+    list_display = ('pk', 'text', 'created', 'author', 'post',)
+    list_select_related = ('author', 'post')
+    autocomplete_fields = ('author', 'post')
+    date_hierarchy = 'created'
+
+
+class BackgroundDeletionAdmin(admin.ModelAdmin):
+    """Hand deletions to ``posts.deletion`` instead of cascading inline."""
+    actions = ('delete_in_background',)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_deleted_objects(self, objs, request):
+        # Listing every dependent row is the cost this admin avoids.
+        return [str(obj) for obj in objs], {}, set(), []
+
+    def delete_model(self, request, obj):
+        deletion.schedule(obj)
+
+    def delete_in_background(self, request, queryset):
+        for obj in queryset:
+            deletion.schedule(obj)
+        self.message_user(
+            request, f'Scheduled {len(queryset)} objects for deletion.')
+    delete_in_background.short_description = 'Delete selected in background'
+    delete_in_background.allowed_permissions = ('delete',)
+
+
+class GroupAdmin(BackgroundDeletionAdmin):
+    list_display = ('pk', 'title', 'slug',)
+    search_fields = ('title', 'slug')
+
+
+class FollowAdmin(LargeTableAdmin):
+    list_display = ('pk', 'user', 'author',)
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
+    search_fields = ('user__username', 'author__username')
+
+
+class DeletionTaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'kind', 'label', 'status', 'step', 'deleted',
+                    'created', 'finished')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('kind', 'object_id', 'label', 'status', 'step',
+                       'deleted', 'last_error', 'created', 'finished')
+
+    def has_add_permission(self, request):
+        return False
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
\ No newline at end of file
+admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
+admin.site.register(DeletionTask, DeletionTaskAdmin)
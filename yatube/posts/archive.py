@@ -0,0 +1,123 @@
+"""Hot/cold split of posts.
+
+Posts older than ``ARCHIVE_AFTER_DAYS`` are moved with their comments
+into ``ArchivedPost``/``ArchivedComment``. Because archiving goes by age,
+every archived post is older than every hot one, so a feed is simply the
+hot queryset followed by the archived one.
+"""
+import datetime as dt
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+GENERATION_KEY = 'archive:generation'
+
+
+def generation():
+    """Number bumped on every archive run, used to key cached counts."""
+    return cache.get_or_set(GENERATION_KEY, 0, None)
+
+
+def next_generation():
+    """Drop the cached archive counts."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
+
+
+def archive_batch(cutoff, batch_size):
+    """Move one batch of the oldest posts, return how many were moved."""
+    with transaction.atomic():
+        posts = list(
+            Post.objects.filter(pub_date__lt=cutoff).order_by('pk')
+            .values('id', 'text', 'pub_date', 'author_id', 'group_id',
+                    'image')[:batch_size]
+        )
+        if not posts:
+            return 0
+        ids = [post['id'] for post in posts]
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(**post) for post in posts
+        )
+        ArchivedComment.objects.bulk_create(
+            ArchivedComment(**comment)
+            for comment in Comment.objects.filter(post_id__in=ids).values(
+                'id', 'post_id', 'author_id', 'text', 'created').iterator()
+        )
+        Comment.objects.filter(post_id__in=ids).delete()
+        Post.objects.filter(pk__in=ids).delete()
+    return len(posts)
+
+
+def archive(days=None, batch_size=None):
+    """Archive everything older than ``days``, batch by batch."""
+    if days is None:
+        days = settings.ARCHIVE_AFTER_DAYS
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - dt.timedelta(days=days)
+    total = 0
+    while True:
+        moved = archive_batch(cutoff, batch_size)
+        if not moved:
+            break
+        total += moved
+    if total:
+        next_generation()
+    return total
+
+
+class ArchiveFeed:
+    """Hot posts followed by archived ones, sliceable by ``Paginator``.
+
+    The archived part only changes when the archive command runs, so its
+    count is cached under ``key`` until the next run, for at most
+    ARCHIVE_COUNT_SECONDS. A feed whose sources change otherwise, like
+    the follow feed, passes no ``key`` and counts every time. ``prepare`` is
+    applied to both querysets when a page is fetched but not when counting,
+    so joins and annotations needed for display do not slow down COUNT.
+    """
+
+    def __init__(self, hot, archived, key, prepare=None):
+        self.hot = hot
+        self.archived = archived
+        self.key = key
+        self.prepare = prepare or (lambda queryset: queryset)
+
+    def hot_count(self):
+        if not hasattr(self, '_hot_count'):
+            self._hot_count = self.hot.count()
+        return self._hot_count
+
+    def archived_count(self):
+        if not hasattr(self, '_archived_count'):
+            if self.key is None:
+                self._archived_count = self.archived.count()
+            else:
+                self._archived_count = cache.get_or_set(
+                    f'archive:count:{generation()}:{self.key}',
+                    self.archived.count, settings.ARCHIVE_COUNT_SECONDS)
+        return self._archived_count
+
+    def count(self):
+        return self.hot_count() + self.archived_count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        hot_count = self.hot_count()
+        items = []
+        if start < hot_count:
+            items.extend(self.prepare(self.hot)[start:min(stop, hot_count)])
+        if stop > hot_count:
+            items.extend(self.prepare(self.archived)
+                         [max(start - hot_count, 0):stop - hot_count])
+        return items
@@ -0,0 +1,167 @@
+"""Deleting users and groups in batches from a background worker.
+
+Deleting a prolific user or a large group at once makes Django's
+collector load every dependent row and hold the SQLite write lock until
+all of them are gone. Instead ``schedule`` hides the object right away
+and queues a job that removes dependents in DELETION_BATCH_SIZE chunks,
+each in its own short transaction, and the object itself last. A job
+runs for at most DELETION_JOB_SECONDS and then queues its continuation,
+so one deletion never occupies a worker for long. Every step can be
+repeated safely, so a failed job is simply retried.
+
+The ids being deleted are cached for DELETION_HIDDEN_SECONDS at most,
+on top of being dropped whenever a deletion starts or ends, so no
+process keeps showing a deleted object for longer than that.
+"""
+import time
+import traceback
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.http import Http404
+from django.utils import timezone
+
+from core.surrogate import purge_on_commit
+from jobs.queue import enqueue
+from notifications.models import Notification
+from . import archive, feeds
+from .models import (ArchivedComment, ArchivedPost, Comment, DeletionTask,
+                     Follow, Group, Mention, Post, Recommendation)
+
+User = get_user_model()
+
+HIDDEN_KEY = 'deletion:hidden'
+TASK = 'posts.deletion.run'
+
+
+def user_steps(pk):
+    return (
+        ('comments', Comment.objects.filter(author_id=pk)),
+        ('comments on posts', Comment.objects.filter(post__author_id=pk)),
+        ('posts', Post.objects.filter(author_id=pk)),
+        ('archived comments', ArchivedComment.objects.filter(author_id=pk)),
+        ('archived comments on posts',
+         ArchivedComment.objects.filter(post__author_id=pk)),
+        ('archived posts', ArchivedPost.objects.filter(author_id=pk)),
+        ('follows', Follow.objects.filter(Q(user_id=pk) | Q(author_id=pk))),
+        ('recommendations', Recommendation.objects.filter(
+            Q(user_id=pk) | Q(author_id=pk))),
+        ('mentions', Mention.objects.filter(user_id=pk)),
+        ('notifications', Notification.objects.filter(
+            Q(user_id=pk) | Q(actor_id=pk))),
+        ('user', User.objects.filter(pk=pk)),
+    )
+
+
+def group_steps(pk):
+    return (
+        ('comments', Comment.objects.filter(post__group_id=pk)),
+        ('posts', Post.objects.filter(group_id=pk)),
+        ('archived comments',
+         ArchivedComment.objects.filter(post__group_id=pk)),
+        ('archived posts', ArchivedPost.objects.filter(group_id=pk)),
+        ('group', Group.objects.filter(pk=pk)),
+    )
+
+
+STEPS = {
+    DeletionTask.USER: user_steps,
+    DeletionTask.GROUP: group_steps,
+}
+
+
+def hidden():
+    """Ids of users and groups being deleted, by kind."""
+    def load():
+        ids = {kind: set() for kind in STEPS}
+        for kind, pk in DeletionTask.objects.exclude(
+                status=DeletionTask.DONE).values_list('kind', 'object_id'):
+            ids[kind].add(pk)
+        return ids
+    return cache.get_or_set(HIDDEN_KEY, load,
+                            settings.DELETION_HIDDEN_SECONDS)
+
+
+def forget_hidden():
+    cache.delete(HIDDEN_KEY)
+    # Cached archive counts still include the hidden posts.
+    archive.next_generation()
+
+
+def visible(queryset):
+    """Drop posts of users and groups being deleted from ``queryset``."""
+    ids = hidden()
+    if ids[DeletionTask.USER]:
+        queryset = queryset.exclude(author_id__in=ids[DeletionTask.USER])
+    if ids[DeletionTask.GROUP]:
+        queryset = queryset.exclude(group_id__in=ids[DeletionTask.GROUP])
+    return queryset
+
+
+def check_visible(user_id=None, group_id=None):
+    """Raise Http404 for a user or group that is being deleted."""
+    ids = hidden()
+    if (user_id in ids[DeletionTask.USER]
+            or group_id in ids[DeletionTask.GROUP]):
+        raise Http404
+
+
+def schedule(obj):
+    """Hide ``obj`` now and queue its deletion, return the task."""
+    kind = DeletionTask.USER if isinstance(obj, User) else DeletionTask.GROUP
+    with transaction.atomic():
+        task = DeletionTask.objects.exclude(status=DeletionTask.DONE).filter(
+            kind=kind, object_id=obj.pk).first()
+        if task is not None:
+            return task
+        task = DeletionTask.objects.create(kind=kind, object_id=obj.pk,
+                                           label=str(obj)[:255])
+        if kind == DeletionTask.USER:
+            obj.is_active = False
+            obj.save(update_fields=['is_active'])
+        enqueue(TASK, task.pk, queue='deletion')
+        transaction.on_commit(forget_hidden)
+        scopes = (feeds.author_scopes(obj.pk) if kind == DeletionTask.USER
+                  else ['index', f'group:{obj.pk}'])
+        feeds.bump_versions(scopes)
+        purge_on_commit(scopes)
+    return task
+
+
+def delete_batch(rows, batch_size):
+    """Delete up to ``batch_size`` of ``rows``, return rows removed."""
+    ids = list(rows.order_by('pk').values_list('pk', flat=True)[:batch_size])
+    if not ids:
+        return 0
+    with transaction.atomic():
+        return rows.model.objects.filter(pk__in=ids).delete()[0]
+
+
+def run(task_id, batch_size=None, seconds=None):
+    """Job entry point: work on a deletion until done or out of time."""
+    batch_size = batch_size or settings.DELETION_BATCH_SIZE
+    deadline = time.monotonic() + (seconds or settings.DELETION_JOB_SECONDS)
+    task = DeletionTask.objects.get(pk=task_id)
+    if task.status == DeletionTask.DONE:
+        return
+    tasks = DeletionTask.objects.filter(pk=task_id)
+    tasks.update(status=DeletionTask.RUNNING)
+    try:
+        for step, rows in STEPS[task.kind](task.object_id):
+            tasks.update(step=step)
+            while True:
+                if time.monotonic() > deadline:
+                    enqueue(TASK, task_id, queue='deletion')
+                    return
+                deleted = delete_batch(rows, batch_size)
+                if not deleted:
+                    break
+                tasks.update(deleted=F('deleted') + deleted)
+    except Exception:
+        tasks.update(last_error=traceback.format_exc())
+        raise
+    tasks.update(status=DeletionTask.DONE, step='', finished=timezone.now())
+    forget_hidden()
@@ -0,0 +1,78 @@
+"""Read-through cache of what ``post_detail`` shows.
+
+A post's bundle holds the post, whether it is archived, its newest
+DETAIL_COMMENTS comments with their count and the rendered thumbnail.
+The author's post count and groups are cached on their own, since they
+are shared by many bundles, and so are users: the post and its comments
+keep author ids only, which the view resolves with ``cached_user``. The
+post signals delete exactly the keys a write changes, so a popular post
+is served from the cache alone until it is edited, commented on or
+deleted.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from .models import ArchivedPost, Group, Post
+
+BUNDLE_KEY = 'detail:{}'
+COUNT_KEY = 'detail:count:{}'
+GROUP_KEY = 'detail:group:{}'
+
+
+def load_bundle(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    archived = post is None
+    if archived:
+        post = ArchivedPost.objects.filter(pk=post_id).first()
+        if post is None:
+            return None
+    comments = post.comments.order_by('-created')
+    return {
+        'post': post,
+        'archived': archived,
+        'comments': list(comments[:settings.DETAIL_COMMENTS]),
+        'comments_count': comments.count(),
+        'image': render_to_string('posts/includes/detail_image.html',
+                                  {'post': post}),
+    }
+
+
+def get_bundle(post_id):
+    """The post's bundle, or None for a post that does not exist."""
+    key = BUNDLE_KEY.format(post_id)
+    bundle = cache.get(key)
+    if bundle is None:
+        bundle = load_bundle(post_id)
+        if bundle is not None:
+            cache.set(key, bundle, settings.DETAIL_CACHE_SECONDS)
+    return bundle
+
+
+def author_posts_count(author_id):
+    return cache.get_or_set(
+        COUNT_KEY.format(author_id),
+        lambda: (Post.objects.filter(author_id=author_id).count()
+                 + ArchivedPost.objects.filter(author_id=author_id).count()),
+        settings.DETAIL_CACHE_SECONDS)
+
+
+def cached_group(group_id):
+    if group_id is None:
+        return None
+    return cache.get_or_set(
+        GROUP_KEY.format(group_id),
+        lambda: Group.objects.filter(pk=group_id).first(),
+        settings.DETAIL_CACHE_SECONDS)
+
+
+def forget_post(post_id):
+    cache.delete(BUNDLE_KEY.format(post_id))
+
+
+def forget_author(author_id):
+    cache.delete(COUNT_KEY.format(author_id))
+
+
+def forget_group(group_id):
+    cache.delete(GROUP_KEY.format(group_id))
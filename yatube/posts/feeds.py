@@ -0,0 +1,211 @@
+"""RSS and Atom feeds for the index, groups and authors.
+
+Every feed scope ('index', 'group:<id>', 'author:<id>') has a
+content version: the time of the last post change in it, bumped by the
+post signals. A feed is rendered once per version and served from the
+cache; the version doubles as ETag and Last-Modified, so polling clients
+that are up to date get a 304 without any database query.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+from django.utils.text import Truncator
+
+from core.surrogate import add_keys
+
+from . import deletion
+from .models import Group, Post
+
+User = get_user_model()
+
+VERSION_KEY = 'feed:version:{}'
+GROUP_ID_KEY = 'feed:group-id:{}'
+AUTHOR_ID_KEY = 'feed:author-id:{}'
+
+
+def content_version(scope):
+    """Timestamp of the last change in ``scope``, starting now if unknown."""
+    return cache.get_or_set(VERSION_KEY.format(scope), time.time, None)
+
+
+def bump_versions(scopes):
+    now = time.time()
+    cache.set_many({VERSION_KEY.format(scope): now for scope in scopes}, None)
+
+
+def post_scopes(post):
+    scopes = ['index', f'author:{post.author_id}']
+    if post.group_id:
+        scopes.append(f'group:{post.group_id}')
+    return scopes
+
+
+def author_scopes(user_id):
+    """Scopes of every feed that can list posts of the user."""
+    group_ids = Post.objects.filter(
+        author_id=user_id, group__isnull=False).values_list(
+            'group_id', flat=True).distinct()
+    return (['index', f'author:{user_id}']
+            + [f'group:{group_id}' for group_id in group_ids])
+
+
+def group_scope(slug):
+    # Slugs can be renamed and reused, the signals drop the lookup then.
+    group_id = cache.get_or_set(
+        GROUP_ID_KEY.format(slug),
+        lambda: get_object_or_404(Group, slug=slug).pk,
+        settings.FEED_SCOPE_SECONDS)
+    return f'group:{group_id}'
+
+
+def author_scope(username):
+    user_id = cache.get_or_set(
+        AUTHOR_ID_KEY.format(username),
+        lambda: get_object_or_404(User, username=username).pk,
+        settings.FEED_SCOPE_SECONDS)
+    return f'author:{user_id}'
+
+
+def forget_scopes(key, names):
+    """Drop the cached ids of group slugs or usernames ``names``."""
+    cache.delete_many([key.format(name) for name in names if name])
+
+
+class LatestPostsFeed(Feed):
+    title = 'Yatube: last updates'
+    link = reverse_lazy('posts:index')
+    description = 'Last posts of all authors'
+
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return deletion.visible(self.posts(obj)).select_related(
+            'author', 'group').order_by('-pub_date')[:settings.FEED_SIZE]
+
+    def item_title(self, item):
+        return Truncator(item.text).words(10)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_categories(self, item):
+        return [item.group.title] if item.group else []
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        group = get_object_or_404(Group, slug=slug)
+        deletion.check_visible(group_id=group.pk)
+        return group
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=[obj.slug])
+
+    def description(self, obj):
+        return obj.description
+
+    def posts(self, obj):
+        return Post.objects.filter(group=obj)
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        user = get_object_or_404(User, username=username)
+        deletion.check_visible(user_id=user.pk)
+        return user
+
+    def title(self, obj):
+        return f'Yatube: posts by {obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=[obj.username])
+
+    def description(self, obj):
+        return f'Last posts by {obj.username}'
+
+    def posts(self, obj):
+        return Post.objects.filter(author=obj)
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+def cached_feed(feed_class, scope):
+    """Wrap a feed in versioned caching and conditional GET handling.
+
+    ``scope`` maps the view kwargs to the feed scope.
+    """
+    feed = feed_class()
+    name = feed_class.__name__
+
+    def view(request, **kwargs):
+        feed_scope = scope(**kwargs)
+        # Scopes are named like surrogate keys, so purges reach feeds too.
+        add_keys(request, feed_scope)
+        version = content_version(feed_scope)
+        etag = quote_etag(f'{name}-{version}')
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=int(version))
+        if not_modified is not None:
+            return not_modified
+        key = f'feed:{name}:{feed_scope}:{version}'
+        cached = cache.get(key)
+        if cached is None:
+            response = feed(request, **kwargs)
+            cached = (response.content, response['Content-Type'])
+            cache.set(key, cached, settings.FEED_CACHE_SECONDS)
+        response = HttpResponse(cached[0], content_type=cached[1])
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(version)
+        return response
+    return view
+
+
+def index_scope():
+    return 'index'
+
+
+latest_rss = cached_feed(LatestPostsFeed, index_scope)
+latest_atom = cached_feed(LatestPostsAtomFeed, index_scope)
+group_rss = cached_feed(GroupPostsFeed, group_scope)
+group_atom = cached_feed(GroupPostsAtomFeed, group_scope)
+author_rss = cached_feed(AuthorPostsFeed, author_scope)
+author_atom = cached_feed(AuthorPostsAtomFeed, author_scope)
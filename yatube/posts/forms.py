@@ -1,4 +1,7 @@
 from django import forms
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
+
 from .models import Post, Comment
 
 
@@ -7,6 +10,24 @@ class PostForm(forms.ModelForm):
         model = Post
         fields = ('text', 'group', 'image')
 
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        # ``image`` is set on new uploads only, by ImageField validation,
+        # which reads the header without decoding the pixels.
+        pil_image = getattr(image, 'image', None)
+        if pil_image is None:
+            return image
+        if image.size > settings.IMAGE_UPLOAD_MAX_BYTES:
+            raise forms.ValidationError(
+                'Image files may be %s at most.'
+                % filesizeformat(settings.IMAGE_UPLOAD_MAX_BYTES))
+        width, height = pil_image.size
+        if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+            raise forms.ValidationError(
+                'Images may have %d megapixels at most.'
+                % (settings.IMAGE_UPLOAD_MAX_PIXELS // 1000000))
+        return image
+
 
 class CommentForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,67 @@
+"""Normalization of uploaded post images.
+
+``PostForm`` turns away uploads over IMAGE_UPLOAD_MAX_BYTES or
+IMAGE_UPLOAD_MAX_PIXELS before anything is decoded. What it accepts is
+stored as uploaded, and a job on the 'images' queue then rewrites it
+upright by its EXIF orientation, without EXIF and other metadata, and
+no larger than IMAGE_MAX_SIDE pixels on either side, moves every post
+over to the rewritten file and deletes the upload. Thumbnails are cut
+from the rewritten file, so they decode a small image instead of a
+full-size photo.
+"""
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .models import Post, image_storage
+
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 85, 'optimize': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 85},
+}
+# Metadata dropped on rewrite; colour profile and transparency are kept.
+STRIPPED = {'exif', 'comment', 'xmp', 'XML:com.adobe.xmp', 'photoshop'}
+KEPT = ('icc_profile', 'transparency')
+
+
+def needs_normalizing(image):
+    return (bool(STRIPPED & set(image.info))
+            or max(image.size) > settings.IMAGE_MAX_SIDE)
+
+
+def rewrite(image, image_format):
+    """Encode ``image`` upright, downscaled and without metadata."""
+    kept = {key: image.info[key] for key in KEPT if key in image.info}
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((settings.IMAGE_MAX_SIDE, settings.IMAGE_MAX_SIDE),
+                    Image.LANCZOS)
+    # A fresh image carries pixels only, none of the source's info.
+    clean = Image.new(image.mode, image.size)
+    clean.frombytes(image.tobytes())
+    if image.mode == 'P':
+        clean.putpalette(image.getpalette())
+    buffer = io.BytesIO()
+    clean.save(buffer, image_format, **SAVE_OPTIONS[image_format], **kept)
+    return buffer.getvalue()
+
+
+def normalize(name):
+    """Store a normalized copy of image ``name``, return its name.
+
+    Returns None when the image is fine as it is or cannot be rewritten,
+    like animated images.
+    """
+    with image_storage.open(name) as file:
+        image = Image.open(file)
+        if (image.format not in SAVE_OPTIONS
+                or getattr(image, 'is_animated', False)
+                or not needs_normalizing(image)):
+            return None
+        data = rewrite(image, image.format)
+    upload_to = Post._meta.get_field('image').upload_to
+    return image_storage.save(os.path.join(upload_to, os.path.basename(name)),
+                              ContentFile(data))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.archive import archive
+
+
+class Command(BaseCommand):
+    help = 'Move old posts and their comments into the archive tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Archive posts older than this many days.')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        moved = archive(days=options['days'],
+                        batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} posts'))
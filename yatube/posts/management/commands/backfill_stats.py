@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.stats import backfill
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily group and author rollups from posts and comments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        count = backfill(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {count} rollup rows'))
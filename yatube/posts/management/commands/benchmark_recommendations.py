@@ -0,0 +1,45 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import score
+
+
+class Command(BaseCommand):
+    help = 'Time recommendation scoring on a synthetic follow graph.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--edges', type=int, default=1_000_000)
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--groups', type=int, default=500)
+        parser.add_argument('--top-k', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        users, edges = options['users'], options['edges']
+        # Popularity of authors follows a power law, like real follow graphs.
+        weights = 1 / np.arange(1, users + 1) ** 0.8
+        weights /= weights.sum()
+        follows = np.column_stack((
+            rng.integers(1, users + 1, edges),
+            rng.choice(np.arange(1, users + 1), edges, p=weights),
+        ))
+        authors = np.unique(follows[:, 1])
+        author_groups = np.column_stack((
+            authors,
+            rng.integers(1, options['groups'] + 1, len(authors)),
+            rng.integers(1, 20, len(authors)),
+        ))
+
+        started = time.perf_counter()
+        user_ids, _, _, _ = score(follows, author_groups,
+                                  top_k=options['top_k'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'edges={edges} users={users} '
+            f'suggestions={len(user_ids)} '
+            f'followers={len(np.unique(user_ids))} '
+            f'time={elapsed:.2f}s'
+        )
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute "who to follow" suggestions for every user.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=None,
+                            help='Suggestions stored per user.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild(top_k=options['top_k'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {count} suggestions '
+            f'in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts.sitemaps import build
+
+
+class Command(BaseCommand):
+    help = 'Write new sitemap chunks, or all of them with --full.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Rewrite every chunk and drop stale ones.')
+
+    def handle(self, *args, **options):
+        written = build(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} sitemap files'))
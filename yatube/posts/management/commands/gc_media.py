@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from posts.media import (collect_originals, collect_records,
+                         collect_thumbnails)
+
+
+class Command(BaseCommand):
+    help = 'Delete images and thumbnails no post uses any more.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only list what would be deleted.')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--grace', type=int, default=None,
+                            help='Keep files younger than this many seconds.')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        kwargs = {
+            'dry_run': dry_run,
+            'batch_size': options['batch_size'],
+            'grace': options['grace'],
+        }
+        verbose = dry_run or options['verbosity'] > 1
+        counts = {}
+        for kind, collect in (('images', collect_originals),
+                              ('thumbnails', collect_thumbnails)):
+            counts[kind] = 0
+            for name in collect(**kwargs):
+                counts[kind] += 1
+                if verbose:
+                    self.stdout.write(name)
+        records = 0 if dry_run else collect_records()
+        verb = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {counts["images"]} images, '
+            f'{counts["thumbnails"]} thumbnails and {records} records'
+        ))
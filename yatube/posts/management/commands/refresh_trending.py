@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import POSTS_KEY, GROUPS_KEY, prune, refresh
+
+
+class Command(BaseCommand):
+    help = 'Rebuild cached trending rankings and drop expired buckets.'
+
+    def handle(self, *args, **options):
+        rankings = refresh()
+        pruned = prune()
+        self.stdout.write(self.style.SUCCESS(
+            f'Ranked {len(rankings[POSTS_KEY])} posts and '
+            f'{len(rankings[GROUPS_KEY])} groups, '
+            f'pruned {pruned} buckets'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.tags import reindex
+
+
+class Command(BaseCommand):
+    help = 'Re-extract hashtags and mentions of every post.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        count = reindex(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Reindexed {count} posts'))
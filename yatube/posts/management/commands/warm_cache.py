@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from posts.warmup import cache_footprint, targets, warm_up
+
+
+class Command(BaseCommand):
+    help = ('Pre-render the first feed pages, every group feed and the most '
+            'followed profiles. Only warms the web servers when the cache '
+            'backend is shared between processes; with the local-memory '
+            'cache use WARM_CACHE_ON_BOOT instead.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=None,
+                            help='Feed pages to render per feed.')
+        parser.add_argument('--profiles', type=int, default=None,
+                            help='Number of top profiles to render.')
+        parser.add_argument('--workers', type=int, default=None)
+
+    def handle(self, *args, **options):
+        before = cache_footprint()
+        results, elapsed = warm_up(
+            targets(options['pages'], options['profiles']),
+            options['workers'],
+        )
+        for url, status, seconds in sorted(results, key=lambda row: -row[2]):
+            self.stdout.write(f'{status} {seconds * 1000:8.1f}ms {url}')
+        failed = sum(status != 200 for _, status, _ in results)
+        self.stdout.write(self.style.SUCCESS(
+            f'Warmed {len(results)} pages ({failed} failed) '
+            f'in {elapsed:.2f}s, '
+            f'{sum(row[2] for row in results):.2f}s of rendering'
+        ))
+        after = cache_footprint()
+        if after is not None:
+            self.stdout.write(
+                f'Cache: {after[0] - before[0]} new keys, '
+                f'{(after[1] - before[1]) / 1024:.1f} KiB '
+                f'(total {after[0]} keys, {after[1] / 1024:.1f} KiB)'
+            )
@@ -0,0 +1,188 @@
+"""Reference counts and garbage collection of stored post images.
+
+Counts are recomputed from the indexed ``image`` columns of ``Post`` and
+``ArchivedPost`` rather than incremented, so they stay right however a
+row changed, including posts moved to the archive. The collectors walk
+the media directory and the thumbnail store in batches and check each
+batch against those same columns; an image is checked once more right
+before it is deleted, since it may have been uploaded again meanwhile.
+"""
+import itertools
+import os
+import time
+
+from django.conf import settings
+from sorl.thumbnail import default as thumbnail_default
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.helpers import deserialize
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix, del_prefix
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+from .models import ArchivedPost, MediaFile, Post, image_storage
+
+
+def count_references(name):
+    return (Post.objects.filter(image=name).count()
+            + ArchivedPost.objects.filter(image=name).count())
+
+
+def update_references(names):
+    """Recount ``names``, return the ones stored for the first time."""
+    new = []
+    for name in set(names):
+        if not name:
+            continue
+        _, created = MediaFile.objects.update_or_create(
+            name=name, defaults={'refs': count_references(name)})
+        if created:
+            new.append(name)
+    return new
+
+
+def live_names(names):
+    """The subset of ``names`` some post, hot or archived, still uses."""
+    return (set(Post.objects.filter(image__in=names)
+                .values_list('image', flat=True))
+            | set(ArchivedPost.objects.filter(image__in=names)
+                  .values_list('image', flat=True)))
+
+
+def delete_image(name):
+    """Delete stored image ``name``, its thumbnails and reference row."""
+    thumbnail_default.kvstore.delete(ImageFile(name, image_storage))
+    image_storage.delete(name)
+    MediaFile.objects.filter(name=name).delete()
+
+
+def walk(storage, directory):
+    """Yield (name, modified timestamp) of files under ``directory``.
+
+    Directories are read one at a time, so memory use is bounded by the
+    largest directory rather than the whole tree.
+    """
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        try:
+            entries = os.scandir(storage.path(current))
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                name = f'{current}/{entry.name}'
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(name)
+                elif entry.is_file(follow_symlinks=False):
+                    yield name, entry.stat().st_mtime
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _cutoff(grace):
+    # Younger files may belong to a post that is not saved yet.
+    grace = settings.GC_GRACE_SECONDS if grace is None else grace
+    return time.time() - grace
+
+
+def _old_files(storage, directory, grace):
+    cutoff = _cutoff(grace)
+    return ((name, mtime) for name, mtime in walk(storage, directory)
+            if mtime < cutoff)
+
+
+def _still_orphan(name, cutoff):
+    try:
+        mtime = os.stat(image_storage.path(name)).st_mtime
+    except FileNotFoundError:
+        return False
+    return mtime < cutoff and not live_names([name])
+
+
+def collect_originals(dry_run=False, batch_size=None, grace=None):
+    """Delete uploaded images no post uses, yield each name removed."""
+    batch_size = batch_size or settings.GC_BATCH_SIZE
+    directory = Post._meta.get_field('image').upload_to.rstrip('/')
+    cutoff = _cutoff(grace)
+    files = _old_files(image_storage, directory, grace)
+    for batch in batches(files, batch_size):
+        names = [name for name, _ in batch]
+        orphans = sorted(set(names) - live_names(names))
+        if dry_run:
+            yield from orphans
+            continue
+        for name in orphans:
+            if _still_orphan(name, cutoff):
+                delete_image(name)
+                yield name
+
+
+def _records(identity, batch_size):
+    """Yield the thumbnail store's (key, value) rows of ``identity``.
+
+    Rows are read in key order, ``batch_size`` at a time.
+    """
+    prefix = add_prefix('', identity)
+    last = prefix
+    while True:
+        rows = list(KVStoreModel.objects.filter(
+            key__startswith=prefix, key__gt=last,
+        ).order_by('key').values_list('key', 'value')[:batch_size])
+        if not rows:
+            return
+        last = rows[-1][0]
+        yield rows
+
+
+def _image_files(keys):
+    """Image records of the thumbnail store under ``keys``, by key."""
+    rows = KVStoreModel.objects.filter(
+        key__in=[add_prefix(key) for key in keys]).values_list('key', 'value')
+    return {del_prefix(key): deserialize_image_file(value)
+            for key, value in rows}
+
+
+def collect_thumbnails(dry_run=False, batch_size=None, grace=None):
+    """Delete thumbnails of images no post uses, yield each name removed.
+
+    Covers the thumbnail store, whose records outlive their sources, and
+    files under THUMBNAIL_PREFIX the store has no record of.
+    """
+    kvstore = thumbnail_default.kvstore
+    batch_size = batch_size or settings.GC_BATCH_SIZE
+    for rows in _records('thumbnails', batch_size):
+        thumbnails = {del_prefix(key): deserialize(value)
+                      for key, value in rows}
+        sources = _image_files(thumbnails)
+        live = live_names([source.name for source in sources.values()])
+        for key, source in sorted(sources.items()):
+            if source.name in live:
+                continue
+            for thumbnail in _image_files(thumbnails[key] or []).values():
+                yield thumbnail.name
+            if not dry_run:
+                kvstore.delete(source)
+    storage = thumbnail_default.storage
+    directory = thumbnail_settings.THUMBNAIL_PREFIX.rstrip('/')
+    for batch in batches(_old_files(storage, directory, grace), batch_size):
+        keys = {add_prefix(ImageFile(name, storage).key): name
+                for name, _ in batch}
+        known = set(KVStoreModel.objects.filter(
+            key__in=keys).values_list('key', flat=True))
+        for key, name in keys.items():
+            if key not in known:
+                if not dry_run:
+                    storage.delete(name)
+                yield name
+
+
+def collect_records():
+    """Drop reference rows of images that lost their last post."""
+    return MediaFile.objects.filter(refs=0).delete()[0]
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.19 on 2026-10-19 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_recommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Activity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Post'), ('group', 'Group'), ('author', 'Author')], max_length=10, verbose_name='Kind')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Object id')),
+                ('bucket', models.DateTimeField(verbose_name='Bucket start')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Events')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['bucket'], name='posts_activ_bucket_b74cdb_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='activity',
+            unique_together={('kind', 'object_id', 'bucket')},
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 2.2.19 on 2026-10-19 19:39
+
+from django.db import migrations
+
+TABLES = (
+    ('posts_post_fts', 'posts_post'),
+    ('posts_comment_fts', 'posts_comment'),
+)
+
+CREATE = (
+    "CREATE VIRTUAL TABLE {fts} USING fts5("
+    "text, content='{table}', content_rowid='id')",
+    "CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER {fts}_au AFTER UPDATE OF text ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END",
+    "INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+)
+
+DROP = (
+    "DROP TRIGGER IF EXISTS {fts}_ai",
+    "DROP TRIGGER IF EXISTS {fts}_ad",
+    "DROP TRIGGER IF EXISTS {fts}_au",
+    "DROP TABLE IF EXISTS {fts}",
+)
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        # Full-text search falls back to LIKE on other databases.
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for fts, table in TABLES:
+            for statement in statements:
+                schema_editor.execute(statement.format(fts=fts, table=table))
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_date_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(CREATE), run(DROP)),
+    ]
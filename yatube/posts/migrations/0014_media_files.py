@@ -0,0 +1,64 @@
+# Generated by Django 2.2.19 on 2026-10-19 19:55
+
+import importlib
+
+import core.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+full_text_search = importlib.import_module(
+    'posts.migrations.0012_full_text_search')
+
+
+def count_references(apps, schema_editor):
+    MediaFile = apps.get_model('posts', 'MediaFile')
+    refs = {}
+    for model in ('Post', 'ArchivedPost'):
+        rows = apps.get_model('posts', model).objects.exclude(
+            image='').values('image').annotate(refs=Count('pk')).order_by()
+        for row in rows.iterator():
+            refs[row['image']] = refs.get(row['image'], 0) + row['refs']
+    MediaFile.objects.bulk_create(
+        (MediaFile(name=name, refs=count) for name, count in refs.items()),
+        batch_size=500)
+
+
+def restore_post_search(apps, schema_editor):
+    """Altering a column remakes posts_post, dropping its FTS triggers."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in full_text_search.DROP + full_text_search.CREATE:
+        schema_editor.execute(statement.format(fts='posts_post_fts',
+                                               table='posts_post'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_post_search),
+        migrations.CreateModel(
+            name='MediaFile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='File name')),
+                ('refs', models.PositiveIntegerField(default=0, verbose_name='References')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Stored')),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='archivedpost',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, storage=core.storage.ContentAddressedStorage(), upload_to='posts/', verbose_name='Image'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, storage=core.storage.ContentAddressedStorage(), upload_to='posts/', verbose_name='Image'),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+        migrations.RunPython(restore_post_search, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.19 on 2026-10-19 19:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_media_files'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionTask',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('user', 'User'), ('group', 'Group')], max_length=10, verbose_name='Kind')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Object id')),
+                ('label', models.CharField(max_length=255, verbose_name='Deleted object')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done')], default='pending', max_length=10, verbose_name='Status')),
+                ('step', models.CharField(blank=True, max_length=50, verbose_name='Current step')),
+                ('deleted', models.PositiveIntegerField(default=0, verbose_name='Rows deleted')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last error')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Finished')),
+            ],
+            options={
+                'ordering': ('-created',),
+            },
+        ),
+    ]
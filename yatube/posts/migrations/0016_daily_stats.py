@@ -0,0 +1,28 @@
+# Generated by Django 2.2.19 on 2026-10-19 20:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_deletion_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('group', 'Group'), ('author', 'Author')], max_length=10, verbose_name='Kind')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Object id')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('posts', models.IntegerField(default=0, verbose_name='Posts')),
+                ('comments', models.IntegerField(default=0, verbose_name='Comments')),
+                ('followers', models.IntegerField(default=0, verbose_name='New followers')),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id', 'day')},
+            },
+        ),
+    ]
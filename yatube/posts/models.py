@@ -1,9 +1,15 @@
 from django.db import models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from pytils.translit import slugify
 
+from core.storage import ContentAddressedStorage
+
 User = get_user_model()
 
+image_storage = ContentAddressedStorage()
+
 
 class Group(models.Model):
     title = models.CharField(verbose_name='Group title',
@@ -33,12 +39,33 @@ class Group(models.Model):
         super().save(*args, **kwargs)
 
 
+class PostQuerySet(models.QuerySet):
+    def with_comment_preview(self):
+        """Annotate comment count and latest comment for feed cards.
+
+        Correlated subqueries keep it one query for the whole page.
+        """
+        comments = self.model._meta.get_field(
+            'comments').related_model.objects.filter(post=OuterRef('pk'))
+        latest = comments.order_by('-created', '-pk')
+        return self.annotate(
+            comments_count=Coalesce(Subquery(
+                comments.order_by().values('post').annotate(
+                    count=Count('pk')).values('count'),
+                output_field=IntegerField()), 0),
+            last_comment_text=Subquery(latest.values('text')[:1]),
+            last_comment_author=Subquery(
+                latest.values('author__username')[:1]),
+        )
+
+
 class Post(models.Model):
     text = models.TextField(verbose_name='Text',
                             help_text='Write post here',
                             )
     pub_date = models.DateTimeField(verbose_name='Publication date',
                                     auto_now_add=True,
+                                    db_index=True,
                                     )
     author = models.ForeignKey(
         User,
@@ -57,9 +84,13 @@ class Post(models.Model):
 
     image = models.ImageField(verbose_name='Image',
                               upload_to='posts/',
-                              blank=True
+                              storage=image_storage,
+                              blank=True,
+                              db_index=True,
                               )
 
+    objects = PostQuerySet.as_manager()
+
     def __str__(self):
         return self.text[:15]
 
@@ -80,9 +111,62 @@ class Comment(models.Model):
                             )
     created = models.DateTimeField(verbose_name='Comment date',
                                    auto_now_add=True,
+                                   db_index=True,
                                    )
 
 
+class Tag(models.Model):
+    name = models.CharField(verbose_name='Tag',
+                            max_length=50,
+                            unique=True,
+                            )
+
+    def __str__(self):
+        return self.name
+
+
+class PostTag(models.Model):
+    """Hashtag of a post, kept in sync by ``posts.tags``.
+
+    ``pub_date`` is copied from the post so a tag feed is a range read
+    of the (tag, pub_date) index.
+    """
+    post = models.ForeignKey(Post,
+                             on_delete=models.CASCADE,
+                             related_name='tags',
+                             verbose_name='Post',
+                             )
+    tag = models.ForeignKey(Tag,
+                            on_delete=models.CASCADE,
+                            related_name='posts',
+                            verbose_name='Tag',
+                            )
+    pub_date = models.DateTimeField(verbose_name='Publication date')
+
+    class Meta:
+        unique_together = ('tag', 'post')
+        indexes = [models.Index(fields=('tag', 'pub_date', 'post'))]
+
+
+class Mention(models.Model):
+    """``@username`` in a post, kept in sync by ``posts.tags``."""
+    post = models.ForeignKey(Post,
+                             on_delete=models.CASCADE,
+                             related_name='mentions',
+                             verbose_name='Post',
+                             )
+    user = models.ForeignKey(User,
+                             on_delete=models.CASCADE,
+                             related_name='mentions',
+                             verbose_name='Mentioned user',
+                             )
+    pub_date = models.DateTimeField(verbose_name='Publication date')
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = [models.Index(fields=('user', 'pub_date', 'post'))]
+
+
 class Follow(models.Model):
     user = models.ForeignKey(User,
                              on_delete=models.CASCADE,
@@ -94,3 +178,193 @@ class Follow(models.Model):
                                related_name='following',
                                verbose_name='Author'
                                )
+
+
+class Recommendation(models.Model):
+    user = models.ForeignKey(User,
+                             on_delete=models.CASCADE,
+                             related_name='recommendations',
+                             verbose_name='User'
+                             )
+    author = models.ForeignKey(User,
+                               on_delete=models.CASCADE,
+                               related_name='recommended_to',
+                               verbose_name='Recommended author'
+                               )
+    score = models.FloatField(verbose_name='Score')
+    rank = models.PositiveSmallIntegerField(verbose_name='Rank')
+
+    class Meta:
+        ordering = ('rank',)
+        unique_together = ('user', 'rank')
+
+
+class Activity(models.Model):
+    POST = 'post'
+    GROUP = 'group'
+    AUTHOR = 'author'
+    KIND_CHOICES = (
+        (POST, 'Post'),
+        (GROUP, 'Group'),
+        (AUTHOR, 'Author'),
+    )
+
+    kind = models.CharField(verbose_name='Kind',
+                            max_length=10,
+                            choices=KIND_CHOICES,
+                            )
+    object_id = models.PositiveIntegerField(verbose_name='Object id')
+    bucket = models.DateTimeField(verbose_name='Bucket start')
+    count = models.PositiveIntegerField(verbose_name='Events', default=0)
+
+    class Meta:
+        unique_together = ('kind', 'object_id', 'bucket')
+        indexes = [models.Index(fields=('bucket',))]
+
+
+class DailyStats(models.Model):
+    """Posts, comments and new followers of a group or author in a day.
+
+    Kept up to date by the post signals, see ``posts.stats``.
+    """
+    GROUP = 'group'
+    AUTHOR = 'author'
+    KIND_CHOICES = (
+        (GROUP, 'Group'),
+        (AUTHOR, 'Author'),
+    )
+
+    kind = models.CharField(verbose_name='Kind',
+                            max_length=10,
+                            choices=KIND_CHOICES,
+                            )
+    object_id = models.PositiveIntegerField(verbose_name='Object id')
+    day = models.DateField(verbose_name='Day')
+    posts = models.IntegerField(verbose_name='Posts', default=0)
+    comments = models.IntegerField(verbose_name='Comments', default=0)
+    # Net change, unfollowing counts against the day it happens.
+    followers = models.IntegerField(verbose_name='New followers', default=0)
+
+    class Meta:
+        unique_together = ('kind', 'object_id', 'day')
+
+
+class ArchivedPost(models.Model):
+    """Post moved out of the hot table by the archive_posts command.
+
+    Keeps the primary key of the original post, so links stay valid.
+    """
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Text')
+    pub_date = models.DateTimeField(verbose_name='Publication date')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Author',
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='archived_posts',
+        verbose_name='Group',
+    )
+    image = models.ImageField(verbose_name='Image',
+                              upload_to='posts/',
+                              storage=image_storage,
+                              blank=True,
+                              db_index=True,
+                              )
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=('pub_date',))]
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class MediaFile(models.Model):
+    """A stored image and how many posts, hot or archived, use it.
+
+    Images are stored by content hash, so one file can back many posts.
+    """
+    name = models.CharField(verbose_name='File name',
+                            max_length=255,
+                            unique=True,
+                            )
+    refs = models.PositiveIntegerField(verbose_name='References', default=0)
+    created = models.DateTimeField(verbose_name='Stored',
+                                   auto_now_add=True,
+                                   )
+
+    def __str__(self):
+        return self.name
+
+
+class DeletionTask(models.Model):
+    """A user or group being deleted in batches, see ``posts.deletion``."""
+    USER = 'user'
+    GROUP = 'group'
+    KIND_CHOICES = (
+        (USER, 'User'),
+        (GROUP, 'Group'),
+    )
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+    )
+
+    kind = models.CharField(verbose_name='Kind',
+                            max_length=10,
+                            choices=KIND_CHOICES,
+                            )
+    object_id = models.PositiveIntegerField(verbose_name='Object id')
+    label = models.CharField(verbose_name='Deleted object', max_length=255)
+    status = models.CharField(verbose_name='Status',
+                              max_length=10,
+                              choices=STATUS_CHOICES,
+                              default=PENDING,
+                              )
+    step = models.CharField(verbose_name='Current step',
+                            max_length=50,
+                            blank=True,
+                            )
+    deleted = models.PositiveIntegerField(verbose_name='Rows deleted',
+                                          default=0)
+    last_error = models.TextField(verbose_name='Last error', blank=True)
+    created = models.DateTimeField(verbose_name='Created',
+                                   auto_now_add=True)
+    finished = models.DateTimeField(verbose_name='Finished',
+                                    blank=True,
+                                    null=True,
+                                    )
+
+    class Meta:
+        ordering = ('-created',)
+
+    def __str__(self):
+        return f'{self.get_kind_display()} {self.label}'
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(ArchivedPost,
+                             on_delete=models.CASCADE,
+                             related_name='comments',
+                             verbose_name='Post',
+                             )
+    author = models.ForeignKey(User,
+                               on_delete=models.CASCADE,
+                               related_name='archived_comments',
+                               verbose_name='Author'
+                               )
+    text = models.TextField(verbose_name='Comment text')
+    created = models.DateTimeField(verbose_name='Comment date')
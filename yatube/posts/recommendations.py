@@ -0,0 +1,156 @@
+"""Offline "who to follow" scoring.
+
+The follow graph is loaded into sparse matrices once and every user is
+scored in a handful of matrix products instead of per-row queries:
+
+* co-follow: authors followed together with the authors a user already
+  follows, normalised by author popularity so that the biggest accounts
+  do not win every slot;
+* shared groups: how much the candidate posts in the groups the user's
+  authors post in.
+"""
+import itertools
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from scipy import sparse
+
+from .models import Follow, Post, Recommendation
+
+GROUP_WEIGHT = 0.3
+NEIGHBOURS = 50
+CHUNK_SIZE = 2000
+
+
+def _pairs(rows):
+    """Turn an iterable of 2-tuples into an (N, 2) int array."""
+    flat = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64)
+    return flat.reshape(-1, 2)
+
+
+def _matrix(rows, cols, shape, data=None):
+    if data is None:
+        data = np.ones(len(rows), dtype=np.float32)
+    matrix = sparse.csr_matrix((data, (rows, cols)), shape=shape,
+                               dtype=np.float32)
+    matrix.sum_duplicates()
+    return matrix
+
+
+def _top_per_row(rows, cols, values, limit):
+    """Keep the ``limit`` highest values of every row, best first."""
+    order = np.lexsort((-values, rows))
+    rows, cols, values = rows[order], cols[order], values[order]
+    first = np.r_[0, np.flatnonzero(np.diff(rows)) + 1]
+    counts = np.diff(np.r_[first, len(rows)])
+    ranks = np.arange(len(rows)) - np.repeat(first, counts)
+    top = ranks < limit
+    return rows[top], cols[top], values[top], ranks[top]
+
+
+def score(follows, author_groups=None, top_k=10, group_weight=GROUP_WEIGHT,
+          neighbours=NEIGHBOURS, chunk_size=CHUNK_SIZE):
+    """Score candidate authors for every follower.
+
+    ``follows`` is an (E, 2) array of (user_id, author_id) pairs,
+    ``author_groups`` an optional (P, 3) array of
+    (author_id, group_id, posts_count). Returns four arrays:
+    user ids, author ids, scores and ranks starting from 0.
+    """
+    follows = np.asarray(follows, dtype=np.int64).reshape(-1, 2)
+    if not len(follows):
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=np.float32), empty
+    size = int(follows.max()) + 1
+    if author_groups is not None and len(author_groups):
+        author_groups = np.asarray(author_groups, dtype=np.int64)
+        size = max(size, int(author_groups[:, 0].max()) + 1)
+    follow_matrix = _matrix(follows[:, 0], follows[:, 1], (size, size))
+    follow_matrix.data[:] = 1
+
+    popularity = np.asarray(follow_matrix.sum(axis=0)).ravel()
+    inverse_root = np.zeros_like(popularity)
+    np.divide(1, np.sqrt(popularity), out=inverse_root,
+              where=popularity > 0)
+    norm = sparse.diags(inverse_root)
+    co_follow = (norm @ (follow_matrix.T @ follow_matrix) @ norm).tocoo()
+    # Only the strongest neighbours of each author are kept, otherwise
+    # followers of popular authors would get every author as a candidate.
+    off_diagonal = co_follow.row != co_follow.col
+    rows, cols, values, _ = _top_per_row(co_follow.row[off_diagonal],
+                                         co_follow.col[off_diagonal],
+                                         co_follow.data[off_diagonal],
+                                         neighbours)
+    co_follow = _matrix(rows, cols, (size, size), values)
+
+    groups = None
+    if author_groups is not None and len(author_groups):
+        groups = _matrix(author_groups[:, 0], author_groups[:, 1],
+                         (size, int(author_groups[:, 1].max()) + 1),
+                         author_groups[:, 2].astype(np.float32))
+        totals = np.asarray(groups.sum(axis=1)).ravel()
+        inverse = np.zeros_like(totals)
+        np.divide(1, totals, out=inverse, where=totals > 0)
+        groups = (sparse.diags(inverse) @ groups).tocsr()
+
+    followers = np.unique(follows[:, 0])
+    results = []
+    for start in range(0, len(followers), chunk_size):
+        users = followers[start:start + chunk_size]
+        followed = follow_matrix[users]
+        candidates = (followed @ co_follow).tocoo()
+        rows, cols, values = candidates.row, candidates.col, candidates.data
+        if groups is not None and len(rows):
+            interests = followed @ groups
+            values = values + group_weight * np.asarray(
+                interests[rows].multiply(groups[cols]).sum(axis=1)
+            ).ravel()
+        user_ids = users[rows]
+        keep = ((values > 0)
+                & (user_ids != cols)
+                & (np.asarray(followed[rows, cols]).ravel() == 0))
+        results.append(_top_per_row(user_ids[keep], cols[keep],
+                                    values[keep], top_k))
+
+    return tuple(np.concatenate(parts) for parts in zip(*results))
+
+
+def load_graph():
+    """Read the follow graph and per-author group activity."""
+    follows = _pairs(
+        Follow.objects.values_list('user_id', 'author_id').iterator()
+    )
+    author_groups = np.fromiter(
+        itertools.chain.from_iterable(
+            Post.objects.filter(group__isnull=False)
+            .values_list('author_id', 'group_id')
+            .annotate(posts_count=Count('id'))
+            .order_by()
+            .iterator()
+        ),
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    return follows, author_groups
+
+
+def rebuild(top_k=None, batch_size=1000):
+    """Recompute and store suggestions for every user, return row count."""
+    if top_k is None:
+        top_k = settings.RECOMMENDATIONS_TOP_K
+    user_ids, author_ids, scores, ranks = score(*load_graph(), top_k=top_k)
+    rows = (
+        Recommendation(user_id=int(user), author_id=int(author),
+                       score=float(value), rank=int(rank))
+        for user, author, value, rank
+        in zip(user_ids, author_ids, scores, ranks)
+    )
+    with transaction.atomic():
+        Recommendation.objects.all().delete()
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            Recommendation.objects.bulk_create(batch)
+    return len(user_ids)
@@ -0,0 +1,82 @@
+"""Keyset cursors for infinite scroll.
+
+A cursor names the last post shown as ``<pub_date in microseconds>.<pk>``;
+the next batch is whatever comes after it in (-pub_date, -pk) order. That
+costs an index range scan however deep the reader has scrolled, where
+OFFSET pagination rereads every skipped row. Like ``ArchiveFeed``, a
+batch that runs out of hot posts carries on into the archive.
+"""
+import datetime as dt
+
+from django.db.models import Q
+
+EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+ORDERING = ('-pub_date', '-pk')
+
+
+def encode_cursor(pub_date, pk):
+    delta = pub_date - EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 10 ** 6
+    return f'{micros + delta.microseconds}.{pk}'
+
+
+def decode_cursor(cursor):
+    """Return (pub_date, pk), or None for a missing or malformed cursor."""
+    try:
+        micros, pk = (int(part) for part in cursor.split('.'))
+    except (AttributeError, ValueError):
+        return None
+    return EPOCH + dt.timedelta(microseconds=micros), pk
+
+
+def after(queryset, cursor, pk_field='pk'):
+    if cursor is None:
+        return queryset
+    pub_date, pk = cursor
+    return queryset.filter(
+        Q(pub_date__lt=pub_date)
+        | Q(pub_date=pub_date, **{f'{pk_field}__lt': pk}))
+
+
+def next_batch(hot, archived, cursor, size):
+    """Return up to ``size`` posts after ``cursor`` and the next cursor.
+
+    The next cursor is None once the feed is exhausted.
+    """
+    cursor = decode_cursor(cursor)
+    posts = list(after(hot.order_by(*ORDERING), cursor)[:size + 1])
+    if len(posts) <= size:
+        # Archived posts are all older than hot ones, so the same cursor
+        # picks up where the hot part left off.
+        posts.extend(after(archived.order_by(*ORDERING), cursor)
+                     [:size + 1 - len(posts)])
+    if len(posts) > size:
+        last = posts[size - 1]
+        return posts[:size], encode_cursor(last.pub_date, last.pk)
+    return posts, None
+
+
+def next_index_batch(entries, cursor, size):
+    """Like ``next_batch`` over ``PostTag`` or ``Mention`` rows.
+
+    Returns the post ids of the batch and the next cursor.
+    """
+    rows = list(
+        after(entries, decode_cursor(cursor), 'post_id')
+        .order_by('-pub_date', '-post_id')
+        .values_list('post_id', 'pub_date')[:size + 1]
+    )
+    if len(rows) > size:
+        pk, pub_date = rows[size - 1]
+        return [pk for pk, _ in rows[:size]], encode_cursor(pub_date, pk)
+    return [pk for pk, _ in rows], None
+
+
+def page_cursor(page):
+    """Cursor continuing after a paginator page, None on the last page."""
+    if not page.has_next():
+        return None
+    posts = list(page)
+    if not posts:
+        return None
+    return encode_cursor(posts[-1].pub_date, posts[-1].pk)
@@ -0,0 +1,26 @@
+import re
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+WORD = re.compile(r'\w+')
+
+
+def full_text_filter(queryset, term):
+    """Filter posts or comments whose text contains every word of ``term``.
+
+    On SQLite the lookup goes through the FTS5 index kept in sync by
+    triggers (see migration 0012), elsewhere it falls back to LIKE.
+    """
+    words = WORD.findall(term)
+    if not words:
+        return queryset
+    if connections[queryset.db].vendor != 'sqlite':
+        for word in words:
+            queryset = queryset.filter(text__icontains=word)
+        return queryset
+    table = f'{queryset.model._meta.db_table}_fts'
+    match = ' '.join(f'"{word}"*' for word in words)
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {table} WHERE {table} MATCH %s', (match,)
+    ))
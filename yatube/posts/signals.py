@@ -0,0 +1,208 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.surrogate import purge_on_commit
+from jobs.queue import enqueue
+from .feeds import (AUTHOR_ID_KEY, GROUP_ID_KEY, author_scopes, bump_versions,
+                    forget_scopes, post_scopes)
+from .media import update_references
+from . import detail, stats
+from .models import (ArchivedComment, ArchivedPost, Comment, DailyStats,
+                     Follow, Group, Post)
+from .sitemaps import schedule_update
+from .tags import index_posts
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def track_image(sender, instance, **kwargs):
+    """Recount image references, prepare images not seen before.
+
+    A repost of a stored image shares its file and thumbnails.
+    """
+    old_image = getattr(instance, '_old_image', None)
+    image = instance.image.name if instance.image else ''
+    if image == old_image and kwargs.get('signal') is post_save:
+        return
+    if image in update_references([image, old_image]):
+        enqueue('posts.tasks.prepare_image', instance.pk, queue='images')
+
+
+@receiver(post_save, sender=Post)
+def index_tags(sender, instance, **kwargs):
+    index_posts([instance])
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_values(sender, instance, **kwargs):
+    """Keep the group a post is moved out of, its feed changes too.
+
+    The replaced image is kept as well, for reference counting.
+    """
+    instance._old_group_id = None
+    instance._old_image = None
+    if instance.pk:
+        instance._old_group_id, instance._old_image = Post.objects.filter(
+            pk=instance.pk).values_list('group_id', 'image').first() or (
+            None, None)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_feed_versions(sender, instance, **kwargs):
+    scopes = post_scopes(instance)
+    old_group_id = getattr(instance, '_old_group_id', None)
+    if old_group_id and old_group_id != instance.group_id:
+        scopes.append(f'group:{old_group_id}')
+    bump_versions(scopes)
+    purge_on_commit(scopes + [f'post:{instance.pk}'])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_post(sender, instance, **kwargs):
+    purge_on_commit([f'post:{instance.post_id}'])
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def purge_group(sender, instance, **kwargs):
+    detail.forget_group(instance.pk)
+    purge_on_commit([f'group:{instance.pk}'])
+
+
+@receiver(post_save, sender=Group)
+def bump_group_feed_version(sender, instance, created, **kwargs):
+    # The feed title and description come from the group.
+    if not created:
+        bump_versions([f'group:{instance.pk}'])
+
+
+@receiver(pre_save, sender=Group)
+def remember_old_slug(sender, instance, **kwargs):
+    instance._old_slug = Group.objects.filter(pk=instance.pk).values_list(
+        'slug', flat=True).first() if instance.pk else None
+
+
+@receiver(pre_save, sender=User)
+def remember_old_username(sender, instance, update_fields=None, **kwargs):
+    # Logins save last_login only, no need to look the name up then.
+    instance._old_username = None
+    if instance.pk and (update_fields is None
+                        or 'username' in update_fields):
+        instance._old_username = User.objects.filter(
+            pk=instance.pk).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def forget_group_scope(sender, instance, **kwargs):
+    forget_scopes(GROUP_ID_KEY, [
+        instance.slug, getattr(instance, '_old_slug', None)])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_author_scope(sender, instance, **kwargs):
+    forget_scopes(AUTHOR_ID_KEY, [
+        instance.username, getattr(instance, '_old_username', None)])
+
+
+@receiver(post_save, sender=User)
+def bump_author_feed_versions(sender, instance, created, **kwargs):
+    """Feeds show the username: in the author's feed title and by posts."""
+    old_username = getattr(instance, '_old_username', None)
+    if created or old_username is None:
+        return
+    scopes = [f'author:{instance.pk}']
+    if old_username != instance.username:
+        scopes = author_scopes(instance.pk)
+    bump_versions(scopes)
+    purge_on_commit(scopes)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=ArchivedPost)
+def forget_post_detail(sender, instance, **kwargs):
+    detail.forget_post(instance.pk)
+    if kwargs.get('created', True):
+        detail.forget_author(instance.author_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=ArchivedComment)
+def forget_comment_post_detail(sender, instance, **kwargs):
+    detail.forget_post(instance.post_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Group)
+@receiver(post_save, sender=User)
+def update_sitemaps(sender, instance, created, **kwargs):
+    if created:
+        schedule_update()
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    if created:
+        stats.count_post(instance, 1)
+    elif instance._old_group_id != instance.group_id:
+        stats.move_post(instance, instance._old_group_id)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    # Archived posts keep counting, archive_posts copies them first.
+    if not ArchivedPost.objects.filter(pk=instance.pk).exists():
+        stats.count_post(instance, -1)
+
+
+@receiver(post_delete, sender=ArchivedPost)
+def count_deleted_archived_post(sender, instance, **kwargs):
+    stats.count_post(instance, -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    if created:
+        stats.count_comment(instance, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    if not ArchivedComment.objects.filter(pk=instance.pk).exists():
+        stats.count_comment(instance, -1)
+
+
+@receiver(post_delete, sender=ArchivedComment)
+def count_deleted_archived_comment(sender, instance, **kwargs):
+    stats.count_comment(instance, -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, **kwargs):
+    if created:
+        stats.count_follow(instance, 1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_unfollow(sender, instance, **kwargs):
+    stats.count_follow(instance, -1)
+
+
+@receiver(post_delete, sender=Group)
+def drop_group_stats(sender, instance, **kwargs):
+    DailyStats.objects.filter(kind=DailyStats.GROUP,
+                              object_id=instance.pk).delete()
+
+
+@receiver(post_delete, sender=User)
+def drop_author_stats(sender, instance, **kwargs):
+    DailyStats.objects.filter(kind=DailyStats.AUTHOR,
+                              object_id=instance.pk).delete()
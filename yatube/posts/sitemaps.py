@@ -0,0 +1,226 @@
+"""Sitemaps written to files in fixed-size chunks.
+
+Each section (posts, archived posts, groups, profiles) is walked by
+primary key in small keyset batches and written as
+sitemap-<section>-<n>.xml files of at most SITEMAP_URLS_PER_FILE URLs,
+so memory use does not depend on table size. In the index, a chunk of
+posts is dated by its newest post, so crawlers only refetch chunks
+that gained one.
+The pk a chunk starts after is kept in state.json; an incremental update
+only rewrites the last chunk of each section and appends new ones, which
+is all that new rows can change. Deleted rows linger in older chunks
+until the next full rebuild, and so do archived posts, which only show up
+in the archive section after one.
+"""
+import json
+import os
+import tempfile
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+from django.http import FileResponse, Http404
+from django.urls import reverse
+
+from jobs.models import Job
+from jobs.queue import enqueue
+from .models import ArchivedPost, Group, Post
+
+User = get_user_model()
+
+BATCH_SIZE = 2000
+INDEX = 'sitemap.xml'
+STATE = 'state.json'
+UPDATE_TASK = 'posts.sitemaps.update'
+
+SECTIONS = {
+    'posts': (
+        lambda: Post.objects.values_list('pk', 'pub_date'),
+        lambda pk, pub_date: (reverse('posts:post_detail', args=[pk]),
+                              pub_date),
+    ),
+    'archive': (
+        lambda: ArchivedPost.objects.values_list('pk', 'pub_date'),
+        lambda pk, pub_date: (reverse('posts:post_detail', args=[pk]),
+                              pub_date),
+    ),
+    'groups': (
+        lambda: Group.objects.values_list('pk', 'slug'),
+        lambda pk, slug: (reverse('posts:group_list', args=[slug]), None),
+    ),
+    'profiles': (
+        lambda: User.objects.filter(is_active=True).values_list(
+            'pk', 'username'),
+        lambda pk, username: (reverse('posts:profile', args=[username]),
+                              None),
+    ),
+}
+# Sections whose chunks carry a <lastmod> in the index.
+DATED = {'posts': Post, 'archive': ArchivedPost}
+
+
+def _path(name):
+    return os.path.join(settings.SITEMAP_ROOT, name)
+
+
+def _write(name, lines):
+    """Write atomically, so readers never see a half-written file."""
+    path = _path(name)
+    # A unique name per writer, concurrent rebuilds can't share it.
+    with tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', dir=os.path.dirname(path),
+            prefix=name, suffix='.tmp', delete=False) as file:
+        try:
+            for line in lines:
+                file.write(line)
+        except BaseException:
+            file.close()
+            os.remove(file.name)
+            raise
+    os.replace(file.name, path)
+
+
+def _rows(section, after):
+    """Yield rows of ``section`` with pk > ``after`` in keyset batches."""
+    queryset, _ = SECTIONS[section]
+    while True:
+        batch = list(queryset().filter(pk__gt=after).order_by('pk')
+                     [:BATCH_SIZE])
+        if not batch:
+            return
+        yield from batch
+        after = batch[-1][0]
+
+
+def _write_chunk(section, number, after):
+    """Write one chunk starting after pk ``after``.
+
+    Returns (rows written, last pk written).
+    """
+    _, url = SECTIONS[section]
+    limit = settings.SITEMAP_URLS_PER_FILE
+    written = {'count': 0, 'last': after}
+
+    def lines():
+        yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+               '<urlset '
+               'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for row in _rows(section, after):
+            location, lastmod = url(*row)
+            entry = f'<url><loc>{escape(settings.SITE_URL + location)}</loc>'
+            if lastmod is not None:
+                entry += f'<lastmod>{lastmod.date().isoformat()}</lastmod>'
+            yield entry + '</url>\n'
+            written['count'] += 1
+            written['last'] = row[0]
+            if written['count'] == limit:
+                break
+        yield '</urlset>\n'
+
+    _write(f'sitemap-{section}-{number}.xml', lines())
+    return written['count'], written['last']
+
+
+def _load_state():
+    try:
+        with open(_path(STATE), encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def build(full=False):
+    """Write new and changed chunks, everything with ``full``.
+
+    Returns the number of chunk files written.
+    """
+    os.makedirs(settings.SITEMAP_ROOT, exist_ok=True)
+    old_state = {} if full else _load_state()
+    state = {}
+    written = 0
+    for section, (queryset, _) in SECTIONS.items():
+        starts = old_state.get(section, [0])
+        number = len(starts) - 1
+        after = starts[number]
+        starts = starts[:number]
+        while True:
+            starts.append(after)
+            count, after = _write_chunk(section, number, after)
+            written += 1
+            if (count < settings.SITEMAP_URLS_PER_FILE
+                    or not queryset().filter(pk__gt=after).exists()):
+                break
+            number += 1
+        state[section] = starts
+    _write(STATE, [json.dumps(state)])
+    _write_index(state)
+    if full:
+        _remove_stale_chunks(state)
+    return written
+
+
+def _chunk_lastmod(section, starts, number):
+    """Publication time of the newest post in a chunk, None if undated."""
+    model = DATED.get(section)
+    if model is None:
+        return None
+    rows = model.objects.filter(pk__gt=starts[number])
+    if number + 1 < len(starts):
+        rows = rows.filter(pk__lte=starts[number + 1])
+    return rows.aggregate(newest=Max('pub_date'))['newest']
+
+
+def _write_index(state):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+             '<sitemapindex '
+             'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for section, starts in state.items():
+        for number in range(len(starts)):
+            location = reverse('posts:sitemap_chunk',
+                               args=[f'sitemap-{section}-{number}.xml'])
+            entry = (f'<sitemap><loc>{escape(settings.SITE_URL + location)}'
+                     '</loc>')
+            lastmod = _chunk_lastmod(section, starts, number)
+            if lastmod is not None:
+                entry += f'<lastmod>{lastmod.date().isoformat()}</lastmod>'
+            lines.append(entry + '</sitemap>\n')
+    lines.append('</sitemapindex>\n')
+    _write(INDEX, lines)
+
+
+def _remove_stale_chunks(state):
+    current = {f'sitemap-{section}-{number}.xml'
+               for section, starts in state.items()
+               for number in range(len(starts))}
+    for name in os.listdir(settings.SITEMAP_ROOT):
+        if (name.startswith('sitemap-') and name.endswith('.xml')
+                and name not in current):
+            os.remove(_path(name))
+
+
+def update():
+    """Job entry point for incremental updates."""
+    build()
+
+
+def schedule_update():
+    """Queue one delayed incremental update, unless one is pending already.
+
+    Bursts of new posts are folded into a single rewrite of the tail.
+    """
+    if not Job.objects.filter(task=UPDATE_TASK, status=Job.QUEUED).exists():
+        enqueue(UPDATE_TASK, delay=settings.SITEMAP_UPDATE_DELAY,
+                queue='sitemaps')
+
+
+def sitemap_file(request, name=INDEX):
+    if name != INDEX and not (name.startswith('sitemap-')
+                              and name.endswith('.xml')
+                              and '/' not in name):
+        raise Http404
+    try:
+        return FileResponse(open(_path(name), 'rb'),
+                            content_type='application/xml')
+    except FileNotFoundError:
+        raise Http404
@@ -0,0 +1,194 @@
+"""Daily activity rollups of groups and authors.
+
+The post signals add every new post, comment and follow to the
+``DailyStats`` row of its day and take deletions back out, so the
+statistics blocks and their JSON endpoints read a month of rollup rows
+instead of counting ``Post`` and ``Comment``. Posts and comments moved
+to the archive keep counting until they are deleted from there. A post
+moved to another group takes its comments along. ``backfill``
+recomputes posts and comments from both tables; follows carry no date,
+so follower counts only accumulate from the moment rollups are kept.
+"""
+import datetime as dt
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ArchivedComment, ArchivedPost, Comment, DailyStats, Post
+
+FIELDS = {
+    DailyStats.GROUP: ('posts', 'comments'),
+    DailyStats.AUTHOR: ('posts', 'comments', 'followers'),
+}
+
+
+def add(kind, object_id, day, **deltas):
+    """Add ``deltas`` to the counters of the object's row for ``day``."""
+    lookup = {'kind': kind, 'object_id': object_id, 'day': day}
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    if DailyStats.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            DailyStats.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        DailyStats.objects.filter(**lookup).update(**changes)
+
+
+def count_post(post, delta):
+    day = timezone.localdate(post.pub_date)
+    add(DailyStats.AUTHOR, post.author_id, day, posts=delta)
+    if post.group_id:
+        add(DailyStats.GROUP, post.group_id, day, posts=delta)
+
+
+def move_post(post, old_group_id):
+    """Count an edited post and its comments under its new group."""
+    moves = [(timezone.localdate(post.pub_date), {'posts': 1})]
+    comments = defaultdict(int)
+    for created in Comment.objects.filter(post_id=post.pk).values_list(
+            'created', flat=True).iterator():
+        comments[timezone.localdate(created)] += 1
+    moves.extend((day, {'comments': count})
+                 for day, count in comments.items())
+    for day, deltas in moves:
+        if old_group_id:
+            add(DailyStats.GROUP, old_group_id, day,
+                **{field: -delta for field, delta in deltas.items()})
+        if post.group_id:
+            add(DailyStats.GROUP, post.group_id, day, **deltas)
+
+
+def count_comment(comment, delta):
+    day = timezone.localdate(comment.created)
+    add(DailyStats.AUTHOR, comment.author_id, day, comments=delta)
+    posts = (ArchivedPost if isinstance(comment, ArchivedComment)
+             else Post).objects
+    group_id = posts.filter(pk=comment.post_id).values_list(
+        'group_id', flat=True).first()
+    if group_id:
+        add(DailyStats.GROUP, group_id, day, comments=delta)
+
+
+def count_follow(follow, delta):
+    add(DailyStats.AUTHOR, follow.author_id, timezone.localdate(),
+        followers=delta)
+
+
+def summary(kind, object_id, days=None):
+    """Counters of the last ``days`` days, oldest first, and their sums."""
+    days = days or settings.STATS_DAYS
+    fields = FIELDS[kind]
+    first = timezone.localdate() - dt.timedelta(days=days - 1)
+    rows = {
+        row['day']: row
+        for row in DailyStats.objects.filter(
+            kind=kind, object_id=object_id, day__gte=first,
+        ).values('day', *fields)
+    }
+    series = []
+    for offset in range(days):
+        day = first + dt.timedelta(days=offset)
+        row = rows.get(day, {})
+        series.append({'day': day,
+                       **{field: row.get(field, 0) for field in fields}})
+    totals = {field: sum(entry[field] for entry in series)
+              for field in fields}
+    return {'days': series, 'totals': totals}
+
+
+def _daily_counts(queryset, date_field, owner_field):
+    """(owner id, day, count) rows, grouped in the database."""
+    return (queryset.exclude(**{f'{owner_field}__isnull': True})
+            .annotate(day=TruncDate(date_field))
+            .values_list(owner_field, 'day')
+            .annotate(count=Count('pk')).order_by().iterator())
+
+
+SOURCES = (
+    (Post, 'pub_date', 'posts'),
+    (ArchivedPost, 'pub_date', 'posts'),
+    (Comment, 'created', 'comments'),
+    (ArchivedComment, 'created', 'comments'),
+)
+
+
+def _start_of(day):
+    return timezone.make_aware(dt.datetime.combine(day, dt.time.min))
+
+
+def _count_days(first, last):
+    """Counters of the days ``first`` to ``last`` included, by row key."""
+    counts = defaultdict(lambda: defaultdict(int))
+    period = {'gte': _start_of(first),
+              'lt': _start_of(last + dt.timedelta(days=1))}
+    for model, date_field, field in SOURCES:
+        queryset = model.objects.filter(**{
+            f'{date_field}__{lookup}': value
+            for lookup, value in period.items()})
+        for kind, owner_field in ((DailyStats.AUTHOR, 'author'),
+                                  (DailyStats.GROUP, 'group')):
+            if field == 'comments' and kind == DailyStats.GROUP:
+                owner_field = 'post__group'
+            for owner, day, count in _daily_counts(
+                    queryset, date_field, owner_field):
+                counts[kind, owner, day][field] += count
+    return counts
+
+
+def _replace_days(first, last, counts, batch_size):
+    """Swap the rollups of ``first`` to ``last`` for ``counts``.
+
+    Follower counts already recorded are kept. Returns the rows written.
+    """
+    with transaction.atomic():
+        rows = DailyStats.objects.filter(day__gte=first, day__lte=last)
+        for kind, owner, day, followers in rows.exclude(
+                followers=0).values_list(
+                    'kind', 'object_id', 'day', 'followers').iterator():
+            counts[kind, owner, day]['followers'] = followers
+        rows.delete()
+        DailyStats.objects.bulk_create(
+            (DailyStats(kind=kind, object_id=owner, day=day, **values)
+             for (kind, owner, day), values in counts.items()),
+            batch_size=batch_size,
+        )
+    return len(counts)
+
+
+def backfill(batch_size=None, days=None):
+    """Rebuild every rollup from posts and comments, return the row count.
+
+    Past days only change when rows are deleted, so they are counted
+    outside any transaction, ``days`` days at a time, and each batch is
+    swapped in with a short transaction. Only today gets new posts and
+    comments; it is counted under the write lock, so increments written
+    by the signals meanwhile wait instead of being lost.
+    """
+    batch_size = batch_size or settings.STATS_BATCH_SIZE
+    days = days or settings.STATS_BACKFILL_DAYS
+    today = timezone.localdate()
+    starts = [DailyStats.objects.aggregate(first=Min('day'))['first']]
+    for model, date_field, _ in SOURCES:
+        start = model.objects.aggregate(first=Min(date_field))['first']
+        if start is not None:
+            starts.append(timezone.localdate(start))
+    first = min([day for day in starts if day is not None] or [today])
+    written = 0
+    while first < today:
+        last = min(first + dt.timedelta(days=days - 1),
+                   today - dt.timedelta(days=1))
+        written += _replace_days(first, last, _count_days(first, last),
+                                 batch_size)
+        first = last + dt.timedelta(days=1)
+    with transaction.atomic():
+        # A write first takes the write lock for the one day counted.
+        DailyStats.objects.filter(day__gte=today).update(posts=0,
+                                                          comments=0)
+        written += _replace_days(today, today, _count_days(today, today),
+                                 batch_size)
+    return written
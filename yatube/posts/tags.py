@@ -0,0 +1,81 @@
+"""Hashtags and mentions extracted from post text.
+
+Every saved post has its ``#tags`` and ``@username`` mentions written to
+``PostTag`` and ``Mention``, which carry the post's ``pub_date``; a tag
+or mention feed is then a range read of a (tag, pub_date) or
+(user, pub_date) index instead of a ``LIKE`` scan of every post. Rows go
+with their post, so archived posts drop out of these feeds.
+"""
+import re
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from .models import Mention, Post, PostTag, Tag
+
+User = get_user_model()
+
+HASHTAG = re.compile(r'(?<![\w#&])#(\w{1,50})')
+MENTION = re.compile(r'(?<![\w@])@([\w.@+-]{1,150})')
+
+
+def extract(text):
+    """Return (tag names, usernames) mentioned in ``text``."""
+    tags = {name.lower() for name in HASHTAG.findall(text)}
+    # A sentence may end right after a mention.
+    usernames = {name.rstrip('.') for name in MENTION.findall(text)}
+    return tags, usernames
+
+
+def get_tags(names):
+    """Map tag names to Tag rows, creating the missing ones."""
+    tags = Tag.objects.in_bulk(names, field_name='name')
+    missing = set(names) - set(tags)
+    if missing:
+        Tag.objects.bulk_create((Tag(name=name) for name in missing),
+                                ignore_conflicts=True)
+        tags.update(Tag.objects.in_bulk(missing, field_name='name'))
+    return tags
+
+
+def index_posts(posts):
+    """Rewrite tag and mention rows of ``posts`` in a few queries."""
+    extracted = {post.pk: (post, *extract(post.text)) for post in posts}
+    if not extracted:
+        return
+    tags = get_tags({name for _, names, _ in extracted.values()
+                     for name in names})
+    users = dict(User.objects.filter(username__in={
+        username for _, _, usernames in extracted.values()
+        for username in usernames
+    }).values_list('username', 'pk'))
+    with transaction.atomic():
+        PostTag.objects.filter(post__in=extracted).delete()
+        Mention.objects.filter(post__in=extracted).delete()
+        PostTag.objects.bulk_create(
+            PostTag(post_id=pk, tag=tags[name], pub_date=post.pub_date)
+            for pk, (post, names, _) in extracted.items()
+            for name in names
+        )
+        Mention.objects.bulk_create(
+            Mention(post_id=pk, user_id=users[username],
+                    pub_date=post.pub_date)
+            for pk, (post, _, usernames) in extracted.items()
+            for username in usernames if username in users
+        )
+
+
+def reindex(batch_size=None):
+    """Re-extract every post, walking by pk; return the number of posts."""
+    batch_size = batch_size or settings.TAGS_BATCH_SIZE
+    last = 0
+    total = 0
+    while True:
+        posts = list(Post.objects.filter(pk__gt=last).order_by('pk')
+                     .only('pk', 'text', 'pub_date')[:batch_size])
+        if not posts:
+            return total
+        index_posts(posts)
+        total += len(posts)
+        last = posts[-1].pk
@@ -0,0 +1,49 @@
+from django.db import transaction
+from sorl.thumbnail import get_thumbnail
+
+from jobs.queue import enqueue
+from .images import normalize
+from .media import delete_image, live_names, update_references
+from .models import ArchivedPost, Post
+
+# Must match the {% thumbnail %} tags in the post templates, otherwise the
+# pre-generated files are never looked up.
+THUMBNAIL_GEOMETRY = '960x339'
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+
+def generate_thumbnails(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None and post.image:
+        get_thumbnail(post.image, THUMBNAIL_GEOMETRY, **THUMBNAIL_OPTIONS)
+
+
+def prepare_image(post_id):
+    """Normalize a new upload, or thumbnail it if it is normal already.
+
+    Every post using the upload is pointed at the normalized file, which
+    queues this job again for it, and the upload itself is deleted, so
+    its metadata is not served any longer.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    name = post.image.name
+    normalized = normalize(name)
+    if normalized is None or normalized == name:
+        generate_thumbnails(post_id)
+        return
+    with transaction.atomic():
+        # Read again: posts whose image was replaced meanwhile keep it.
+        for post in Post.objects.select_for_update().filter(image=name):
+            post.image.name = normalized
+            post.save(update_fields=['image'])
+        ArchivedPost.objects.filter(image=name).update(image=normalized)
+        update_references([name, normalized])
+    reposted = Post.objects.filter(image=name).values_list(
+        'pk', flat=True).first()
+    if reposted is not None:
+        # Uploaded again since, that post needs the same treatment.
+        enqueue('posts.tasks.prepare_image', reposted, queue='images')
+    elif not live_names([name]):
+        delete_image(name)
@@ -0,0 +1,25 @@
+from django import template
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from posts.tags import HASHTAG, MENTION
+
+register = template.Library()
+
+
+@register.filter
+def link_tags(text):
+    """Escape ``text`` and link its hashtags and mentions."""
+    def tag_link(match):
+        url = reverse('posts:tag', args=[match.group(1).lower()])
+        return f'<a href="{url}">{match.group(0)}</a>'
+
+    def mention_link(match):
+        username = match.group(1).rstrip('.')
+        url = reverse('posts:profile', args=[username])
+        rest = match.group(1)[len(username):]
+        return f'<a href="{url}">@{username}</a>{rest}'
+
+    text = HASHTAG.sub(tag_link, escape(text))
+    return mark_safe(MENTION.sub(mention_link, text))
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.paginator import EstimatedCountPaginator
+from posts.models import Comment, DailyStats, Group, Post
+from posts.search import full_text_filter
+
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        group = Group.objects.create(title='Group', slug='group',
+                                     description='Group description')
+        for i in range(5):
+            post = Post.objects.create(text=f'Ordinary post {i}',
+                                       author=admin_user, group=group)
+        Post.objects.create(text='Spam offer inside', author=admin_user)
+        Comment.objects.create(post=post, author=admin_user,
+                               text='Helpful comment')
+
+    def setUp(self):
+        self.admin_client = Client()
+        self.admin_client.force_login(User.objects.get(username='admin'))
+
+    def test_changelists_open(self):
+        for model in ('post', 'group', 'comment', 'follow'):
+            with self.subTest(model=model):
+                response = self.admin_client.get(
+                    reverse(f'admin:posts_{model}_changelist'))
+                self.assertEqual(response.status_code, 200)
+
+    def test_full_text_search(self):
+        """Search matches word prefixes through the FTS index."""
+        found = full_text_filter(Post.objects.all(), 'spa')
+        self.assertEqual([post.text for post in found], ['Spam offer inside'])
+        Post.objects.filter(text='Spam offer inside').update(text='Clean')
+        self.assertFalse(full_text_filter(Post.objects.all(), 'spam'))
+        response = self.admin_client.get(
+            reverse('admin:posts_comment_changelist') + '?q=helpful')
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_unfiltered_count_is_estimated(self):
+        last_pk = Post.objects.last().pk
+        paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 100)
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.count, last_pk)
+        paginator = EstimatedCountPaginator(
+            Post.objects.filter(group__isnull=True).order_by('pk'), 100)
+        self.assertEqual(paginator.count, 1)
+
+    def test_batch_actions(self):
+        changelist = reverse('admin:posts_post_changelist')
+        grouped = Post.objects.filter(group__isnull=False)
+        self.admin_client.post(changelist, {
+            'action': 'remove_from_group',
+            '_selected_action': list(grouped.values_list('pk', flat=True)),
+        })
+        self.assertFalse(grouped.exists())
+        self.assertFalse(DailyStats.objects.filter(
+            kind=DailyStats.GROUP).exclude(posts=0).exists())
+        self.admin_client.post(changelist, {
+            'action': 'delete_in_batches',
+            '_selected_action': list(
+                Post.objects.values_list('pk', flat=True)),
+        })
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Comment.objects.exists())
@@ -0,0 +1,78 @@
+import datetime as dt
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.archive import archive
+from posts.models import (ArchivedComment, ArchivedPost, Comment, Follow,
+                          Group, Post)
+
+User = get_user_model()
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='authoruser')
+        group = Group.objects.create(title='Group', slug='group',
+                                     description='Group description')
+        for i in range(15):
+            Post.objects.create(text=f'Post {i}', author=author, group=group)
+        old = Post.objects.order_by('pk')[:8]
+        Post.objects.filter(pk__in=[post.pk for post in old]).update(
+            pub_date=timezone.now() - dt.timedelta(days=400))
+        Comment.objects.create(post=old[0], author=author, text='Old comment')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_old_posts_move_to_archive(self):
+        """Posts and comments past the cutoff leave the hot tables."""
+        self.assertEqual(archive(batch_size=3), 8)
+        self.assertEqual(Post.objects.count(), 7)
+        self.assertEqual(ArchivedPost.objects.count(), 8)
+        self.assertEqual(Comment.objects.count(), 0)
+        self.assertEqual(ArchivedComment.objects.get().text, 'Old comment')
+
+    def test_feeds_continue_into_archive(self):
+        archive()
+        url = reverse('posts:profile', kwargs={'username': 'authoruser'})
+        first = self.guest_client.get(url)
+        second = self.guest_client.get(url + '?page=2')
+        self.assertEqual(first.context['posts_count'], 15)
+        self.assertEqual(len(second.context['page_obj']), 5)
+        self.assertIsInstance(second.context['page_obj'][-1], ArchivedPost)
+        response = self.guest_client.get(
+            reverse('posts:group_list', kwargs={'slug': 'group'}) + '?page=2')
+        self.assertEqual(len(response.context['page_obj']), 5)
+
+    def test_archived_post_detail(self):
+        archive()
+        post = ArchivedPost.objects.order_by('pk').first()
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}))
+        self.assertEqual(response.context['post'], post)
+        self.assertTrue(response.context['archived'])
+        self.assertContains(response, 'Old comment')
+
+    def test_follow_feed_counts_newly_followed_archive(self):
+        archive()
+        reader = User.objects.create_user(username='reader')
+        other = User.objects.create_user(username='other')
+        ArchivedPost.objects.create(text='Other archived', author=other,
+                                    pub_date=timezone.now())
+        client = Client()
+        client.force_login(reader)
+        url = reverse('posts:follow_index')
+        Follow.objects.create(user=reader, author=other)
+        self.assertEqual(client.get(url).context['page_obj'].paginator.count,
+                         1)
+        Follow.objects.create(user=reader,
+                              author=User.objects.get(username='authoruser'))
+        self.assertEqual(client.get(url).context['page_obj'].paginator.count,
+                         16)
@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from jobs.models import Job
+from jobs.queue import run_pending
+from posts import deletion
+from posts.models import Comment, DeletionTask, Follow, Group, Post
+
+User = get_user_model()
+
+
+class DeletionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='prolific')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(title='Big', slug='big',
+                                          description='Many posts')
+        self.posts = [
+            Post.objects.create(author=self.author, group=self.group,
+                                text=f'Post {number}')
+            for number in range(5)
+        ]
+        self.other = Post.objects.create(author=self.reader,
+                                         text='Still here')
+        Comment.objects.create(post=self.posts[0], author=self.reader,
+                               text='Comment')
+        Follow.objects.create(user=self.reader, author=self.author)
+        Job.objects.all().delete()
+        self.client = Client()
+
+    def test_schedule_hides_at_once(self):
+        task = deletion.schedule(self.author)
+        self.author.refresh_from_db()
+        self.assertFalse(self.author.is_active)
+        self.assertEqual(task.status, DeletionTask.PENDING)
+        self.assertTrue(Job.objects.filter(queue='deletion').exists())
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(list(response.context['page_obj']), [self.other])
+        for url in (
+            reverse('posts:profile', args=['prolific']),
+            reverse('posts:post_detail', args=[self.posts[0].pk]),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(Post.objects.filter(author=self.author).count(), 5)
+
+    def test_schedule_changes_feeds_of_user_groups(self):
+        url = reverse('posts:group_rss', args=['big'])
+        etag = self.client.get(url)['ETag']
+        deletion.schedule(self.author)
+        # on_commit callbacks never run inside a TestCase.
+        deletion.forget_hidden()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Post 0')
+
+    def test_group_page_hides_user_being_deleted(self):
+        grouped = Post.objects.create(author=self.reader, group=self.group,
+                                      text='Grouped')
+        deletion.schedule(self.author)
+        response = self.client.get(reverse('posts:group_list',
+                                           args=['big']))
+        self.assertEqual(list(response.context['page_obj']), [grouped])
+
+    def test_profile_hides_group_being_deleted(self):
+        loose = Post.objects.create(author=self.author, text='Loose')
+        deletion.schedule(self.group)
+        response = self.client.get(reverse('posts:profile',
+                                           args=['prolific']))
+        self.assertEqual(list(response.context['page_obj']), [loose])
+        self.assertEqual(response.context['posts_count'], 1)
+
+    def test_schedule_twice_reuses_task(self):
+        self.assertEqual(deletion.schedule(self.group),
+                         deletion.schedule(self.group))
+        self.assertEqual(DeletionTask.objects.count(), 1)
+
+    def test_run_deletes_in_batches(self):
+        task = deletion.schedule(self.author)
+        deletion.run(task.pk, batch_size=2)
+        task.refresh_from_db()
+        self.assertEqual(task.status, DeletionTask.DONE)
+        self.assertIsNotNone(task.finished)
+        # Posts, the comment, the follow, their notifications, the user.
+        self.assertEqual(task.deleted, 5 + 1 + 1 + 2 + 1)
+        self.assertFalse(User.objects.filter(username='prolific').exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(list(Post.objects.all()), [self.other])
+        self.assertEqual(deletion.hidden()[DeletionTask.USER], set())
+
+    def test_run_out_of_time_continues_in_next_job(self):
+        task = deletion.schedule(self.group)
+        deletion.run(task.pk, seconds=-1)
+        task.refresh_from_db()
+        self.assertEqual(task.status, DeletionTask.RUNNING)
+        self.assertEqual(Post.objects.count(), 6)
+        self.assertEqual(run_pending(['deletion']), 2)
+        task.refresh_from_db()
+        self.assertEqual(task.status, DeletionTask.DONE)
+        self.assertFalse(Group.objects.exists())
+        self.assertEqual(list(Post.objects.all()), [self.other])
+        self.assertTrue(User.objects.filter(pk=self.author.pk).exists())
@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class PostDetailCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.group = Group.objects.create(title='Group', slug='group',
+                                          description='Description')
+        self.post = Post.objects.create(author=self.author, group=self.group,
+                                        text='Original text')
+        self.url = reverse('posts:post_detail', args=[self.post.pk])
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_hot_post_served_from_cache(self):
+        self.guest_client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(self.url)
+        self.assertContains(response, 'Original text')
+        self.assertEqual(response.context['posts_count'], 1)
+
+    def test_writes_invalidate_bundle(self):
+        self.guest_client.get(self.url)
+        self.author_client.post(
+            reverse('posts:post_edit', args=[self.post.pk]),
+            {'text': 'Edited text', 'group': self.group.pk})
+        self.author_client.post(
+            reverse('posts:add_comment', args=[self.post.pk]),
+            {'text': 'Fresh comment'})
+        Post.objects.create(author=self.author, text='Another post')
+        self.group.title = 'Renamed group'
+        self.group.save()
+        response = self.guest_client.get(self.url)
+        self.assertContains(response, 'Edited text')
+        self.assertContains(response, 'Fresh comment')
+        self.assertContains(response, 'Renamed group')
+        self.assertEqual(response.context['posts_count'], 2)
+        self.post.delete()
+        self.assertEqual(self.guest_client.get(self.url).status_code, 404)
+
+    def test_comment_authors_are_current(self):
+        commenter = User.objects.create_user(username='commenter')
+        Comment.objects.create(post=self.post, author=commenter,
+                               text='Comment')
+        self.guest_client.get(self.url)
+        with self.assertNumQueries(0):
+            self.guest_client.get(self.url)
+        commenter.username = 'renamed'
+        commenter.save()
+        response = self.guest_client.get(self.url)
+        self.assertContains(response, 'renamed')
+        self.assertNotContains(response, 'commenter')
+
+    @override_settings(DETAIL_COMMENTS=2)
+    def test_first_comment_page_cached(self):
+        for number in range(3):
+            Comment.objects.create(post=self.post, author=self.author,
+                                   text=f'Comment {number}')
+        response = self.guest_client.get(self.url)
+        self.assertEqual([comment.text for comment in
+                          response.context['comments']],
+                         ['Comment 2', 'Comment 1'])
+        self.assertContains(response, 'All 3 comments')
+        response = self.guest_client.get(self.url, {'comments': 'all'})
+        self.assertEqual(len(response.context['comments']), 3)
+        self.assertNotContains(response, 'All 3 comments')
@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='authoruser')
+        cls.group = Group.objects.create(title='Group', slug='group',
+                                         description='Group description')
+        Post.objects.create(text='Grouped post', author=cls.author,
+                            group=cls.group)
+        Post.objects.create(text='Loose post', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feeds_list_posts(self):
+        urls = {
+            reverse('posts:index_rss'): ['Grouped post', 'Loose post'],
+            reverse('posts:group_atom', args=['group']): ['Grouped post'],
+            reverse('posts:author_rss', args=['authoruser']):
+                ['Grouped post', 'Loose post'],
+        }
+        for url, texts in urls.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                for text in texts:
+                    self.assertContains(response, text)
+        response = self.guest_client.get(
+            reverse('posts:group_rss', args=['group']))
+        self.assertNotContains(response, 'Loose post')
+
+    def test_unknown_group_is_404(self):
+        response = self.guest_client.get(
+            reverse('posts:group_rss', args=['missing']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_polling_gets_cheap_not_modified(self):
+        url = reverse('posts:group_rss', args=['group'])
+        etag = self.guest_client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_post_changes_version(self):
+        url = reverse('posts:group_rss', args=['group'])
+        etag = self.guest_client.get(url)['ETag']
+        author_etag = self.guest_client.get(
+            reverse('posts:author_rss', args=['authoruser']))['ETag']
+        Post.objects.create(text='Fresh post', author=self.author,
+                            group=self.group)
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Fresh post')
+        self.assertNotEqual(response['ETag'], etag)
+        response = self.guest_client.get(
+            reverse('posts:author_rss', args=['authoruser']),
+            HTTP_IF_NONE_MATCH=author_etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_renamed_group_and_author_leave_old_names(self):
+        group = Group.objects.create(title='Old', slug='old')
+        author = User.objects.create_user(username='oldname')
+        self.guest_client.get(reverse('posts:group_rss', args=['old']))
+        self.guest_client.get(reverse('posts:author_rss', args=['oldname']))
+        group.slug = 'new'
+        group.save()
+        author.username = 'newname'
+        author.save()
+        for url in (reverse('posts:group_rss', args=['old']),
+                    reverse('posts:author_rss', args=['oldname'])):
+            with self.subTest(url=url):
+                self.assertEqual(self.guest_client.get(url).status_code, 404)
+        response = self.guest_client.get(
+            reverse('posts:group_rss', args=['new']))
+        self.assertEqual(response.status_code, 200)
+
+    def test_group_and_author_changes_change_versions(self):
+        urls = {
+            'group': reverse('posts:group_rss', args=['group']),
+            'author': reverse('posts:author_rss', args=['authoruser']),
+        }
+        etags = {name: self.guest_client.get(url)['ETag']
+                 for name, url in urls.items()}
+        self.group.title = 'Renamed group'
+        self.group.save()
+        response = self.guest_client.get(
+            urls['group'], HTTP_IF_NONE_MATCH=etags['group'])
+        self.assertContains(response, 'Renamed group')
+        etags['group'] = response['ETag']
+        self.author.username = 'renamed'
+        self.author.save()
+        response = self.guest_client.get(
+            urls['group'], HTTP_IF_NONE_MATCH=etags['group'])
+        self.assertContains(response, 'renamed')
+        response = self.guest_client.get(
+            reverse('posts:author_rss', args=['renamed']),
+            HTTP_IF_NONE_MATCH=etags['author'])
+        self.assertEqual(response.status_code, 200)
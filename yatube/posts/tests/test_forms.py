@@ -1,7 +1,9 @@
 import shutil
 import tempfile
 
-from posts.models import Post
+from core.storage import hashed_name
+from jobs.models import Job
+from posts.models import MediaFile, Post
 from django.test import Client, TestCase, override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.conf import settings
@@ -20,6 +22,9 @@ small_gif = (
             b'\x02\x00\x01\x00\x00\x02\x02\x0C'
             b'\x0A\x00\x3B'
         )
+# Uploads are named by content, whatever the name of the uploaded file.
+small_gif_name = hashed_name('posts/small.gif',
+                             SimpleUploadedFile('small.gif', small_gif))
 
 
 @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
@@ -60,7 +65,7 @@ class PostCreateFormTests(TestCase):
                                      kwargs={'username': 'testuser'}))
         self.assertEqual(Post.objects.count(), posts_count + 1)
         self.assertTrue(Post.objects.filter(text='Test text',
-                                            image='posts/small.gif').exists())
+                                            image=small_gif_name).exists())
 
     def test_edit_post_form(self):
         """Valid form edits post."""
@@ -79,7 +84,7 @@ class PostCreateFormTests(TestCase):
                               data=form_data,
                               follow=True)
         self.assertTrue(Post.objects.filter(text='Test text',
-                                            image='posts/small1.gif').exists())
+                                            image=small_gif_name).exists())
         posts_count = Post.objects.count()
         post_id = Post.objects.get(text='Test text').id
         uploaded = SimpleUploadedFile(
@@ -101,10 +106,25 @@ class PostCreateFormTests(TestCase):
         self.assertEqual(Post.objects.count(), posts_count)
         self.assertTrue(
             Post.objects.filter(text='Edited test text',
-                                image='posts/small2.gif').exists())
+                                image=small_gif_name).exists())
         self.assertFalse(
             Post.objects.filter(text='Test text', ).exists())
 
+    def test_duplicate_uploads_share_one_file(self):
+        for name in ('first.gif', 'second.gif'):
+            self.auth_client.post(reverse('posts:post_create'), data={
+                'text': 'Repost',
+                'image': SimpleUploadedFile(name, small_gif,
+                                            content_type='image/gif'),
+            })
+        self.assertEqual(
+            Post.objects.filter(image=small_gif_name).count(), 2)
+        self.assertEqual(MediaFile.objects.get(name=small_gif_name).refs, 2)
+        self.assertEqual(Job.objects.filter(
+            task='posts.tasks.prepare_image').count(), 1)
+        Post.objects.filter(text='Repost').first().delete()
+        self.assertEqual(MediaFile.objects.get(name=small_gif_name).refs, 1)
+
     def test_comment_post_form(self):
         """Valid comment is posted on page with the post"""
         comment_data = {
@@ -0,0 +1,107 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from posts.forms import PostForm
+from posts.images import normalize
+from posts.models import MediaFile, Post, image_storage
+from posts.tasks import prepare_image
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def jpeg(size, orientation=None):
+    image = Image.new('RGB', size, 'red')
+    exif = Image.Exif()
+    exif[0x010e] = 'Camera description'
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, IMAGE_MAX_SIDE=100)
+class ImageNormalizationTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def upload(self, data):
+        return SimpleUploadedFile('photo.jpg', data, content_type='image/jpeg')
+
+    @override_settings(IMAGE_UPLOAD_MAX_BYTES=100)
+    def test_form_rejects_large_files(self):
+        form = PostForm({'text': 'Text'},
+                        {'image': self.upload(jpeg((20, 20)))})
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+
+    @override_settings(IMAGE_UPLOAD_MAX_PIXELS=1000)
+    def test_form_rejects_large_dimensions(self):
+        form = PostForm({'text': 'Text'},
+                        {'image': self.upload(jpeg((50, 50)))})
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+        form = PostForm({'text': 'Text'},
+                        {'image': self.upload(jpeg((30, 30)))})
+        self.assertTrue(form.is_valid())
+
+    def test_normalize_downscales_rotates_and_strips(self):
+        # Orientation 6: the camera was turned, the image displays rotated.
+        name = image_storage.save('posts/photo.jpg',
+                                  ContentFile(jpeg((400, 200), 6)))
+        new_name = normalize(name)
+        self.assertNotEqual(new_name, name)
+        with image_storage.open(new_name) as file:
+            image = Image.open(file)
+            self.assertEqual(image.size, (50, 100))
+            self.assertNotIn('exif', image.info)
+        self.assertIsNone(normalize(new_name))
+
+    def test_prepare_image_moves_every_post_and_deletes_upload(self):
+        author = User.objects.create_user(username='author')
+        post = Post.objects.create(
+            author=author, text='Text',
+            image=ContentFile(jpeg((300, 300)), name='photo.jpg'))
+        upload = post.image.name
+        repost = Post.objects.create(author=author, text='Repost',
+                                     image=upload)
+        prepare_image(post.pk)
+        post.refresh_from_db()
+        repost.refresh_from_db()
+        self.assertNotEqual(post.image.name, upload)
+        self.assertEqual(repost.image.name, post.image.name)
+        with image_storage.open(post.image.name) as file:
+            self.assertEqual(Image.open(file).size, (100, 100))
+        self.assertFalse(image_storage.exists(upload))
+        self.assertFalse(MediaFile.objects.filter(name=upload).exists())
+
+    def test_prepare_image_keeps_image_replaced_meanwhile(self):
+        author = User.objects.create_user(username='author')
+        post = Post.objects.create(
+            author=author, text='Text',
+            image=ContentFile(jpeg((300, 300)), name='photo.jpg'))
+        edited = ContentFile(jpeg((20, 20)), name='edited.jpg')
+
+        def edit_while_normalizing(name):
+            normalized = normalize(name)
+            Post.objects.get(pk=post.pk).image.save('edited.jpg', edited)
+            return normalized
+        with mock.patch('posts.tasks.normalize',
+                        side_effect=edit_while_normalizing):
+            prepare_image(post.pk)
+        post.refresh_from_db()
+        with image_storage.open(post.image.name) as file:
+            self.assertEqual(Image.open(file).size, (20, 20))
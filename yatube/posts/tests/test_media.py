@@ -0,0 +1,127 @@
+import io
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+from sorl.thumbnail import default as thumbnail_default
+from sorl.thumbnail.images import ImageFile
+
+from posts.media import collect_originals, collect_thumbnails, live_names
+from posts.models import MediaFile, Post, image_storage
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def add_thumbnail(name):
+    """Record a thumbnail the way sorl does, without running its engine."""
+    kvstore = thumbnail_default.kvstore
+    source = kvstore.get_or_set(ImageFile(name, image_storage))
+    thumbnail = ImageFile(f'cache/{os.path.basename(name)}.jpg',
+                          thumbnail_default.storage)
+    thumbnail_default.storage.save(thumbnail.name, png('green'))
+    kvstore.set(thumbnail, source)
+    return thumbnail
+
+
+def png(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (4, 4), color).save(buffer, 'PNG')
+    return SimpleUploadedFile('image.png', buffer.getvalue(),
+                              content_type='image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaGarbageCollectionTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        cache.clear()
+        author = User.objects.create_user(username='authoruser')
+        self.post = Post.objects.create(text='Post', author=author,
+                                        image=png('red'))
+        self.old_image = self.post.image.name
+        self.old_thumbnail = add_thumbnail(self.old_image)
+        self.post.image = png('blue')
+        self.post.save()
+        self.thumbnail = add_thumbnail(self.post.image.name)
+
+    def test_dry_run_only_reports(self):
+        self.assertEqual(list(collect_originals(dry_run=True, grace=0)),
+                         [self.old_image])
+        self.assertTrue(image_storage.exists(self.old_image))
+
+    def test_replaced_image_and_its_thumbnails_are_deleted(self):
+        self.assertEqual(list(collect_originals(grace=0)), [self.old_image])
+        self.assertFalse(image_storage.exists(self.old_image))
+        self.assertTrue(image_storage.exists(self.post.image.name))
+        self.assertFalse(self.old_thumbnail.exists())
+        self.assertTrue(self.thumbnail.exists())
+        self.assertFalse(
+            MediaFile.objects.filter(name=self.old_image).exists())
+        self.assertEqual(list(collect_thumbnails(grace=0)), [])
+
+    def test_thumbnails_of_deleted_sources_are_deleted(self):
+        image_storage.delete(self.old_image)
+        self.assertEqual(list(collect_thumbnails(grace=0)),
+                         [self.old_thumbnail.name])
+        self.assertFalse(self.old_thumbnail.exists())
+        self.assertIsNone(thumbnail_default.kvstore.get(self.old_thumbnail))
+        self.assertTrue(self.thumbnail.exists())
+
+    def test_unrecorded_thumbnails_are_deleted(self):
+        stray = os.path.join(TEMP_MEDIA_ROOT, 'cache', 'stray.jpg')
+        with open(stray, 'wb') as file:
+            file.write(b'thumbnail')
+        output = StringIO()
+        call_command('gc_media', '--grace=0', stdout=output)
+        self.assertFalse(os.path.exists(stray))
+        self.assertIn('Deleted 1 images, 1 thumbnails', output.getvalue())
+        self.assertFalse(self.old_thumbnail.exists())
+
+    def test_young_files_are_kept(self):
+        self.assertEqual(list(collect_originals()), [])
+
+    def test_reupload_restarts_grace_period(self):
+        path = image_storage.path(self.old_image)
+        os.utime(path, (0, 0))
+        image_storage.save('posts/image.png', png('red'))
+        self.assertEqual(list(collect_originals(grace=60)), [])
+        self.assertTrue(image_storage.exists(self.old_image))
+
+    def test_image_reused_during_collection_is_kept(self):
+        checks = []
+
+        def reuse(names):
+            # A repost lands between the batch check and the deletion.
+            if checks:
+                Post.objects.create(text='Repost', author=self.post.author,
+                                    image=self.old_image)
+            checks.append(names)
+            return live_names(names)
+        with mock.patch('posts.media.live_names', side_effect=reuse):
+            self.assertEqual(list(collect_originals(grace=0)), [])
+        self.assertTrue(image_storage.exists(self.old_image))
+
+    def test_thumbnail_store_is_read_in_batches(self):
+        image_storage.delete(self.old_image)
+        self.post.image = png('yellow')
+        self.post.save()
+        self.assertEqual(sorted(collect_thumbnails(batch_size=1, grace=0)),
+                         sorted([self.old_thumbnail.name,
+                                 self.thumbnail.name]))
+        self.assertIsNone(thumbnail_default.kvstore.get(self.thumbnail))
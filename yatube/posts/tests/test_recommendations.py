@@ -0,0 +1,71 @@
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post, Recommendation
+from posts.recommendations import score
+
+User = get_user_model()
+
+
+class RecommendationScoreTests(TestCase):
+    def test_co_followed_author_is_suggested(self):
+        """Authors followed together are suggested, followed ones are not."""
+        follows = np.array([(1, 10), (2, 10), (2, 11), (3, 10), (3, 11)])
+        user_ids, author_ids, _, ranks = score(follows)
+        self.assertEqual(list(user_ids), [1])
+        self.assertEqual(list(author_ids), [11])
+        self.assertEqual(list(ranks), [0])
+
+    def test_shared_group_breaks_ties(self):
+        """Candidates posting in the user's groups rank higher."""
+        follows = np.array([(1, 10), (2, 10), (2, 11), (2, 12)])
+        author_groups = np.array([(10, 1, 5), (12, 1, 5), (11, 2, 5)])
+        _, author_ids, _, _ = score(follows, author_groups)
+        self.assertEqual(list(author_ids), [12, 11])
+
+    def test_top_k_limits_suggestions(self):
+        follows = np.array([(1, 10), (2, 10), (2, 11), (2, 12), (2, 13)])
+        user_ids, _, _, _ = score(follows, top_k=2)
+        self.assertEqual(list(user_ids), [1, 1])
+
+
+class RecommendationViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        reader = User.objects.create_user(username='reader')
+        other = User.objects.create_user(username='other')
+        first = User.objects.create_user(username='first')
+        second = User.objects.create_user(username='second')
+        group = Group.objects.create(title='Group', slug='group',
+                                     description='Group description')
+        Post.objects.create(text='Post', author=second, group=group)
+        Follow.objects.create(user=reader, author=first)
+        Follow.objects.create(user=other, author=first)
+        Follow.objects.create(user=other, author=second)
+
+    def setUp(self):
+        self.auth_client = Client()
+        self.auth_client.force_login(User.objects.get(username='reader'))
+
+    def test_command_stores_suggestions(self):
+        call_command('build_recommendations', stdout=StringIO())
+        suggested = Recommendation.objects.filter(
+            user__username='reader').values_list('author__username',
+                                                 flat=True)
+        self.assertEqual(list(suggested), ['second'])
+
+    def test_follow_page_shows_suggestions(self):
+        call_command('build_recommendations', stdout=StringIO())
+        response = self.auth_client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            [item.author.username
+             for item in response.context['recommendations']],
+            ['second'],
+        )
+        self.assertContains(response, 'Who to follow')
@@ -0,0 +1,83 @@
+import datetime as dt
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.archive import archive
+from posts.models import ArchivedPost, Group, Post
+from posts.scroll import decode_cursor, encode_cursor
+
+User = get_user_model()
+
+POST_LINK = re.compile(r'href="/posts/(\d+)/"')
+
+
+@override_settings(SCROLL_BATCH_SIZE=4)
+class ScrollTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='authoruser')
+        cls.group = Group.objects.create(title='Group', slug='group',
+                                         description='Group description')
+        same_time = timezone.now()
+        for i in range(15):
+            Post.objects.create(text=f'Post {i}', author=cls.author,
+                                group=cls.group)
+        # Ties on pub_date must be broken by pk, not skipped.
+        Post.objects.filter(text__in=['Post 5', 'Post 6', 'Post 7']).update(
+            pub_date=same_time)
+        Post.objects.filter(text__in=['Post 0', 'Post 1', 'Post 2']).update(
+            pub_date=same_time - dt.timedelta(days=400))
+        archive()
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def walk(self, url, cursor=''):
+        ids = []
+        while True:
+            data = self.guest_client.get(url, {'cursor': cursor}).json()
+            ids.extend(int(pk) for pk in POST_LINK.findall(data['html']))
+            cursor = data['next']
+            if cursor is None:
+                return ids
+
+    def test_cursor_round_trip(self):
+        post = Post.objects.first()
+        self.assertEqual(decode_cursor(encode_cursor(post.pub_date, post.pk)),
+                         (post.pub_date, post.pk))
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+
+    def test_fragments_walk_the_whole_feed(self):
+        """Every post once, newest first, archived ones last."""
+        ids = self.walk(reverse('posts:index_more'))
+        self.assertEqual(len(ids), 15)
+        self.assertEqual(len(set(ids)), 15)
+        self.assertEqual(set(ids[-3:]), set(
+            ArchivedPost.objects.values_list('pk', flat=True)))
+        response = self.guest_client.get(reverse('posts:index'))
+        first_page = [post.pk for post in response.context['page_obj']]
+        self.assertEqual(first_page, ids[:10])
+
+    def test_page_continues_with_cursor(self):
+        url = reverse('posts:group_list', args=['group'])
+        response = self.guest_client.get(url)
+        cursor = response.context['next_cursor']
+        ids = self.walk(reverse('posts:group_more', args=['group']), cursor)
+        second_page = self.guest_client.get(url + '?page=2')
+        self.assertEqual(ids,
+                         [post.pk for post in second_page.context['page_obj']])
+        self.assertIsNone(second_page.context['next_cursor'])
+
+    def test_fragments_of_missing_feeds(self):
+        response = self.guest_client.get(
+            reverse('posts:group_more', args=['missing']))
+        self.assertEqual(response.status_code, 404)
+        response = self.guest_client.get(reverse('posts:follow_more'))
+        self.assertEqual(response.status_code, 302)
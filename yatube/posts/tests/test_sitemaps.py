@@ -0,0 +1,107 @@
+import datetime as dt
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from jobs.models import Job
+from jobs.queue import run_pending
+from posts import sitemaps
+from posts.models import Group, Post
+
+User = get_user_model()
+
+SITEMAP_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(SITEMAP_ROOT=SITEMAP_ROOT, SITEMAP_URLS_PER_FILE=2,
+                   SITE_URL='http://testserver')
+class SitemapTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='authoruser')
+        cls.group = Group.objects.create(title='Group', slug='group',
+                                         description='Group description')
+        cls.posts = [Post.objects.create(text=f'Post {number}',
+                                         author=cls.author)
+                     for number in range(3)]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(SITEMAP_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        shutil.rmtree(SITEMAP_ROOT, ignore_errors=True)
+
+    def read(self, name):
+        with open(os.path.join(SITEMAP_ROOT, name), encoding='utf-8') as file:
+            return file.read()
+
+    def test_posts_are_split_into_chunks(self):
+        sitemaps.build(full=True)
+        first = self.read('sitemap-posts-0.xml')
+        second = self.read('sitemap-posts-1.xml')
+        self.assertEqual(first.count('<url>'), 2)
+        self.assertEqual(second.count('<url>'), 1)
+        self.assertIn(
+            f'http://testserver/posts/{self.posts[2].pk}/', second)
+        self.assertIn('http://testserver/group/group/',
+                      self.read('sitemap-groups-0.xml'))
+        self.assertIn('http://testserver/profile/authoruser/',
+                      self.read('sitemap-profiles-0.xml'))
+        index = self.read('sitemap.xml')
+        self.assertIn('http://testserver/sitemaps/sitemap-posts-1.xml', index)
+
+    def test_index_dates_chunks_by_newest_post(self):
+        dates = [dt.datetime(2019, 5, 6), dt.datetime(2020, 1, 2),
+                 dt.datetime(2021, 3, 4)]
+        for post, date in zip(self.posts, dates):
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=date.replace(tzinfo=dt.timezone.utc))
+        sitemaps.build(full=True)
+        index = self.read('sitemap.xml')
+        self.assertIn('sitemap-posts-0.xml</loc>'
+                      '<lastmod>2020-01-02</lastmod>', index)
+        self.assertIn('sitemap-posts-1.xml</loc>'
+                      '<lastmod>2021-03-04</lastmod>', index)
+        self.assertIn('sitemap-groups-0.xml</loc></sitemap>', index)
+
+    def test_update_only_rewrites_the_tail(self):
+        sitemaps.build(full=True)
+        first = os.path.join(SITEMAP_ROOT, 'sitemap-posts-0.xml')
+        os.utime(first, (0, 0))
+        new = Post.objects.create(text='New post', author=self.author)
+        sitemaps.build()
+        self.assertEqual(os.path.getmtime(first), 0)
+        self.assertIn(f'/posts/{new.pk}/', self.read('sitemap-posts-1.xml'))
+        self.assertNotIn('sitemap-posts-2.xml', self.read('sitemap.xml'))
+        Post.objects.create(text='Newer post', author=self.author)
+        sitemaps.build()
+        self.assertIn('sitemap-posts-2.xml', self.read('sitemap.xml'))
+
+    def test_new_posts_schedule_one_update(self):
+        Job.objects.all().delete()
+        Post.objects.create(text='One', author=self.author)
+        Post.objects.create(text='Two', author=self.author)
+        jobs = Job.objects.filter(task=sitemaps.UPDATE_TASK)
+        self.assertEqual(jobs.count(), 1)
+        jobs.update(run_at=jobs.get().created)
+        run_pending(queues=['sitemaps'])
+        self.assertIn('sitemap-posts-', self.read('sitemap.xml'))
+
+    def test_files_are_served(self):
+        client = Client()
+        self.assertEqual(
+            client.get(reverse('posts:sitemap')).status_code, 404)
+        sitemaps.build(full=True)
+        response = client.get(reverse('posts:sitemap'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/xml')
+        response = client.get(
+            reverse('posts:sitemap_chunk', args=['state.json']))
+        self.assertEqual(response.status_code, 404)
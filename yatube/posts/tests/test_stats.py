@@ -0,0 +1,105 @@
+import datetime as dt
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.archive import archive
+from posts.models import (ArchivedPost, Comment, DailyStats, Follow, Group,
+                          Post)
+from posts.stats import backfill, summary
+
+User = get_user_model()
+
+
+class StatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(title='Group', slug='group',
+                                          description='Description')
+        self.post = Post.objects.create(author=self.author, group=self.group,
+                                        text='Post')
+        Post.objects.create(author=self.author, text='No group')
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text='Comment')
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client = Client()
+
+    def totals(self, kind, obj):
+        return summary(kind, obj.pk)['totals']
+
+    def test_writes_update_rollups(self):
+        self.assertEqual(self.totals(DailyStats.AUTHOR, self.author),
+                         {'posts': 2, 'comments': 0, 'followers': 1})
+        self.assertEqual(self.totals(DailyStats.AUTHOR, self.reader),
+                         {'posts': 0, 'comments': 1, 'followers': 0})
+        self.assertEqual(self.totals(DailyStats.GROUP, self.group),
+                         {'posts': 1, 'comments': 1})
+        self.post.group = None
+        self.post.save()
+        Follow.objects.all().delete()
+        # The comments leave with the post.
+        self.assertEqual(self.totals(DailyStats.GROUP, self.group),
+                         {'posts': 0, 'comments': 0})
+        self.assertEqual(self.totals(DailyStats.AUTHOR, self.author),
+                         {'posts': 2, 'comments': 0, 'followers': 0})
+
+    def test_deleted_posts_drop_out_archived_stay(self):
+        archive(days=-1)
+        self.assertEqual(self.totals(DailyStats.GROUP, self.group),
+                         {'posts': 1, 'comments': 1})
+        Post.objects.create(author=self.author, group=self.group,
+                            text='Spam').delete()
+        self.assertEqual(self.totals(DailyStats.GROUP, self.group),
+                         {'posts': 1, 'comments': 1})
+        ArchivedPost.objects.filter(pk=self.post.pk).delete()
+        self.assertEqual(self.totals(DailyStats.GROUP, self.group),
+                         {'posts': 0, 'comments': 0})
+        self.assertEqual(self.totals(DailyStats.AUTHOR, self.reader),
+                         {'posts': 0, 'comments': 0, 'followers': 0})
+
+    def test_backfill_matches_signals(self):
+        before = set(DailyStats.objects.values_list(
+            'kind', 'object_id', 'day', 'posts', 'comments', 'followers'))
+        DailyStats.objects.update(posts=0, comments=0)
+        out = StringIO()
+        call_command('backfill_stats', stdout=out)
+        self.assertIn('Wrote 3 rollup rows', out.getvalue())
+        self.assertEqual(set(DailyStats.objects.values_list(
+            'kind', 'object_id', 'day', 'posts', 'comments', 'followers')),
+            before)
+
+    def test_backfill_in_date_batches(self):
+        week_ago = timezone.now() - dt.timedelta(days=7)
+        Post.objects.filter(pk=self.post.pk).update(pub_date=week_ago)
+        DailyStats.objects.create(kind=DailyStats.GROUP,
+                                  object_id=self.group.pk,
+                                  day=timezone.localdate() - dt.timedelta(
+                                      days=20), posts=3)
+        backfill(days=2)
+        self.assertEqual(self.totals(DailyStats.GROUP, self.group),
+                         {'posts': 1, 'comments': 1})
+        self.assertEqual(DailyStats.objects.get(
+            kind=DailyStats.GROUP, object_id=self.group.pk,
+            day=timezone.localdate(week_ago)).posts, 1)
+
+    def test_pages_and_json_read_rollups(self):
+        for url in (reverse('posts:group_list', args=['group']),
+                    reverse('posts:profile', args=['author'])):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, 'Posts: ')
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse('posts:group_stats', args=['group']))
+        data = response.json()
+        self.assertEqual(data['totals'], {'posts': 1, 'comments': 1})
+        self.assertEqual(data['days'][-1],
+                         {'day': timezone.localdate().isoformat(),
+                          'posts': 1, 'comments': 1})
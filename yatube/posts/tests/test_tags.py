@@ -0,0 +1,77 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Mention, Post, PostTag, Tag
+from posts.tags import extract, reindex
+
+User = get_user_model()
+
+
+class TagTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='authoruser')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_extract(self):
+        tags, usernames = extract(
+            "#Django tips for @reader. Mail me@example.com, it's #django")
+        self.assertEqual(tags, {'django'})
+        self.assertEqual(usernames, {'reader'})
+
+    def test_saving_indexes_tags_and_mentions(self):
+        post = Post.objects.create(text='#news for @reader and @nobody',
+                                   author=self.author)
+        self.assertEqual(PostTag.objects.get().tag.name, 'news')
+        self.assertEqual(Mention.objects.get().user, self.reader)
+        post.text = '#sports only'
+        post.save()
+        self.assertEqual(
+            list(PostTag.objects.values_list('tag__name', flat=True)),
+            ['sports'])
+        self.assertFalse(Mention.objects.exists())
+
+    @override_settings(SCROLL_BATCH_SIZE=3)
+    def test_tag_feed_pages_by_cursor(self):
+        posts = [Post.objects.create(text=f'Post {i} #news',
+                                     author=self.author)
+                 for i in range(5)]
+        Post.objects.create(text='Untagged', author=self.author)
+        response = self.guest_client.get(reverse('posts:tag', args=['News']))
+        self.assertEqual(response.context['title'], '#news')
+        self.assertEqual(response.context['posts'], posts[:1:-1])
+        data = self.guest_client.get(
+            reverse('posts:tag_more', args=['news']),
+            {'cursor': response.context['next_cursor']}).json()
+        self.assertIsNone(data['next'])
+        self.assertIn(f'/posts/{posts[0].pk}/', data['html'])
+        self.assertNotIn(f'/posts/{posts[2].pk}/', data['html'])
+        response = self.guest_client.get(reverse('posts:tag',
+                                                 args=['missing']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_mention_feed(self):
+        post = Post.objects.create(text='Hi @reader', author=self.author)
+        response = self.guest_client.get(
+            reverse('posts:mentions', args=['reader']))
+        self.assertEqual(response.context['posts'], [post])
+        self.assertContains(response, 'href="/profile/reader/"')
+
+    def test_reindex(self):
+        post = Post.objects.create(text='#news', author=self.author)
+        PostTag.objects.all().delete()
+        Tag.objects.all().delete()
+        self.assertEqual(reindex(batch_size=1), 1)
+        self.assertEqual(PostTag.objects.get().post, post)
+        call_command('reindex_tags', stdout=StringIO())
+        self.assertEqual(PostTag.objects.count(), 1)
@@ -0,0 +1,103 @@
+import datetime as dt
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import run_pending
+from posts import deletion, trending
+from posts.models import Activity, Group, Post
+
+User = get_user_model()
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='authoruser')
+        cls.group = Group.objects.create(title='Group', slug='group',
+                                         description='Group description')
+        cls.quiet = Post.objects.create(text='Quiet post', author=cls.author)
+        cls.busy = Post.objects.create(text='Busy post', author=cls.author,
+                                       group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.auth_client = Client()
+        self.auth_client.force_login(User.objects.create_user('reader'))
+
+    def test_comments_are_counted_in_buckets(self):
+        """Comments bump one bucket row instead of adding rows."""
+        for _ in range(3):
+            self.auth_client.post(
+                reverse('posts:add_comment', kwargs={'post_id': self.busy.pk}),
+                data={'text': 'Comment'})
+        activity = Activity.objects.get(kind=Activity.POST,
+                                        object_id=self.busy.pk)
+        self.assertEqual(activity.count, 3)
+        self.assertEqual(
+            Activity.objects.get(kind=Activity.GROUP).count, 3)
+
+    def test_recent_activity_ranks_higher(self):
+        now = timezone.now()
+        trending.record(Activity.POST, self.quiet.pk,
+                        when=now - dt.timedelta(hours=24))
+        trending.record(Activity.POST, self.quiet.pk,
+                        when=now - dt.timedelta(hours=24))
+        trending.record(Activity.POST, self.busy.pk, when=now)
+        trending.refresh()
+        self.assertEqual(trending.trending_post_ids(),
+                         [self.busy.pk, self.quiet.pk])
+        self.assertEqual(trending.trending_post_ids(self.group),
+                         [self.busy.pk])
+
+    def test_rankings_are_served_from_cache(self):
+        trending.record_post(self.busy)
+        trending.refresh()
+        with self.assertNumQueries(0):
+            trending.trending_post_ids()
+            trending.trending_group_ids()
+
+    def test_expired_buckets_are_pruned(self):
+        trending.record(Activity.POST, self.quiet.pk,
+                        when=timezone.now() - dt.timedelta(days=7))
+        self.assertEqual(trending.prune(), 1)
+        self.assertEqual(trending.refresh()[trending.POSTS_KEY], [])
+
+    def test_trending_page_lists_posts(self):
+        trending.record_post(self.busy)
+        trending.refresh()
+        response = self.auth_client.get(reverse('posts:trending'))
+        self.assertEqual(response.context['posts'], [self.busy])
+        self.assertEqual(response.context['groups'], [self.group])
+
+    def test_stale_rankings_are_refreshed_by_a_job(self):
+        trending.record_post(self.busy)
+        self.assertEqual(trending.trending_post_ids(), [])
+        self.assertEqual(trending.trending_group_ids(), [])
+        self.assertEqual(Job.objects.filter(queue='trending').count(), 1)
+        run_pending(['trending'])
+        self.assertEqual(trending.trending_post_ids(), [self.busy.pk])
+        self.assertEqual(Job.objects.filter(queue='trending').count(), 1)
+
+    @override_settings(TRENDING_QUERY_BATCH_SIZE=1)
+    def test_candidates_are_loaded_in_batches(self):
+        for post in (self.quiet, self.busy):
+            trending.record_post(post)
+        trending.record_follow(self.author)
+        with self.assertNumQueries(4):
+            rankings = trending.refresh()
+        self.assertEqual(sorted(rankings[trending.POSTS_KEY]),
+                         [self.quiet.pk, self.busy.pk])
+
+    def test_group_being_deleted_has_no_trending_page(self):
+        deletion.schedule(self.group)
+        # on_commit callbacks never run inside a TestCase.
+        deletion.forget_hidden()
+        response = self.auth_client.get(
+            reverse('posts:group_trending', kwargs={'slug': 'group'}))
+        self.assertEqual(response.status_code, 404)
@@ -3,8 +3,10 @@ from django.test import Client, TestCase
 from django.urls import reverse
 from django import forms
 from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
-from posts.models import Post, Group
+from posts.models import Comment, Post, Group
 
 User = get_user_model()
 
@@ -229,3 +231,50 @@ class PostPaginatorTests(TestCase):
             reverse('posts:profile',
                     kwargs={'username': 'authoruser'}) + '?page=2')
         self.assertEqual(len(response.context['page_obj']), 3)
+
+
+class FeedCardTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='authoruser')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Test group',
+            slug='test-slug',
+            description='Test description',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def add_commented_post(self):
+        post = Post.objects.create(text='Test text', author=self.author,
+                                   group=self.group)
+        Comment.objects.create(post=post, author=self.author,
+                               text='First comment')
+        Comment.objects.create(post=post, author=self.reader,
+                               text='Latest comment')
+        return post
+
+    def test_cards_show_comment_preview(self):
+        self.add_commented_post()
+        response = self.guest_client.get(
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}))
+        post = response.context['page_obj'][0]
+        self.assertEqual(post.comments_count, 2)
+        self.assertEqual(post.last_comment_author, 'reader')
+        self.assertContains(response, 'reader: Latest comment')
+
+    def test_queries_do_not_grow_with_posts(self):
+        url = reverse('posts:profile', kwargs={'username': 'authoruser'})
+        self.add_commented_post()
+        with CaptureQueriesContext(connection) as one_post:
+            self.guest_client.get(url)
+        for _ in range(5):
+            self.add_commented_post()
+        cache.clear()
+        with CaptureQueriesContext(connection) as six_posts:
+            self.guest_client.get(url)
+        self.assertEqual(len(six_posts), len(one_post))
@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from posts.models import Follow, Group, Post
+from posts.warmup import _render, cache_footprint, targets
+
+User = get_user_model()
+
+
+class WarmUpTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='popular')
+        reader = User.objects.create_user(username='reader')
+        User.objects.create_user(username='nobody')
+        Group.objects.create(title='Group', slug='group',
+                             description='Group description')
+        Follow.objects.create(user=reader, author=author)
+        Post.objects.create(text='Post', author=author)
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(WARMUP_PAGES=2, WARMUP_PROFILES=1)
+    def test_targets(self):
+        self.assertEqual(targets(), [
+            '/', '/?page=2', '/trending/',
+            '/group/group/', '/group/group/?page=2',
+            '/profile/popular/',
+        ])
+
+    def test_rendering_fills_cache(self):
+        keys, size = cache_footprint()
+        url, status, _ = _render('/')
+        self.assertEqual(status, 200)
+        new_keys, new_size = cache_footprint()
+        self.assertGreater(new_keys, keys)
+        self.assertGreater(new_size, size)
+
+    def test_every_target_renders(self):
+        for url in targets():
+            with self.subTest(url=url):
+                self.assertEqual(_render(url)[1], 200)
+        self.assertEqual(_render('/group/missing/')[1], 404)
@@ -0,0 +1,155 @@
+"""Trending posts and groups.
+
+Writes bump a counter in the current time bucket of ``Activity``, so
+ranking never has to scan ``Comment``. ``refresh`` folds the buckets of
+the last ``TRENDING_WINDOW_HOURS`` with exponential decay and caches the
+ranked ids; readers only ever touch the cache. Rankings older than
+TRENDING_REFRESH_SECONDS are still served, and the first reader to see
+them stale queues one refresh on the 'trending' queue.
+"""
+import datetime as dt
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from jobs.queue import enqueue
+from .models import Activity, Post
+
+POSTS_KEY = 'trending:posts'
+GROUP_POSTS_KEY = 'trending:group-posts'
+GROUPS_KEY = 'trending:groups'
+FRESH_KEY = 'trending:fresh'
+
+
+def current_bucket(now=None):
+    now = now or timezone.now()
+    size = settings.TRENDING_BUCKET_SECONDS
+    return now - dt.timedelta(seconds=int(now.timestamp()) % size,
+                              microseconds=now.microsecond)
+
+
+def record(kind, object_id, when=None):
+    """Count one event for the object in its current bucket."""
+    bucket = current_bucket(when)
+    lookup = {'kind': kind, 'object_id': object_id, 'bucket': bucket}
+    if Activity.objects.filter(**lookup).update(count=F('count') + 1):
+        return
+    try:
+        with transaction.atomic():
+            Activity.objects.create(count=1, **lookup)
+    except IntegrityError:
+        Activity.objects.filter(**lookup).update(count=F('count') + 1)
+
+
+def record_post(post):
+    record(Activity.POST, post.pk)
+    if post.group_id:
+        record(Activity.GROUP, post.group_id)
+
+
+def record_comment(comment):
+    record(Activity.POST, comment.post_id)
+    if comment.post.group_id:
+        record(Activity.GROUP, comment.post.group_id)
+
+
+def record_follow(author):
+    record(Activity.AUTHOR, author.pk)
+
+
+def _ranked(scores, limit):
+    ordered = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+    return [object_id for object_id, _ in ordered[:limit]]
+
+
+def _chunks(ids, size):
+    """Split ``ids`` to keep ``__in`` lookups under SQLite's variable limit."""
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _candidates(post_ids, author_ids, since):
+    """(id, group id, author id) of scored posts and recent author posts."""
+    size = settings.TRENDING_QUERY_BATCH_SIZE
+    fields = ('id', 'group_id', 'author_id')
+    for chunk in _chunks(post_ids, size):
+        yield from Post.objects.filter(pk__in=chunk).values_list(*fields)
+    for chunk in _chunks(author_ids, size):
+        yield from Post.objects.filter(
+            author_id__in=chunk, pub_date__gte=since).values_list(*fields)
+
+
+def refresh(now=None):
+    """Rebuild the cached rankings from the buckets in the window."""
+    now = now or timezone.now()
+    since = now - dt.timedelta(hours=settings.TRENDING_WINDOW_HOURS)
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    scores = {kind: defaultdict(float) for kind, _ in Activity.KIND_CHOICES}
+    buckets = Activity.objects.filter(bucket__gte=since).values_list(
+        'kind', 'object_id', 'bucket', 'count')
+    for kind, object_id, bucket, count in buckets.iterator():
+        age = (now - bucket).total_seconds()
+        scores[kind][object_id] += count * 0.5 ** (age / half_life)
+
+    authors = scores[Activity.AUTHOR]
+    author_weight = settings.TRENDING_AUTHOR_WEIGHT
+    post_scores = {}
+    group_posts = defaultdict(dict)
+    # A post can come up twice, scored and by its author, with one value.
+    for post_id, group_id, author_id in _candidates(
+            scores[Activity.POST], authors, since):
+        value = (scores[Activity.POST].get(post_id, 0)
+                 + author_weight * authors.get(author_id, 0))
+        post_scores[post_id] = value
+        if group_id:
+            group_posts[group_id][post_id] = value
+
+    size = settings.TRENDING_SIZE
+    rankings = {
+        POSTS_KEY: _ranked(post_scores, size),
+        GROUPS_KEY: _ranked(scores[Activity.GROUP], size),
+        GROUP_POSTS_KEY: {
+            group_id: _ranked(posts, size)
+            for group_id, posts in group_posts.items()
+        },
+    }
+    # Kept past their refresh time, so readers never wait for a refresh.
+    cache.set_many(rankings, settings.TRENDING_WINDOW_HOURS * 3600)
+    cache.set(FRESH_KEY, True, settings.TRENDING_REFRESH_SECONDS)
+    return rankings
+
+
+def update():
+    """Job entry point for refreshes queued by readers."""
+    refresh()
+
+
+def prune(now=None):
+    """Delete buckets that fell out of the window."""
+    now = now or timezone.now()
+    since = now - dt.timedelta(hours=settings.TRENDING_WINDOW_HOURS)
+    return Activity.objects.filter(bucket__lt=since).delete()[0]
+
+
+def _cached(key, default):
+    """Read a ranking, queueing a refresh once it is stale."""
+    # add() succeeds for one reader only until the refresh marks it fresh.
+    if cache.add(FRESH_KEY, True, settings.TRENDING_REFRESH_SECONDS):
+        enqueue('posts.trending.update', queue='trending')
+    ranking = cache.get(key)
+    return default if ranking is None else ranking
+
+
+def trending_post_ids(group=None):
+    if group is None:
+        return _cached(POSTS_KEY, [])
+    return _cached(GROUP_POSTS_KEY, {}).get(group.pk, [])
+
+
+def trending_group_ids():
+    return _cached(GROUPS_KEY, [])
@@ -1,12 +1,43 @@
 from django.urls import path
-from . import views
+from . import feeds, sitemaps, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('more/', views.index_more, name='index_more'),
+    path('feeds/rss/', feeds.latest_rss, name='index_rss'),
+    path('feeds/atom/', feeds.latest_atom, name='index_atom'),
+    path('sitemap.xml', sitemaps.sitemap_file, name='sitemap'),
+    path('sitemaps/<str:name>', sitemaps.sitemap_file, name='sitemap_chunk'),
+    path('trending/', views.trending_posts, name='trending'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('group/<slug:slug>/more/', views.group_more, name='group_more'),
+    path('group/<slug:slug>/trending/',
+         views.group_trending,
+         name='group_trending'),
+    path('group/<slug:slug>/stats/', views.group_stats, name='group_stats'),
+    path('group/<slug:slug>/rss/', feeds.group_rss, name='group_rss'),
+    path('group/<slug:slug>/atom/', feeds.group_atom, name='group_atom'),
+    path('tag/<str:name>/', views.tag_posts, name='tag'),
+    path('tag/<str:name>/more/', views.tag_more, name='tag_more'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/mentions/',
+         views.mention_posts,
+         name='mentions'),
+    path('profile/<str:username>/mentions/more/',
+         views.mention_more,
+         name='mention_more'),
+    path('profile/<str:username>/more/',
+         views.profile_more,
+         name='profile_more'),
+    path('profile/<str:username>/stats/',
+         views.profile_stats,
+         name='profile_stats'),
+    path('profile/<str:username>/rss/', feeds.author_rss, name='author_rss'),
+    path('profile/<str:username>/atom/',
+         feeds.author_atom,
+         name='author_atom'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
@@ -14,6 +45,7 @@ urlpatterns = [
          views.add_comment,
          name='add_comment'),
     path('posts/follow/', views.follow_index, name='follow_index'),
+    path('posts/follow/more/', views.follow_more, name='follow_more'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -1,48 +1,121 @@
+from django.conf import settings
 from django.core.paginator import Paginator
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Post, Group, Follow
-from django.contrib.auth import get_user_model
+from django.template.loader import render_to_string
+from django.urls import reverse
+from .models import (Post, Group, Follow, Recommendation, ArchivedPost,
+                     DailyStats, Mention, PostTag, Tag)
 from .forms import PostForm, CommentForm
 from django.contrib.auth.decorators import login_required
+from core.auth import cached_user, user_by_username
+from core.ratelimit import ratelimit
+from core.surrogate import add_keys, page_keys
+from . import deletion, detail, scroll, stats, trending
+from .archive import ArchiveFeed
 
 
-User = get_user_model()
+def feed_items(queryset):
+    """What a feed card shows beyond the post itself."""
+    return queryset.select_related(
+        'author', 'group').with_comment_preview()
+
+
+def get_recommendations(user):
+    """Stored "who to follow" suggestions, read with a single query."""
+    if user.is_anonymous:
+        return Recommendation.objects.none()
+    return Recommendation.objects.filter(user=user).select_related('author')
+
+
+def posts_fragment(request, batch, cursor, *keys, group_links=True):
+    """A batch of posts as rendered HTML and a continuation cursor."""
+    add_keys(request, *keys, *page_keys(batch))
+    html = render_to_string('posts/includes/post_list.html', {
+        'posts': batch,
+        'continued': True,
+        'group_links': group_links,
+    }, request)
+    return JsonResponse({'html': html, 'next': cursor})
+
+
+def more_posts(request, posts, archived, *keys, group_links=True):
+    """Next batch of a feed, see ``posts_fragment``."""
+    batch, cursor = scroll.next_batch(
+        feed_items(deletion.visible(posts)),
+        feed_items(deletion.visible(archived)),
+        request.GET.get('cursor'), settings.SCROLL_BATCH_SIZE)
+    return posts_fragment(request, batch, cursor, *keys,
+                          group_links=group_links)
 
 
 def index(request):
     template = 'posts/index.html'
-    posts = Post.objects.order_by('-pub_date')
-    paginator = Paginator(posts, 10)
+    posts = deletion.visible(Post.objects.order_by(*scroll.ORDERING))
+    archived = deletion.visible(
+        ArchivedPost.objects.order_by(*scroll.ORDERING))
+    paginator = Paginator(
+        ArchiveFeed(posts, archived, 'index', feed_items), 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    add_keys(request, 'index', *page_keys(page_obj))
     context = {
         'page_obj': page_obj,
+        'next_cursor': scroll.page_cursor(page_obj),
     }
     return render(request, template, context)
 
 
+def index_more(request):
+    return more_posts(request, Post.objects.all(),
+                      ArchivedPost.objects.all(), 'index')
+
+
 def group_posts(request, slug):
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    posts = Post.objects.filter(group=group).order_by('-pub_date')
-    paginator = Paginator(posts, 10)
+    deletion.check_visible(group_id=group.pk)
+    posts = deletion.visible(
+        Post.objects.filter(group=group).order_by(*scroll.ORDERING))
+    archived = deletion.visible(ArchivedPost.objects.filter(
+        group=group).order_by(*scroll.ORDERING))
+    paginator = Paginator(
+        ArchiveFeed(posts, archived, f'group:{group.pk}', feed_items), 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    add_keys(request, f'group:{group.pk}', *page_keys(page_obj))
     context = {
         'group': group,
         'page_obj': page_obj,
+        'next_cursor': scroll.page_cursor(page_obj),
+        'stats': stats.summary(DailyStats.GROUP, group.pk),
     }
     return render(request, template, context)
 
 
+def group_more(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    deletion.check_visible(group_id=group.pk)
+    return more_posts(request, Post.objects.filter(group=group),
+                      ArchivedPost.objects.filter(group=group),
+                      f'group:{group.pk}', group_links=False)
+
+
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
+    user = user_by_username(username)
+    deletion.check_visible(user_id=user.pk)
     full_name = f'{user.first_name} {user.last_name}'
-    user_posts = Post.objects.filter(author=user).order_by('-pub_date')
-    paginator = Paginator(user_posts, 10)
+    user_posts = deletion.visible(
+        Post.objects.filter(author=user).order_by(*scroll.ORDERING))
+    archived = deletion.visible(ArchivedPost.objects.filter(
+        author=user).order_by(*scroll.ORDERING))
+    paginator = Paginator(
+        ArchiveFeed(user_posts, archived, f'author:{user.pk}', feed_items),
+        10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     posts_count = paginator.count
+    add_keys(request, f'author:{user.pk}', *page_keys(page_obj))
     if request.user.is_anonymous:
         following = False
     else:
@@ -51,29 +124,144 @@ def profile(request, username):
         'full_name': full_name,
         'posts_count': posts_count,
         'page_obj': page_obj,
+        'next_cursor': scroll.page_cursor(page_obj),
         'following': following,
         'author': user,
+        'recommendations': get_recommendations(request.user),
+        'stats': stats.summary(DailyStats.AUTHOR, user.pk),
     }
     return render(request, 'posts/profile.html', context)
 
 
+def profile_more(request, username):
+    user = user_by_username(username)
+    deletion.check_visible(user_id=user.pk)
+    return more_posts(request, Post.objects.filter(author=user),
+                      ArchivedPost.objects.filter(author=user),
+                      f'author:{user.pk}')
+
+
+def group_stats(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    deletion.check_visible(group_id=group.pk)
+    add_keys(request, f'group:{group.pk}')
+    return JsonResponse(stats.summary(DailyStats.GROUP, group.pk))
+
+
+def profile_stats(request, username):
+    user = user_by_username(username)
+    deletion.check_visible(user_id=user.pk)
+    add_keys(request, f'author:{user.pk}')
+    return JsonResponse(stats.summary(DailyStats.AUTHOR, user.pk))
+
+
+def _posts_in_order(ids):
+    posts = feed_items(deletion.visible(Post.objects.all())).in_bulk(ids)
+    return [posts[pk] for pk in ids if pk in posts]
+
+
+def trending_posts(request):
+    group_ids = trending.trending_group_ids()
+    groups = Group.objects.in_bulk(group_ids)
+    context = {
+        'posts': _posts_in_order(trending.trending_post_ids()),
+        'groups': [groups[pk] for pk in group_ids if pk in groups],
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+def group_trending(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    deletion.check_visible(group_id=group.pk)
+    context = {
+        'group': group,
+        'posts': _posts_in_order(trending.trending_post_ids(group)),
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+def indexed_batch(request, entries):
+    """Next batch of posts listed by ``PostTag`` or ``Mention`` rows."""
+    ids, cursor = scroll.next_index_batch(
+        entries, request.GET.get('cursor'), settings.SCROLL_BATCH_SIZE)
+    return _posts_in_order(ids), cursor
+
+
+def indexed_feed(request, entries, title, more_url):
+    posts, cursor = indexed_batch(request, entries)
+    # Any change to these feeds is a post change, which purges 'index'.
+    add_keys(request, 'index', *page_keys(posts))
+    context = {
+        'title': title,
+        'posts': posts,
+        'next_cursor': cursor,
+        'more_url': more_url,
+    }
+    return render(request, 'posts/tagged.html', context)
+
+
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    return indexed_feed(request, PostTag.objects.filter(tag=tag),
+                        f'#{tag.name}',
+                        reverse('posts:tag_more', args=[tag.name]))
+
+
+def tag_more(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    posts, cursor = indexed_batch(request, PostTag.objects.filter(tag=tag))
+    return posts_fragment(request, posts, cursor, 'index')
+
+
+def mention_posts(request, username):
+    user = user_by_username(username)
+    deletion.check_visible(user_id=user.pk)
+    return indexed_feed(request, Mention.objects.filter(user=user),
+                        f'Posts mentioning @{user.username}',
+                        reverse('posts:mention_more', args=[user.username]))
+
+
+def mention_more(request, username):
+    user = user_by_username(username)
+    deletion.check_visible(user_id=user.pk)
+    posts, cursor = indexed_batch(request, Mention.objects.filter(user=user))
+    return posts_fragment(request, posts, cursor, 'index')
+
+
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    author = post.author
-    posts_count = Post.objects.filter(author=author.id).count()
-    comments = post.comments.all().order_by('-created')
+    bundle = detail.get_bundle(post_id)
+    if bundle is None:
+        raise Http404
+    post = bundle['post']
+    deletion.check_visible(user_id=post.author_id, group_id=post.group_id)
+    author = cached_user(post.author_id)
+    post.author = author
+    post.group = detail.cached_group(post.group_id)
+    comments = bundle['comments']
+    for comment in comments:
+        comment.author = cached_user(comment.author_id)
+    all_comments = request.GET.get('comments') == 'all'
+    if all_comments:
+        comments = post.comments.select_related('author').order_by('-created')
+    add_keys(request, f'author:{author.pk}', *page_keys([post]))
     form = CommentForm()
     context = {
         'post': post,
         'author': author,
-        'posts_count': posts_count,
+        'posts_count': detail.author_posts_count(author.pk),
         'comments': comments,
+        'comments_count': bundle['comments_count'],
+        'all_comments': all_comments or (
+            bundle['comments_count'] <= len(bundle['comments'])),
+        'image': bundle['image'],
         'form': form,
+        'archived': bundle['archived'],
     }
     return render(request, 'posts/post_detail.html', context)
 
 
 @login_required
+@ratelimit('post_create')
 def post_create(request):
     if request.method == 'POST':
         form = PostForm(request.POST, files=request.FILES)
@@ -81,6 +269,7 @@ def post_create(request):
             post = form.save(commit=False)
             post.author = request.user
             post.save()
+            trending.record_post(post)
             return redirect('posts:profile', username=request.user.username)
         return render(request, 'posts/post_create.html', {'form': form})
     form = PostForm()
@@ -107,13 +296,15 @@ def post_edit(request, post_id):
 
 
 @login_required
+@ratelimit('add_comment')
 def add_comment(request, post_id):
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
-        comment.post = Post.objects.get(id=post_id)
+        comment.post = get_object_or_404(Post, pk=post_id)
         comment.save()
+        trending.record_comment(comment)
     return redirect('posts:post_detail', post_id=post_id)
 
 
@@ -122,29 +313,44 @@ def follow_index(request):
     template = 'posts/follow.html'
     user = request.user
     authors = Follow.objects.filter(user=user).values('author')
-    posts = Post.objects.filter(author__in=authors).order_by('-pub_date')
-    paginator = Paginator(posts, 10)
+    posts = deletion.visible(Post.objects.filter(
+        author__in=authors).order_by(*scroll.ORDERING))
+    archived = deletion.visible(ArchivedPost.objects.filter(
+        author__in=authors).order_by(*scroll.ORDERING))
+    paginator = Paginator(
+        ArchiveFeed(posts, archived, None, feed_items), 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
         'page_obj': page_obj,
+        'next_cursor': scroll.page_cursor(page_obj),
+        'recommendations': get_recommendations(user),
     }
     return render(request, template, context)
 
 
 @login_required
+def follow_more(request):
+    authors = Follow.objects.filter(user=request.user).values('author')
+    return more_posts(request, Post.objects.filter(author__in=authors),
+                      ArchivedPost.objects.filter(author__in=authors))
+
+
+@login_required
+@ratelimit('profile_follow', methods=('GET', 'POST'))
 def profile_follow(request, username):
     user = request.user
-    author = get_object_or_404(User, username=username)
+    author = user_by_username(username)
     following = Follow(user=user, author=author)
     following.save()
+    trending.record_follow(author)
     return profile(request, username)
 
 
 @login_required
 def profile_unfollow(request, username):
     user = request.user
-    author = get_object_or_404(User, username=username)
+    author = user_by_username(username)
     Follow.objects.get(user=user, author=author).delete()
     return profile(request, username)
 
@@ -0,0 +1,109 @@
+"""Pre-render the pages hit first after a deploy.
+
+Pages are rendered by calling their views with an anonymous request
+built by ``RequestFactory``, so the view caches, ``{% cache %}``
+fragments and sorl thumbnails are filled as a first visit would fill
+them, without the middleware stack. Trending rankings are rebuilt
+directly first, a cold trending page would only queue their refresh.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Count
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from . import trending
+from .models import Group
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+
+def _host():
+    for host in settings.ALLOWED_HOSTS:
+        host = host.lstrip('.')
+        if host and host != '*':
+            return host
+    return 'localhost'
+
+
+def _paged(url, pages):
+    return [url] + [f'{url}?page={number}' for number in range(2, pages + 1)]
+
+
+def targets(pages=None, profiles=None):
+    """URLs to warm: first index and group pages, top profiles, trending."""
+    pages = pages or settings.WARMUP_PAGES
+    profiles = profiles or settings.WARMUP_PROFILES
+    urls = _paged(reverse('posts:index'), pages)
+    urls.append(reverse('posts:trending'))
+    for slug in Group.objects.values_list('slug', flat=True).iterator():
+        urls.extend(_paged(reverse('posts:group_list', args=[slug]), pages))
+    # We do not count visits, the most followed authors are the best proxy.
+    popular = User.objects.annotate(
+        followers=Count('following')).order_by('-followers', 'pk')
+    for username in popular.values_list('username', flat=True)[:profiles]:
+        urls.append(reverse('posts:profile', args=[username]))
+    return urls
+
+
+def _render(url):
+    match = resolve(urlsplit(url).path)
+    request = RequestFactory().get(url, HTTP_HOST=_host())
+    request.user = AnonymousUser()
+    started = time.perf_counter()
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        status = response.status_code
+    except Http404:
+        status = 404
+    except Exception:
+        logger.exception('Warming %s failed', url)
+        status = 500
+    finally:
+        close_old_connections()
+    return url, status, time.perf_counter() - started
+
+
+def cache_footprint():
+    """(keys, bytes) held by a local-memory cache, None for other backends."""
+    store = getattr(cache, '_cache', None)
+    if not isinstance(store, dict):
+        return None
+    return len(store), sum(len(value) for value in store.values())
+
+
+def warm_up(urls=None, workers=None):
+    """Render ``urls`` in parallel, return (results, seconds elapsed)."""
+    urls = targets() if urls is None else urls
+    started = time.perf_counter()
+    trending.refresh()
+    with ThreadPoolExecutor(workers or settings.WARMUP_WORKERS) as pool:
+        results = list(pool.map(_render, urls))
+    return results, time.perf_counter() - started
+
+
+def warm_up_in_background():
+    """Start warming in a daemon thread, so server start is not delayed."""
+    def run():
+        try:
+            results, elapsed = warm_up()
+        except Exception:
+            logger.exception('Cache warm-up failed')
+        else:
+            logger.info('Warmed %d pages in %.2fs', len(results), elapsed)
+    threading.Thread(target=run, name='cache-warm-up', daemon=True).start()
@@ -0,0 +1,60 @@
+// Infinite scroll for feeds rendered with posts/includes/scroll.html.
+// Fetches the next batch of posts when the end of the list comes into
+// view; without JavaScript the paginator is left in place.
+(function () {
+    'use strict';
+
+    function setUp(feed) {
+        var fallback = feed.nextElementSibling;
+        var sentinel = document.createElement('div');
+        var loading = false;
+        feed.after(sentinel);
+        if (fallback && fallback.hasAttribute('data-scroll-fallback')) {
+            fallback.hidden = true;
+        }
+
+        function loadMore() {
+            var cursor = feed.dataset.scrollCursor;
+            if (loading || !cursor) {
+                return;
+            }
+            loading = true;
+            var url = feed.dataset.scrollUrl + '?cursor=' +
+                encodeURIComponent(cursor);
+            fetch(url, {credentials: 'same-origin'})
+                .then(function (response) {
+                    if (!response.ok) {
+                        throw new Error(response.statusText);
+                    }
+                    return response.json();
+                })
+                .then(function (data) {
+                    feed.insertAdjacentHTML('beforeend', data.html);
+                    feed.dataset.scrollCursor = data.next || '';
+                    loading = false;
+                    if (!data.next) {
+                        observer.disconnect();
+                    }
+                })
+                .catch(function () {
+                    // Give the reader the paginator back.
+                    observer.disconnect();
+                    if (fallback) {
+                        fallback.hidden = false;
+                    }
+                });
+        }
+
+        var observer = new IntersectionObserver(function (entries) {
+            if (entries[0].isIntersecting) {
+                loadMore();
+            }
+        }, {rootMargin: '600px'});
+        observer.observe(sentinel);
+    }
+
+    if (!('IntersectionObserver' in window) || !window.fetch) {
+        return;
+    }
+    document.querySelectorAll('[data-scroll-url]').forEach(setUp);
+})();
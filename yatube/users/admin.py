@@ -1,3 +1,15 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-# Register your models here.
+from posts.admin import BackgroundDeletionAdmin
+
+User = get_user_model()
+
+
+class UserAdmin(BackgroundDeletionAdmin, BaseUserAdmin):
+    pass
+
+
+admin.site.unregister(User)
+admin.site.register(User, UserAdmin)
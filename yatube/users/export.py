@@ -0,0 +1,173 @@
+"""Personal data export as a ZIP of JSON files and original images.
+
+``stream`` yields the archive while it is being written: rows are read
+with chunked ``iterator()`` calls and images copied chunk by chunk, and
+``zipfile`` writes to an unseekable buffer that is emptied after every
+write. Memory stays flat however many posts an author has; only the
+ZIP central directory, one small record per file, grows with the number
+of images. ``build`` writes the same archive to EXPORT_ROOT from a
+background job for a later download.
+"""
+import glob
+import json
+import os
+import zipfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+from django.core.serializers.json import DjangoJSONEncoder
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import enqueue
+from posts.models import (ArchivedComment, ArchivedPost, Comment, Follow,
+                          Post, image_storage)
+
+User = get_user_model()
+
+BUILD_TASK = 'users.export.build'
+FILE_CHUNK_SIZE = 64 * 1024
+
+
+class _Buffer:
+    """Write-only file object collecting what ``zipfile`` writes."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _rows(queryset, *fields):
+    return queryset.order_by('pk').values(*fields).iterator(
+        chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+def sections(user):
+    """(file name, iterables of dicts) of everything kept about ``user``."""
+    post_fields = ('id', 'text', 'pub_date', 'group__slug', 'image')
+    comment_fields = ('id', 'post_id', 'text', 'created')
+    return (
+        ('profile.json', ([{
+            'username': user.username,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'email': user.email,
+            'date_joined': user.date_joined,
+        }],)),
+        ('posts.json', (
+            _rows(Post.objects.filter(author=user), *post_fields),
+            _rows(ArchivedPost.objects.filter(author=user), *post_fields),
+        )),
+        ('comments.json', (
+            _rows(Comment.objects.filter(author=user), *comment_fields),
+            _rows(ArchivedComment.objects.filter(author=user),
+                  *comment_fields),
+        )),
+        ('following.json', (
+            _rows(Follow.objects.filter(user=user), 'author__username'),
+        )),
+        ('followers.json', (
+            _rows(Follow.objects.filter(author=user), 'user__username'),
+        )),
+    )
+
+
+def image_names(user):
+    """Distinct images of the user's posts, hot and archived."""
+    hot = Post.objects.filter(author=user).exclude(image='')
+    yield from hot.order_by('image').values_list(
+        'image', flat=True).distinct().iterator()
+    yield from ArchivedPost.objects.filter(author=user).exclude(
+        image='').exclude(image__in=hot.values('image')).order_by(
+        'image').values_list('image', flat=True).distinct().iterator()
+
+
+def _pieces(user):
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, parts in sections(user):
+            with archive.open(name, 'w', force_zip64=True) as entry:
+                separator = b'[\n'
+                for part in parts:
+                    for row in part:
+                        entry.write(separator + json.dumps(
+                            row, cls=DjangoJSONEncoder).encode())
+                        separator = b',\n'
+                        yield buffer.pop()
+                entry.write(b'\n]\n' if separator == b',\n' else b'[]\n')
+            yield buffer.pop()
+        for name in image_names(user):
+            if not image_storage.exists(name):
+                continue
+            with image_storage.open(name) as source, archive.open(
+                    f'images/{name}', 'w', force_zip64=True) as entry:
+                for chunk in source.chunks(FILE_CHUNK_SIZE):
+                    entry.write(chunk)
+                    yield buffer.pop()
+            yield buffer.pop()
+    yield buffer.pop()
+
+
+def stream(user):
+    """Yield the export archive of ``user`` piece by piece."""
+    return (piece for piece in _pieces(user) if piece)
+
+
+def filename(user):
+    return f'yatube-{user.username}.zip'
+
+
+def _user_files(user_pk):
+    return glob.glob(os.path.join(settings.EXPORT_ROOT, f'{user_pk}-*.zip'))
+
+
+def latest(user):
+    """Path of the newest archive built for ``user``, or None."""
+    return max(_user_files(user.pk), default=None)
+
+
+def build(user_pk):
+    """Job entry point: write the archive and tell the user it is ready."""
+    user = User.objects.get(pk=user_pk)
+    os.makedirs(settings.EXPORT_ROOT, exist_ok=True)
+    stamp = timezone.now().strftime('%Y%m%d%H%M%S')
+    path = os.path.join(settings.EXPORT_ROOT, f'{user.pk}-{stamp}.zip')
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        for data in stream(user):
+            file.write(data)
+    os.replace(temporary, path)
+    for old in _user_files(user.pk):
+        if old != path:
+            os.remove(old)
+    if user.email:
+        send_mail('Your Yatube data export is ready',
+                  'Download it at '
+                  f'{settings.SITE_URL}{reverse("users:export_download")}',
+                  None, [user.email])
+
+
+def pending(user):
+    """Whether a build for ``user`` is queued or running."""
+    return Job.objects.filter(
+        task=BUILD_TASK, status__in=(Job.QUEUED, Job.RUNNING),
+        payload=json.dumps({'args': [user.pk], 'kwargs': {}}),
+    ).exists()
+
+
+def schedule(user):
+    if not pending(user):
+        enqueue(BUILD_TASK, user.pk, queue='exports')
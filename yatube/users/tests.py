@@ -1,3 +1,93 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from jobs.queue import run_pending
+from posts.models import Comment, Follow, Post
+
+User = get_user_model()
+
+TEMP_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+small_gif = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=os.path.join(TEMP_ROOT, 'media'),
+                   EXPORT_ROOT=os.path.join(TEMP_ROOT, 'exports'),
+                   EXPORT_CHUNK_SIZE=2)
+class ExportTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        shutil.rmtree(TEMP_ROOT, ignore_errors=True)
+        self.user = User.objects.create_user(username='author',
+                                             email='author@example.com')
+        self.reader = User.objects.create_user(username='reader')
+        self.post = Post.objects.create(
+            author=self.user, text='With image',
+            image=SimpleUploadedFile('small.gif', small_gif,
+                                     content_type='image/gif'))
+        for number in range(4):
+            Post.objects.create(author=self.user, text=f'Post {number}')
+        Comment.objects.create(post=self.post, author=self.user,
+                               text='Own comment')
+        Follow.objects.create(user=self.reader, author=self.user)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def read_archive(self, data):
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertIsNone(archive.testzip())
+            return {name: archive.read(name) for name in archive.namelist()}
+
+    def test_stream_contains_data_and_images(self):
+        response = self.client.get(reverse('users:export_stream'))
+        self.assertTrue(response.streaming)
+        self.assertIn('yatube-author.zip', response['Content-Disposition'])
+        files = self.read_archive(b''.join(response.streaming_content))
+        posts = json.loads(files['posts.json'])
+        self.assertEqual(len(posts), 5)
+        self.assertEqual(posts[0]['image'], self.post.image.name)
+        self.assertEqual(json.loads(files['comments.json'])[0]['text'],
+                         'Own comment')
+        self.assertEqual(json.loads(files['following.json']), [])
+        self.assertEqual(json.loads(files['followers.json']),
+                         [{'user__username': 'reader'}])
+        self.assertEqual(files[f'images/{self.post.image.name}'], small_gif)
+
+    def test_background_build(self):
+        self.client.post(reverse('users:export'))
+        self.client.post(reverse('users:export'))
+        response = self.client.get(reverse('users:export'))
+        self.assertTrue(response.context['building'])
+        self.assertEqual(run_pending(['exports']), 1)
+        self.assertIn(reverse('users:export_download'), mail.outbox[0].body)
+        response = self.client.get(reverse('users:export_download'))
+        files = self.read_archive(b''.join(response.streaming_content))
+        self.assertEqual(len(json.loads(files['posts.json'])), 5)
+
+    def test_download_needs_a_build(self):
+        response = self.client.get(reverse('users:export_download'))
+        self.assertEqual(response.status_code, 404)
@@ -18,6 +18,9 @@ urlpatterns = [
         name='login'
     ),
     path('signup/', views.SignUp.as_view(), name='signup'),
+    path('export/', views.export_data, name='export'),
+    path('export/stream/', views.export_stream, name='export_stream'),
+    path('export/download/', views.export_download, name='export_download'),
     path(
         'password_reset/',
         PasswordResetView.as_view(
@@ -1,9 +1,48 @@
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.shortcuts import redirect, render
 from django.views.generic import CreateView
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
+from core.ratelimit import ratelimit
+from . import export
 from .forms import CreationForm
 
 
+@method_decorator(ratelimit('signup'), name='dispatch')
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
+
+
+@login_required
+@ratelimit('export')
+def export_data(request):
+    if request.method == 'POST':
+        export.schedule(request.user)
+        return redirect('users:export')
+    context = {
+        'ready': export.latest(request.user) is not None,
+        'building': export.pending(request.user),
+    }
+    return render(request, 'users/export.html', context)
+
+
+@login_required
+@ratelimit('export', methods=('GET',))
+def export_stream(request):
+    response = StreamingHttpResponse(export.stream(request.user),
+                                     content_type='application/zip')
+    response['Content-Disposition'] = (
+        f'attachment; filename="{export.filename(request.user)}"')
+    return response
+
+
+@login_required
+def export_download(request):
+    path = export.latest(request.user)
+    if path is None:
+        raise Http404
+    return FileResponse(open(path, 'rb'), as_attachment=True,
+                        filename=export.filename(request.user))
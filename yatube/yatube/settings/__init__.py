@@ -0,0 +1,15 @@
+"""Settings profile is picked by the YATUBE_PROFILE environment variable.
+
+``dev`` (default) is for local work, ``prod`` for deployments.
+"""
+import os
+
+PROFILE = os.environ.get('YATUBE_PROFILE', 'dev')
+
+if PROFILE == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif PROFILE == 'dev':
+    from .dev import *  # noqa: F401,F403
+else:
+    from django.core.exceptions import ImproperlyConfigured
+    raise ImproperlyConfigured(f'Unknown YATUBE_PROFILE {PROFILE!r}')
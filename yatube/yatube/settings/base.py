@@ -0,0 +1,286 @@
+"""
+Django settings for yatube project, shared by every profile.
+
+Generated by 'django-admin startproject' using Django 2.2.19.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = '5)2)=6nh_76*$1)y!f5l$4#9+_bqg&872189jik)xp&)4-)t4^'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+]
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
+
+# Application definition
+
+INSTALLED_APPS = [
+    'about',
+    'core.apps.CoreConfig',
+    'users.apps.UsersConfig',
+    'posts.apps.PostsConfig',
+    'jobs.apps.JobsConfig',
+    'notifications.apps.NotificationsConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'core.compression.CompressionMiddleware',
+    'core.middleware.WriteConcurrencyMiddleware',
+    'core.surrogate.SurrogateKeyMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [os.path.join(BASE_DIR, 'templates')],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+                'notifications.context_processors.unread',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    }
+}
+
+# Applied to every new SQLite connection, see core.db.
+SQLITE_PRAGMAS = {}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+
+STATIC_URL = '/static/'
+
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# Uploads go to temporary files instead of memory, whatever their size.
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+IMAGE_UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+IMAGE_UPLOAD_MAX_PIXELS = 40 * 1000 * 1000
+IMAGE_MAX_SIDE = 2048
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+LOGOUT_REDIRECT_URL = 'posts:index'
+
+EMAIL_BACKEND = 'jobs.backends.QueuedEmailBackend'
+JOBS_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Import the URLconf and compile every template when the WSGI application
+# starts instead of on the first requests, see yatube.wsgi.
+PRELOAD_ON_BOOT = False
+
+# Sessions are read from the cache, writes go through to the database.
+# The cache must be shared by all processes serving the site, prod
+# replaces the LocMemCache below with memcached.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+RECOMMENDATIONS_TOP_K = 10
+
+TRENDING_BUCKET_SECONDS = 60 * 60
+TRENDING_WINDOW_HOURS = 48
+TRENDING_HALF_LIFE_HOURS = 6
+TRENDING_AUTHOR_WEIGHT = 0.5
+TRENDING_SIZE = 20
+TRENDING_QUERY_BATCH_SIZE = 500
+TRENDING_REFRESH_SECONDS = 5 * 60
+
+ARCHIVE_AFTER_DAYS = 365
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_COUNT_SECONDS = 24 * 60 * 60
+
+ADMIN_BATCH_SIZE = 500
+
+RATELIMIT_ENABLED = True
+# Addresses of reverse proxies whose X-Forwarded-For header is believed.
+RATELIMIT_TRUSTED_PROXIES = ()
+RATELIMITS = {
+    'post_create': {'user': '10/m', 'ip': '30/m'},
+    'add_comment': {'user': '20/m', 'ip': '60/m'},
+    'profile_follow': {'user': '30/m', 'ip': '60/m'},
+    'signup': {'ip': '10/h'},
+    'export': {'user': '5/h'},
+}
+
+WRITE_CONCURRENCY_LIMIT = 4
+WRITE_QUEUE_TIMEOUT = 2
+WRITE_POLL_INTERVAL = 0.05
+WRITE_SLOT_SECONDS = 5 * 60
+
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_DELAY = 10
+JOBS_VISIBILITY_TIMEOUT = 5 * 60
+JOBS_POLL_INTERVAL = 1
+JOBS_KEEP_FINISHED_HOURS = 24 * 7
+
+WARMUP_PAGES = 3
+WARMUP_PROFILES = 20
+WARMUP_WORKERS = 4
+# Warm the cache in a background thread of every freshly started server.
+WARM_CACHE_ON_BOOT = False
+
+FEED_SIZE = 20
+FEED_CACHE_SECONDS = 24 * 60 * 60
+FEED_SCOPE_SECONDS = 60 * 60
+
+DETAIL_CACHE_SECONDS = 10 * 60
+DETAIL_COMMENTS = 20
+
+# Absolute links in sitemaps need the public address of the site.
+SITE_URL = 'http://localhost:8000'
+SITEMAP_ROOT = os.path.join(BASE_DIR, 'sitemaps')
+SITEMAP_URLS_PER_FILE = 50000
+SITEMAP_UPDATE_DELAY = 60
+
+# How long the edge may serve a tagged page before revalidating; changes
+# are purged by key, so this only bounds staleness if a purge is lost.
+SURROGATE_MAX_AGE = 24 * 60 * 60
+SURROGATE_PURGE_BACKEND = 'core.surrogate.NullBackend'
+SURROGATE_PURGE_OPTIONS = {}
+
+SCROLL_BATCH_SIZE = 10
+
+USER_CACHE_SECONDS = 60 * 60
+
+TAGS_BATCH_SIZE = 1000
+
+GC_BATCH_SIZE = 500
+# Media younger than this is never collected, its post may not be saved yet.
+GC_GRACE_SECONDS = 24 * 60 * 60
+
+DELETION_BATCH_SIZE = 500
+DELETION_JOB_SECONDS = 30
+DELETION_HIDDEN_SECONDS = 10
+
+STATS_DAYS = 30
+STATS_BATCH_SIZE = 1000
+STATS_BACKFILL_DAYS = 31
+
+NOTIFICATIONS_PER_PAGE = 20
+NOTIFICATIONS_BATCH_SIZE = 500
+NOTIFICATIONS_KEEP_DAYS = 90
+NOTIFICATIONS_COUNT_SECONDS = 5 * 60
+
+EXPORT_ROOT = os.path.join(BASE_DIR, 'exports')
+EXPORT_CHUNK_SIZE = 2000
+
+COMPRESSION_MIN_SIZE = 1024
+# Higher levels save little on HTML for much more CPU, see
+# benchmark_compression.
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+COMPRESSION_TYPES = (
+    'text/html',
+    'text/plain',
+    'application/json',
+    'application/xml',
+    'application/rss+xml',
+    'application/atom+xml',
+)
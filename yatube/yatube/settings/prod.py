@@ -0,0 +1,62 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import DATABASES, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('YATUBE_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('Set YATUBE_SECRET_KEY for the prod profile')
+
+ALLOWED_HOSTS = os.environ.get('YATUBE_ALLOWED_HOSTS', 'localhost').split(',')
+
+SITE_URL = os.environ.get('YATUBE_SITE_URL', 'http://localhost')
+
+RATELIMIT_TRUSTED_PROXIES = tuple(filter(None, os.environ.get(
+    'YATUBE_TRUSTED_PROXIES', '127.0.0.1').split(',')))
+
+# Sessions, cached users and every invalidation must be seen by all
+# worker processes, which the per-process LocMemCache of base can't do.
+MEMCACHED_LOCATION = os.environ.get('YATUBE_MEMCACHED')
+if not MEMCACHED_LOCATION:
+    raise ImproperlyConfigured('Set YATUBE_MEMCACHED for the prod profile')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': MEMCACHED_LOCATION.split(','),
+    }
+}
+
+if os.environ.get('YATUBE_PURGE_URL'):
+    SURROGATE_PURGE_BACKEND = 'core.surrogate.HTTPBackend'
+    SURROGATE_PURGE_OPTIONS = {'url': os.environ['YATUBE_PURGE_URL']}
+
+DATABASES['default']['CONN_MAX_AGE'] = 600
+
+STATICFILES_STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+    'mmap_size': 128 * 1024 * 1024,
+}
+
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATES[0]['OPTIONS']['context_processors'] = [
+    processor for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+    if processor != 'django.template.context_processors.debug'
+]
+
+PRELOAD_ON_BOOT = True
@@ -1,7 +1,11 @@
-from django.contrib import admin
-from django.urls import path, include
+import re
+
 from django.conf import settings
 from django.conf.urls.static import static
+from django.contrib import admin
+from django.urls import include, path, re_path
+
+from core.staticfiles import serve as serve_static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -9,12 +13,22 @@ urlpatterns = [
     path('auth/', include('django.contrib.auth.urls')),
     path('', include('posts.urls', namespace='posts')),
     path('about/', include('about.urls', namespace='about')),
+    path('notifications/',
+         include('notifications.urls', namespace='notifications')),
 ]
 
+if not settings.DEBUG and settings.STATIC_URL.startswith('/'):
+    urlpatterns += (
+        re_path(r'^%s(?P<path>.*)$' % re.escape(settings.STATIC_URL[1:]),
+                serve_static),
+    )
+
 if settings.DEBUG:
     urlpatterns += static(
         settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
     )
+
+if settings.DEBUG and 'debug_toolbar' in settings.INSTALLED_APPS:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
 
@@ -9,8 +9,19 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+if settings.PRELOAD_ON_BOOT:
+    from django.urls import get_resolver
+    from core.templates import precompile_templates
+    get_resolver().url_patterns
+    precompile_templates()
+
+if settings.WARM_CACHE_ON_BOOT:
+    from posts.warmup import warm_up_in_background
+    warm_up_in_background()
\ No newline at end of file